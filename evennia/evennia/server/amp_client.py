@@ -149,6 +149,20 @@ class AMPServerClientProtocol(amp.AMPMultiConnectionProtocol):
         """
         return self.data_to_portal(amp.MsgServer2Portal, session.sessid, **kwargs)
 
+    def send_MsgServer2PortalMulticast(self, sessions, **kwargs):
+        """
+        Access method - executed on the Server for sending the same data
+            to many sessions on the Portal at once.
+
+        Args:
+            sessions (list): Sessions to relay to.
+            kwargs (any, optiona): Extra data.
+
+        """
+        return self.data_to_portal(
+            amp.MsgServer2Portal, [session.sessid for session in sessions], **kwargs
+        )
+
     def send_AdminServer2Portal(self, session, operation="", **kwargs):
         """
         Administrative access method called by the Server to send an
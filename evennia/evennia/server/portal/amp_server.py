@@ -369,13 +369,19 @@ class AMPServerProtocol(amp.AMPMultiConnectionProtocol):
 
         Args:
             packed_data (str): Pickled data (sessid, kwargs) coming over the wire.
+                The sessid can be a list of session ids, then the data is relayed
+                to all these sessions.
 
         """
         try:
             sessid, kwargs = self.data_in(packed_data)
-            session = self.factory.portal.sessions.get(sessid, None)
-            if session:
-                self.factory.portal.sessions.data_out(session, **kwargs)
+            if isinstance(sessid, (list, tuple)):
+                sessions = [self.factory.portal.sessions.get(sid, None) for sid in sessid]
+                self.factory.portal.sessions.data_out_multicast(sessions, **kwargs)
+            else:
+                session = self.factory.portal.sessions.get(sessid, None)
+                if session:
+                    self.factory.portal.sessions.data_out(session, **kwargs)
         except Exception:
             logger.log_trace("packed_data len {}".format(len(packed_data)))
         return {}
@@ -371,6 +371,10 @@ if WEBSERVER_ENABLED:
                     factory = Websocket()
                     factory.noisy = False
                     factory.protocol = webclient.WebSocketClient
+                    if settings.WEBSOCKET_CLIENT_COMPRESSION:
+                        factory.setProtocolOptions(
+                            perMessageCompressionAccept=webclient.accept_compression
+                        )
                     factory.sessionhandler = PORTAL_SESSIONS
                     websocket_service = internet.TCPServer(port, factory, interface=w_interface)
                     websocket_service.setName("EvenniaWebSocket%s:%s" % (w_ifacestr, port))
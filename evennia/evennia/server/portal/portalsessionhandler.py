@@ -4,6 +4,7 @@ Sessionhandler for portal sessions
 
 
 import time
+from copy import deepcopy
 from collections import deque, namedtuple
 from twisted.internet import reactor
 from django.conf import settings
@@ -462,5 +463,41 @@ class PortalSessionHandler(SessionHandler):
                     except Exception:
                         log_trace()
 
+    def data_out_multicast(self, sessions, **kwargs):
+        """
+        Called by server for having the portal relay the same data to
+        many sessions.
+
+        Args:
+            sessions (list): Sessions to relay to.
+
+        Kwargs:
+            kwargs (any): Same as in `data_out`.
+
+        Notes:
+            Protocols which can encode data (the webclient) encode it only
+            once for all sessions with the same data-out key.
+
+        """
+        encoded = {}
+        for session in sessions:
+            if not session:
+                continue
+
+            if hasattr(session, "encode_data_out"):
+                key = session.get_data_out_key()
+                if key not in encoded:
+                    try:
+                        encoded[key] = session.encode_data_out(**deepcopy(kwargs))
+                    except Exception:
+                        encoded[key] = []
+                        log_trace()
+
+                for line in encoded[key]:
+                    session.sendLine(line)
+            else:
+                # the protocol may change the data
+                self.data_out(session, **deepcopy(kwargs))
+
 
 PORTAL_SESSIONS = PortalSessionHandler()
@@ -24,6 +24,7 @@ from evennia.utils.utils import to_str, mod_import
 from evennia.utils.ansi import parse_ansi
 from evennia.utils.text2html import parse_html
 from autobahn.twisted.websocket import WebSocketServerProtocol
+from autobahn.websocket.compress import PerMessageDeflateOffer, PerMessageDeflateOfferAccept
 
 _RE_SCREENREADER_REGEX = re.compile(
     r"%s" % settings.SCREENREADER_REGEX_STRIP, re.DOTALL + re.MULTILINE
@@ -40,6 +41,25 @@ CLOSE_NORMAL = WebSocketServerProtocol.CLOSE_STATUS_CODE_NORMAL
 GOING_AWAY = WebSocketServerProtocol.CLOSE_STATUS_CODE_GOING_AWAY
 
 
+def accept_compression(offers):
+    """
+    Choose the compression of a websocket connection from the client's offers
+    during the handshake.
+
+    Args:
+        offers (list): Compression extensions offered by the client.
+
+    Returns:
+        accept (PerMessageDeflateOfferAccept or None): The accepted offer, or
+            None to send uncompressed messages.
+
+    """
+    for offer in offers:
+        if isinstance(offer, PerMessageDeflateOffer):
+            return PerMessageDeflateOfferAccept(offer)
+    return None
+
+
 class WebSocketClient(WebSocketServerProtocol, Session):
     """
     Implements the server-side of the Websocket connection.
@@ -226,11 +246,71 @@ class WebSocketClient(WebSocketServerProtocol, Session):
 
         self.sessionhandler.data_in(self, **kwargs)
 
+    def get_data_out_key(self):
+        """
+        Get the key of the session's output settings. Sessions with
+        the same key encode the same data to the same lines.
+
+        Returns:
+            key (tuple): The session's output settings.
+
+        """
+        flags = self.protocol_flags
+        return (
+            self.__class__,
+            flags.get("RAW", False),
+            flags.get("NOCOLOR", False),
+            flags.get("SCREENREADER", False),
+        )
+
+    def encode_data_out(self, **kwargs):
+        """
+        Encode outgoing data to lines without sending them.
+
+        Kwargs:
+            kwargs (any): Each key is a command instruction on the
+            form key = [[args],{kwargs}].
+
+        Returns:
+            lines (list): Lines to send to the client.
+
+        """
+        lines = []
+        for cmdname, (cmdargs, cmdkwargs) in kwargs.items():
+            cmdname = cmdname.strip().lower()
+            if cmdname == "prompt":
+                cmdkwargs.setdefault("options", {}).update({"send_prompt": True})
+                line = self.encode_text(*cmdargs, **cmdkwargs)
+            elif cmdname == "text":
+                line = self.encode_text(*cmdargs, **cmdkwargs)
+            else:
+                line = self.encode_default(cmdname, *cmdargs, **cmdkwargs)
+
+            if line is not None:
+                lines.append(line)
+        return lines
+
     def send_text(self, *args, **kwargs):
         """
         Send text data. This will pre-process the text for
         color-replacement, conversion to html etc.
 
+        Args:
+            text (str): Text to send.
+
+        Kwargs:
+            options (dict): Same as in `encode_text`.
+
+        """
+        line = self.encode_text(*args, **kwargs)
+        if line is not None:
+            self.sendLine(line)
+
+    def encode_text(self, *args, **kwargs):
+        """
+        Encode text data to a line. This will pre-process the text for
+        color-replacement, conversion to html etc.
+
         Args:
             text (str): Text to send.
 
@@ -241,14 +321,17 @@ class WebSocketClient(WebSocketServerProtocol, Session):
                 - screenreader (bool): Use Screenreader mode.
                 - send_prompt (bool): Send a prompt with parsed html
 
+        Returns:
+            line (str or None): The line to send.
+
         """
         if args:
             args = list(args)
             text = args[0]
             if text is None:
-                return
+                return None
         else:
-            return
+            return None
 
         flags = self.protocol_flags
 
@@ -273,7 +356,7 @@ class WebSocketClient(WebSocketServerProtocol, Session):
             args[0] = parse_html(text, strip_ansi=nocolor)
 
         # send to client on required form [cmdname, args, kwargs]
-        self.sendLine(json.dumps([cmd, args, kwargs]))
+        return json.dumps([cmd, args, kwargs])
 
     def send_prompt(self, *args, **kwargs):
         kwargs["options"].update({"send_prompt": True})
@@ -293,5 +376,22 @@ class WebSocketClient(WebSocketServerProtocol, Session):
                 client instead.
 
         """
-        if not cmdname == "options":
-            self.sendLine(json.dumps([cmdname, args, kwargs]))
+        line = self.encode_default(cmdname, *args, **kwargs)
+        if line is not None:
+            self.sendLine(line)
+
+    def encode_default(self, cmdname, *args, **kwargs):
+        """
+        Encode data Evennia -> User to a line.
+
+        Args:
+            cmdname (str): The first argument will always be the oob cmd name.
+            *args (any): Remaining args will be arguments for `cmd`.
+
+        Returns:
+            line (str or None): The line to send.
+
+        """
+        if cmdname == "options":
+            return None
+        return json.dumps([cmdname, args, kwargs])
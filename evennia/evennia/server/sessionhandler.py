@@ -802,6 +802,33 @@ class ServerSessionHandler(SessionHandler):
         # send across AMP
         self.server.amp_protocol.send_MsgServer2Portal(session, **kwargs)
 
+    def data_out_multicast(self, sessions, **kwargs):
+        """
+        Sending the same data Server -> Portal to many sessions. The data
+        is cleaned and sent across the wire once, the Portal relays it to
+        all the sessions.
+
+        Args:
+            sessions (list): Sessions to relay to.
+            text (str, optional): text data to return
+
+        Notes:
+            The outdata is cleaned with the first session's settings, so
+            all sessions should use the same protocol.
+        """
+        sessions = [session for session in sessions if session]
+        if not sessions:
+            return
+        elif len(sessions) == 1:
+            self.data_out(sessions[0], **kwargs)
+            return
+
+        # clean output for sending
+        kwargs = self.clean_senddata(sessions[0], kwargs)
+
+        # send across AMP
+        self.server.amp_protocol.send_MsgServer2PortalMulticast(sessions, **kwargs)
+
     def get_inputfuncs(self):
         """
         Get all registered inputfuncs (access function)
@@ -102,6 +102,9 @@ WEBSOCKET_CLIENT_INTERFACE = "0.0.0.0"
 # the client will itself figure out this url based on the server's hostname.
 # e.g. ws://external.example.com or wss://external.example.com:443
 WEBSOCKET_CLIENT_URL = None
+# Compress websocket messages with the permessage-deflate extension if the client
+# offers it during the handshake. Clients which do not offer it get plain messages.
+WEBSOCKET_CLIENT_COMPRESSION = True
 # This determine's whether Evennia's custom admin page is used, or if the
 # standard Django admin is used.
 EVENNIA_ADMIN = True
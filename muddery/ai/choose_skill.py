@@ -4,6 +4,7 @@ Skill handler handles a character's skills.
 """
 
 import time
+import heapq
 import random
 from django.conf import settings
 from evennia.utils import logger
@@ -14,27 +15,118 @@ from muddery.utils.game_settings import GAME_SETTINGS
 class ChooseSkill(object):
     """
     Choose a skill and the skill's target.
+
+    Every character has its own instance. It caches the character's castable skills,
+    skills cooling down are kept in a heap ordered by their cd's finish time.
     """
+    def __init__(self):
+        """
+        Initialize the cache.
+        """
+        # skills can be cast
+        self.ready_skills = []
+
+        # skills cooling down, item: (cd's finish time, sequence, skill)
+        self.cooling_skills = []
+
+        # the last chosen skill, its cd is checked at the next time
+        self.last_skill = None
+
+        # version of the character's skills
+        self.loaded = False
+        self.skills_version = None
+        self.sequence = 0
+
+    def load_skills(self, caller):
+        """
+        Load the caller's skills.
+        """
+        self.ready_skills = []
+        self.cooling_skills = []
+        self.last_skill = None
+        self.loaded = True
+        self.skills_version = caller.ndb.skills_version
+
+        for skill in caller.skills.values():
+            if not skill.passive:
+                self.add_skill(skill)
+
+    def add_skill(self, skill):
+        """
+        Add a skill to ready skills or cooling skills.
+        """
+        if skill.is_cooling_down():
+            self.sequence += 1
+            heapq.heappush(self.cooling_skills, (skill.cd_finish_time, self.sequence, skill))
+        else:
+            self.ready_skills.append(skill)
+
+    def get_ready_skills(self, caller):
+        """
+        Get skills can be cast.
+        """
+        if not self.loaded or self.skills_version != caller.ndb.skills_version:
+            # skills have changed
+            self.load_skills(caller)
+
+        now = time.time()
+        if self.last_skill:
+            # check the last skill's cd
+            self.add_skill(self.last_skill)
+            self.last_skill = None
+
+        while self.cooling_skills and self.cooling_skills[0][0] <= now:
+            finish_time, seq, skill = heapq.heappop(self.cooling_skills)
+            self.add_skill(skill)
+
+        return self.ready_skills
+
     def choose(self, caller):
         """
         Choose a skill and the skill's target.
         """
         if not caller:
             return
-        
+
         combat = caller.ndb.combat_handler
         if not combat:
             return
-        
-        skills = [caller.db.skills[skill] for skill in caller.db.skills if caller.db.skills[skill].is_available(passive=False)]
+
+        skills = self.get_ready_skills(caller)
         if not skills:
             return
 
-        team = caller.get_team()
-        chars = combat.get_combat_characters()
-        # teammates = [c for c in characters if c.get_team() == team]
-        opponents = [c["char"] for c in chars if c["status"] == CStatus.ACTIVE and c["char"].get_team() != team]
+        opponents = combat.get_opponents(caller)
+        if not opponents:
+            return
+
+        # Pick a random skill which is available now. Skills may have other conditions
+        # besides cd (like mp), unavailable skills are left in ready skills.
+        count = len(skills)
+        while True:
+            if not count:
+                return
+
+            index = random.randrange(count)
+            skill = skills[index]
+            if skill.is_available(passive=False):
+                break
+
+            # skip it in this choice
+            count -= 1
+            skills[index] = skills[count]
+            skills[count] = skill
+
+            if skill.is_cooling_down():
+                # move it to cooling skills
+                skills[count] = skills[-1]
+                skills.pop()
+                self.add_skill(skill)
+
+        # Take the skill out of ready skills until its cd is checked.
+        skills[index] = skills[-1]
+        skills.pop()
+        self.last_skill = skill
 
-        skill = random.choice(skills)
         target = random.choice(opponents)
         return skill.get_data_key(), target
@@ -21,6 +21,7 @@ from django.conf import settings
 from evennia import DefaultScript
 from evennia.utils import logger
 from muddery.utils import defines
+from muddery.mappings.typeclass_set import TYPECLASS_SET
 
 
 class CStatus(Enum):
@@ -50,10 +51,20 @@ class BaseCombatHandler(DefaultScript):
         {
             "status": character's status
             "char": character's object
+            "team": character's team
         }
         """
         self.characters = {}
 
+        # active characters of every team, {team: {dbref: character}}
+        self.active_teams = {}
+
+        # active and alive characters of every team, {team: {dbref: character}}
+        self.alive_teams = {}
+
+        # cache of every team's opponents, {team: [character]}
+        self.opponents = {}
+
         # if battle is finished
         self.finished = False
         self.winners = {}
@@ -106,6 +117,7 @@ class BaseCombatHandler(DefaultScript):
                 self.characters[character.dbref] = {
                     "char": character,
                     "status":  CStatus.JOINED,
+                    "team": team,
                 }
 
         # Set combat to characters.
@@ -130,8 +142,104 @@ class BaseCombatHandler(DefaultScript):
         """
         Start a combat, make all NPCs to cast skills automatically.
         """
-        for char in self.characters.values():
-            char["status"] = CStatus.ACTIVE
+        for dbref in self.characters:
+            self.set_status(dbref, CStatus.ACTIVE)
+
+    def set_status(self, dbref, status):
+        """
+        Set a character's combat status, and update indexes of teams.
+
+        Args:
+            dbref: (string) character's dbref
+            status: (CStatus) character's new status
+
+        Returns:
+            None
+        """
+        char = self.characters[dbref]
+        char["status"] = status
+        team = char["team"]
+
+        if status == CStatus.ACTIVE:
+            if team not in self.active_teams:
+                self.active_teams[team] = {}
+                self.alive_teams[team] = {}
+            self.active_teams[team][dbref] = char["char"]
+            if char["char"].is_alive():
+                self.alive_teams[team][dbref] = char["char"]
+        else:
+            if team in self.active_teams:
+                self.active_teams[team].pop(dbref, None)
+                self.alive_teams[team].pop(dbref, None)
+
+        # Teams have changed.
+        self.opponents = {}
+
+    def update_alive(self, character):
+        """
+        Update the index of alive characters after the character's status has changed.
+
+        Args:
+            character: (object) character
+
+        Returns:
+            None
+        """
+        if not character or character.dbref not in self.characters:
+            return
+
+        dbref = character.dbref
+        team = self.characters[dbref]["team"]
+        if dbref not in self.active_teams.get(team, {}):
+            return
+
+        if character.is_alive():
+            self.alive_teams[team][dbref] = character
+        else:
+            self.alive_teams[team].pop(dbref, None)
+
+    def has_alive_members(self, team):
+        """
+        If the team has active and alive characters.
+
+        Args:
+            team: team's id
+
+        Returns:
+            boolean
+        """
+        members = self.alive_teams.get(team)
+        if not members:
+            return False
+
+        # Characters may die by other ways, so check them again.
+        for dbref in list(members.keys()):
+            if members[dbref].is_alive():
+                return True
+            del members[dbref]
+
+        return False
+
+    def get_opponents(self, character):
+        """
+        Get the character's active opponents.
+
+        Args:
+            character: (object) character
+
+        Returns:
+            (list) opponents
+        """
+        if character.dbref in self.characters:
+            team = self.characters[character.dbref]["team"]
+        else:
+            team = character.get_team()
+
+        if team not in self.opponents:
+            self.opponents[team] = [opponent for opponent_team, members in self.active_teams.items()
+                                    if opponent_team != team for opponent in members.values()]
+
+        return self.opponents[team]
 
     def show_combat(self, character):
         """
@@ -158,6 +266,10 @@ class BaseCombatHandler(DefaultScript):
         if caller:
             caller.cast_skill(skill_key, target)
 
+            self.update_alive(caller)
+            if target and target != caller:
+                self.update_alive(target)
+
             if self.can_finish():
                 # if there is only one team left, kill this handler
                 self.finish()
@@ -172,15 +284,13 @@ class BaseCombatHandler(DefaultScript):
         if not len(self.characters):
             return False
 
-        teams = set()
-        for char in self.characters.values():
-            if char["status"] == CStatus.ACTIVE:
-                character = char["char"]
-                if character.is_alive():
-                    teams.add(character.get_team())
-                    if len(teams) > 1:
-                        # More than one team has alive characters.
-                        return False
+        teams = 0
+        for team in self.alive_teams:
+            if self.has_alive_members(team):
+                teams += 1
+                if teams > 1:
+                    # More than one team has alive characters.
+                    return False
 
         return True
 
@@ -195,20 +305,18 @@ class BaseCombatHandler(DefaultScript):
 
         # get winners and losers
         winner_team = None
-        for char in self.characters.values():
-            if char["status"] == CStatus.ACTIVE:
-                character = char["char"]
-                if character.is_alive():
-                    winner_team = character.get_team()
-                    break
+        for team in self.alive_teams:
+            if self.has_alive_members(team):
+                winner_team = team
+                break
 
         self.winners = {dbref: char["char"] for dbref, char in self.characters.items()
-                        if char["status"] == CStatus.ACTIVE and char["char"].get_team() == winner_team}
+                        if char["status"] == CStatus.ACTIVE and char["team"] == winner_team}
         self.losers = {dbref: char["char"] for dbref, char in self.characters.items()
-                       if char["status"] == CStatus.ACTIVE and char["char"].get_team() != winner_team}
+                       if char["status"] == CStatus.ACTIVE and char["team"] != winner_team}
 
-        for char in self.characters.values():
-            char["status"] = CStatus.FINISHED
+        for dbref in self.characters:
+            self.set_status(dbref, CStatus.FINISHED)
 
         self.set_combat_results(self.winners, self.losers)
 
@@ -223,7 +331,7 @@ class BaseCombatHandler(DefaultScript):
             None
         """
         if caller and caller.dbref in self.characters:
-            self.characters[caller.dbref]["status"] = CStatus.ESCAPED
+            self.set_status(caller.dbref, CStatus.ESCAPED)
             caller.combat_result(defines.COMBAT_ESCAPED)
 
             if self.can_finish():
@@ -239,20 +347,20 @@ class BaseCombatHandler(DefaultScript):
         if character.dbref in self.characters:
             if self.characters[character.dbref]["status"] == CStatus.LEFT:
                 return
-            self.characters[character.dbref]["status"] = CStatus.LEFT
+            self.set_status(character.dbref, CStatus.LEFT)
 
         all_player_left = True
         for char in self.characters.values():
             if char["status"] != CStatus.LEFT and\
-               char["char"].is_typeclass(settings.BASE_PLAYER_CHARACTER_TYPECLASS, exact=False):
+               TYPECLASS_SET.get_category(char["char"].__class__) == defines.TYPECLASS_CATEGORY_PLAYER:
                 all_player_left = False
                 break
 
         if all_player_left:
             # There is no player character in combat.
-            for char in self.characters.values():
+            for dbref, char in self.characters.items():
                 if char["status"] != CStatus.LEFT:
-                    char["status"] = CStatus.LEFT
+                    self.set_status(dbref, CStatus.LEFT)
                     char["char"].leave_combat()
 
             self.stop()
@@ -0,0 +1,199 @@
+"""
+Combat scheduler.
+
+All characters who cast skills automatically in combats are driven by one scheduler
+instead of one timer for each character. Characters' turns are kept in a heap
+ordered by their due time. The scheduler wakes up at the earliest due time and runs
+all turns that are due in a batch.
+"""
+
+import time, heapq, traceback
+from twisted.internet import reactor
+from evennia.utils import logger
+
+
+class CombatScheduler(object):
+    """
+    Drives characters' turns in combats.
+    """
+    def __init__(self):
+        """
+        Initialize the scheduler.
+        """
+        # turns ordered by due time, item: (due time, sequence, character's id, token)
+        self.heap = []
+
+        # scheduled characters, {character's id: (character, interval, token)}
+        # the token is different every time a character is added, so turns of
+        # removed characters are skipped.
+        self.characters = {}
+
+        self.sequence = 0
+        self.timer = None
+
+        self.reset_stats()
+
+    def add(self, character, interval):
+        """
+        Add a character to the scheduler. Its first turn runs immediately.
+
+        Args:
+            character: (object) the character
+            interval: (float) the interval between turns in seconds
+        """
+        if character.id in self.characters:
+            return
+
+        self.sequence += 1
+        token = self.sequence
+        self.characters[character.id] = (character, interval, token)
+        self.push(time.time(), character.id, token)
+
+    def remove(self, character):
+        """
+        Remove a character from the scheduler.
+
+        Args:
+            character: (object) the character
+        """
+        # Its turns in the heap are skipped.
+        self.characters.pop(character.id, None)
+
+    def has(self, character):
+        """
+        If the character is in the scheduler.
+        """
+        return character.id in self.characters
+
+    def clear(self):
+        """
+        Remove all characters.
+        """
+        self.heap = []
+        self.characters = {}
+        if self.timer and self.timer.active():
+            self.timer.cancel()
+        self.timer = None
+
+    def push(self, due, char_id, token):
+        """
+        Add a turn to the heap.
+        """
+        self.sequence += 1
+        heapq.heappush(self.heap, (due, self.sequence, char_id, token))
+        self.schedule()
+
+    def is_valid(self, char_id, token):
+        """
+        If the turn's character is still in the scheduler.
+        """
+        return char_id in self.characters and self.characters[char_id][2] == token
+
+    def schedule(self):
+        """
+        Set the timer to the earliest turn.
+        """
+        # remove turns of removed characters
+        while self.heap and not self.is_valid(self.heap[0][2], self.heap[0][3]):
+            heapq.heappop(self.heap)
+
+        if not self.heap:
+            if self.timer and self.timer.active():
+                self.timer.cancel()
+            self.timer = None
+            return
+
+        delay = max(self.heap[0][0] - time.time(), 0)
+        if self.timer and self.timer.active():
+            if abs(self.timer.getTime() - reactor.seconds() - delay) < 0.001:
+                return
+            self.timer.reset(delay)
+        else:
+            self.timer = reactor.callLater(delay, self.tick)
+
+    def tick(self):
+        """
+        Run all turns that are due.
+        """
+        self.timer = None
+        now = time.time()
+
+        # get due turns
+        due_turns = []
+        while self.heap and self.heap[0][0] <= now:
+            due, seq, char_id, token = heapq.heappop(self.heap)
+            if self.is_valid(char_id, token):
+                due_turns.append((due, char_id, token))
+
+        if due_turns:
+            lag = now - due_turns[0][0]
+            self.tick_lag = lag
+            if lag > self.max_tick_lag:
+                self.max_tick_lag = lag
+            self.ticks += 1
+
+        for due, char_id, token in due_turns:
+            if not self.is_valid(char_id, token):
+                # removed in this tick
+                continue
+
+            character, interval, token = self.characters[char_id]
+
+            # Set the next turn before running this turn, the character may be removed
+            # in its turn.
+            next_due = due + interval
+            if next_due <= now:
+                # skip missed turns
+                next_due = now + interval
+            self.sequence += 1
+            heapq.heappush(self.heap, (next_due, self.sequence, char_id, token))
+
+            try:
+                self.turns += 1
+                character.auto_cast_skill()
+            except Exception as e:
+                logger.log_errmsg("Auto cast skill error: %s %s" % (character, e))
+                traceback.print_exc()
+
+        self.schedule()
+
+    def stats(self):
+        """
+        Get the scheduler's metrics.
+
+        Returns:
+            (dict) metrics:
+                characters: number of scheduled characters
+                combats: number of active combats of scheduled characters
+                turns_per_second: turns run per second since the last reset
+                tick_lag: delay of the last tick in seconds
+                max_tick_lag: max delay of ticks since the last reset
+        """
+        combats = set()
+        for character, interval, token in self.characters.values():
+            handler = character.ndb.combat_handler
+            if handler:
+                combats.add(handler)
+
+        elapsed = time.time() - self.stats_begin
+        return {"characters": len(self.characters),
+                "combats": len(combats),
+                "ticks": self.ticks,
+                "turns": self.turns,
+                "turns_per_second": self.turns / elapsed if elapsed > 0 else 0,
+                "tick_lag": self.tick_lag,
+                "max_tick_lag": self.max_tick_lag}
+
+    def reset_stats(self):
+        """
+        Reset metrics.
+        """
+        self.stats_begin = time.time()
+        self.ticks = 0
+        self.turns = 0
+        self.tick_lag = 0
+        self.max_tick_lag = 0
+
+
+# main combat scheduler
+COMBAT_SCHEDULER = CombatScheduler()
@@ -47,6 +47,16 @@ class CmdLook(BaseCommand):
             return
 
         if args:
+            virtual_key = caller.get_virtual_object_key(args)
+            if virtual_key:
+                # Look at an object in the compact inventory without creating it.
+                appearance = caller.get_virtual_object_appearance(virtual_key)
+                if not appearance:
+                    caller.msg({"alert": _("Can not find it.")})
+                    return
+                caller.msg({"look_obj": appearance}, context=self.context)
+                return
+
             # Use search to handle duplicate/nonexistant results.
             looking_at_obj = caller.search_dbref(args)
             if not looking_at_obj:
@@ -71,7 +81,7 @@ class CmdLook(BaseCommand):
         if looking_at_obj == caller.location:
             # Clear caller's target.
             caller.clear_target()
-            caller.show_location()
+            caller.show_location(full=True)
             
             if caller.is_in_combat():
                 # If the caller is in combat, add combat info.
@@ -539,18 +549,22 @@ class CmdDiscard(BaseCommand):
             caller.msg({"alert":_("You should discard something.")})
             return
 
-        obj = caller.search_dbref(self.args, location=caller)
-        if not obj:
-            # If the caller does not have this object.
-            caller.msg({"alert":_("You don't have this object.")})
-            return
+        # Objects in the compact inventory are discarded without creating them.
+        obj_key = caller.get_virtual_object_key(self.args)
+        if not obj_key:
+            obj = caller.search_dbref(self.args, location=caller)
+            if not obj:
+                # If the caller does not have this object.
+                caller.msg({"alert":_("You don't have this object.")})
+                return
+            obj_key = obj.get_data_key()
 
         # remove used object
         try:
-            caller.remove_object(obj.get_data_key(), 1)
+            caller.remove_object(obj_key, 1)
         except Exception as e:
             caller.msg({"alert": _("Can not discard this object.")})
-            logger.log_tracemsg("Can not discard object %s: %s" % (obj.get_data_key(), e))
+            logger.log_tracemsg("Can not discard object %s: %s" % (obj_key, e))
             return
 
 
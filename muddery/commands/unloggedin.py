@@ -20,7 +20,7 @@ from muddery.utils.builder import create_player, create_character
 from muddery.utils.localized_strings_handler import _
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.utils.utils import search_obj_data_key
-from muddery.worlddata.dao.common_mappers import EQUIPMENT_POSITIONS
+from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
 
 
 # limit symbol import for API
@@ -519,7 +519,7 @@ class CmdUnconnectedLoginStart(BaseCommand):
         "Show the connect screen."
         game_name = GAME_SETTINGS.get("game_name")
         connection_screen = GAME_SETTINGS.get("connection_screen")
-        records = EQUIPMENT_POSITIONS.all()
+        records = EQUIP_TYPE_HANDLER.get_positions()
         equipment_pos = [{
             "key": r.key,
             "name": r.name,
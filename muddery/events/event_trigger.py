@@ -6,7 +6,7 @@ import random
 from muddery.utils import defines
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils import utils
-from muddery.worlddata.dao import event_mapper
+from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
 from muddery.mappings.event_action_set import EVENT_ACTION_SET
 from django.conf import settings
 from django.apps import apps
@@ -50,30 +50,23 @@ class EventTrigger(object):
     def __init__(self, owner, object_key=None):
         """
         Initialize the handler.
+
+        Args:
+            owner: (object) the owner of the events.
+            object_key: (string) the key of the events' trigger object.
         """
         self.owner = owner
-        self.events = {}
 
         if not object_key:
             object_key = owner.get_data_key()
+        self.object_key = object_key
 
-        # Load events.
-        event_records = event_mapper.get_object_event(object_key)
-
-        for record in event_records:
-            event = {}
-
-            # Set data.
-            event_action = record.action
-            trigger_type = record.trigger_type
-
-            for field in record._meta.fields:
-                event[field.name] = record.serializable_value(field.name)
-            event["action"] = event_action
-
-            if not trigger_type in self.events:
-                self.events[trigger_type] = []
-            self.events[trigger_type].append(event)
+    @property
+    def events(self):
+        """
+        Events of every trigger type, they are shared by all triggers of the same object.
+        """
+        return EVENT_DATA_HANDLER.get_events(self.object_key)
 
     @classmethod
     def all_triggers(cls):
@@ -101,18 +94,39 @@ class EventTrigger(object):
     def can_bypass(self, character):
         """
         If the character can bypass the event, returns True.
+
+        The result is kept in the account's ndb until the account's permissions
+        change or the account puppets a character again.
         """
         if not character:
             return False
 
-        if character.account:
-            if character.account.is_superuser:
-                # superusers can bypass events
+        account = character.account
+        if not account:
+            return False
+
+        bypass = account.ndb.bypass_events
+        if bypass is None:
+            bypass = self.check_bypass(account)
+            account.ndb.bypass_events = bypass
+
+        return bypass
+
+    @staticmethod
+    def check_bypass(account):
+        """
+        If the account can bypass events, returns True.
+        """
+        if account.is_superuser:
+            # superusers can bypass events
+            return True
+
+        for perm in account.permissions.all():
+            if perm in PERMISSION_BYPASS_EVENTS:
+                # has permission to bypass events
                 return True
-            for perm in character.account.permissions.all():
-                if perm in PERMISSION_BYPASS_EVENTS:
-                    # has permission to bypass events
-                    return True
+
+        return False
 
     def trigger(self, event_type, character, obj):
         """
@@ -129,15 +143,14 @@ class EventTrigger(object):
         if not character:
             return False
 
-        if self.can_bypass(character):
+        # Get all event's of this type.
+        event_list = EVENT_DATA_HANDLER.get_trigger_events(self.object_key, event_type)
+        if not event_list:
             return False
 
-        if event_type not in self.events:
+        if self.can_bypass(character):
             return False
 
-        # Get all event's of this type.
-        event_list = self.events[event_type]
-
         candidates = [e for e in event_list
                          if not character.is_event_closed(e["key"]) and
                              STATEMENT_HANDLER.match_condition(e["condition"], character, obj)]
@@ -169,7 +182,7 @@ class EventTrigger(object):
         # Remove room interval actions.
         scripts = character.scripts.all()
         for script in scripts:
-            if script.is_typeclass(ScriptRoomInterval, exact=False):
+            if isinstance(script, ScriptRoomInterval):
                 script.stop()
 
     def at_character_die(self):
@@ -8,6 +8,7 @@ from pkgutil import iter_modules
 from django.conf import settings
 from evennia.utils import logger
 from evennia.utils.utils import class_from_module
+from muddery.utils import defines
 from muddery.utils.exception import MudderyError
 from muddery.utils.utils import classes_in_path, load_modules, get_module_path
 from muddery.typeclasses.base_typeclass import BaseTypeclass
@@ -22,6 +23,9 @@ class TypeclassSet(object):
         self.class_dict = {}
         self.trigger_dict = {}
 
+        # {class: category}
+        self.category_dict = {}
+
         self.all_loaded = False
         self.match_class = re.compile(r'^class\s+(\w+)\s*.*$')
         self.match_key = re.compile(r""" {4}typeclass_key\s*=\s*("|')(.+)("|')\s*$""")
@@ -48,11 +52,11 @@ class TypeclassSet(object):
                 with open(os.path.join(root, filename), "r", encoding="utf-8") as fp:
                     class_name = ""
                     for line in fp.readlines():
-                        if not class_name:
-                            match = self.match_class.match(line)
-                            if match:
-                                class_name = match.group(1)
-                        else:
+                        # A typeclass key belongs to the nearest class above it.
+                        match = self.match_class.match(line)
+                        if match:
+                            class_name = match.group(1)
+                        elif class_name:
                             match = self.match_key.match(line)
                             if match:
                                 key_name = match.group(2)
@@ -86,6 +90,9 @@ class TypeclassSet(object):
             self.class_dict[key] = cls
             self.trigger_dict[key] = cls.get_event_trigger_types()
 
+        for cls in self.class_dict.values():
+            self.get_category(cls)
+
         self.all_loaded = True
 
     def get(self, key):
@@ -135,6 +142,35 @@ class TypeclassSet(object):
 
         return self.trigger_dict.get(key, [])
 
+    def get_category(self, cls):
+        """
+        Get a typeclass's category. The category is checked only once for every class.
+
+        Args:
+            cls: (class) a typeclass.
+
+        Returns:
+            (string) the category, can be defines.TYPECLASS_CATEGORY_EXIT,
+                     TYPECLASS_CATEGORY_NPC, TYPECLASS_CATEGORY_PLAYER or
+                     TYPECLASS_CATEGORY_THING.
+        """
+        category = self.category_dict.get(cls)
+        if category is None:
+            # Check class paths like is_typeclass(), but only once.
+            paths = set([getattr(base, "path", None) for base in cls.mro()])
+            if settings.BASE_PLAYER_CHARACTER_TYPECLASS in paths:
+                category = defines.TYPECLASS_CATEGORY_PLAYER
+            elif settings.BASE_GENERAL_CHARACTER_TYPECLASS in paths:
+                category = defines.TYPECLASS_CATEGORY_NPC
+            elif settings.BASE_EXIT_TYPECLASS in paths:
+                category = defines.TYPECLASS_CATEGORY_EXIT
+            else:
+                category = defines.TYPECLASS_CATEGORY_THING
+
+            self.category_dict[cls] = category
+
+        return category
+
     def get_all_info(self):
         """
         Get all typeclass's information.
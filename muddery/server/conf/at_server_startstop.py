@@ -30,18 +30,42 @@ def at_server_start():
     from muddery.utils.localized_strings_handler import LOCALIZED_STRINGS_HANDLER
     LOCALIZED_STRINGS_HANDLER.reload()
 
+    # rebuild the index of unique objects
+    from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
+    OBJECT_INDEX_HANDLER.reload()
+
     # reset default locations
     from muddery.utils import builder
     builder.reset_default_locations()
     
-    # clear dialogues
+    # reload statement functions and clear compiled statements
+    from muddery.statements.statement_handler import STATEMENT_HANDLER
+    STATEMENT_HANDLER.reload()
+
+    # reload objects' data
+    from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+    OBJECT_DATA_HANDLER.reload()
+
+    # reload events
+    from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
+    EVENT_DATA_HANDLER.reload()
+
+    # reload dialogues
     from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
-    DIALOGUE_HANDLER.clear()
+    DIALOGUE_HANDLER.reload()
     
     # reload equipment types
     from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
     EQUIP_TYPE_HANDLER.reload()
 
+    # reload characters' default skills and objects
+    from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+    CHARACTER_DEFAULTS_HANDLER.reload()
+
+    # delete temporary mobs left by the last run
+    from muddery.utils.mob_pool_handler import MOB_POOL_HANDLER
+    MOB_POOL_HANDLER.reload()
+
     # localize model fields
     from muddery.utils.localiztion_handler import localize_model_fields
     localize_model_fields()
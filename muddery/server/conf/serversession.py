@@ -22,10 +22,16 @@ settings file:
 """
 
 import json
+from twisted.internet import reactor
+from django.conf import settings
 from evennia.server.serversession import ServerSession as BaseServerSession
 from evennia.utils import logger
 
 
+# keys of messages which can be buffered
+BUFFERED_KEYS = {"text", "options", "context"}
+
+
 class ServerSession(BaseServerSession):
     """
     This class represents a player's session and is a template for
@@ -35,18 +41,127 @@ class ServerSession(BaseServerSession):
     to the game server. All communication between game and player goes
     through their session(s).
     """
+    # output metrics of all sessions
+    output_messages = 0
+    output_frames = 0
+    output_bytes = 0
+
+    # buffered messages, they are sent at the end of the reactor tick
+    output_buffer = None
+    output_timer = None
+
     def data_out(self, text=None, **kwargs):
         """
         Send Evennia -> User
         Convert to JSON.
+
+        Messages sent in one reactor tick are merged and sent in one frame at the end of
+        the tick. Set options["immediate"] to True to send a message at once.
+        """
+        data = self.encode_data_out(text, **kwargs)
+        if self.can_buffer_output(**data):
+            self.buffer_output(data["text"])
+        else:
+            # send buffered messages first to keep messages in order
+            self.flush_output()
+            return self.send_data_out(**data)
+
+    def can_buffer_output(self, **kwargs):
+        """
+        Check if encoded data can be merged with other messages.
+
+        Args:
+            kwargs: (dict) encoded data, got from encode_data_out().
+
+        Returns:
+            (boolean) can be buffered or not.
+        """
+        options = kwargs.get("options", None) or {}
+        return settings.OUTPUT_BUFFER and self.protocol_key != 'telnet' and \
+            not options.get("immediate", False) and BUFFERED_KEYS.issuperset(kwargs)
+
+    def buffer_output(self, text):
+        """
+        Add an encoded message to the buffer, it will be sent at the end of the reactor tick.
+
+        Args:
+            text: (string) the encoded message.
+        """
+        if self.output_buffer is None:
+            self.output_buffer = []
+        self.output_buffer.append(text)
+
+        if not self.output_timer:
+            self.output_timer = reactor.callLater(0, self.flush_output)
+
+    def flush_output(self):
+        """
+        Send all buffered messages in one frame.
         """
-        options = None
-        if "options" in kwargs:
-            options = kwargs.get("options", None)
+        if self.output_timer:
+            if self.output_timer.active():
+                self.output_timer.cancel()
+            self.output_timer = None
 
+        buffer = self.output_buffer
+        if not buffer:
+            return
+        self.output_buffer = None
+
+        # The client handles every text argument as a message in order.
+        self.send_data_out(text=buffer, options={"raw": True, "client_raw": True})
+
+    def send_data_out(self, **kwargs):
+        """
+        Send data to the portal.
+        """
+        self.count_output(kwargs.get("text", None))
+        return super(ServerSession, self).data_out(**kwargs)
+
+    @classmethod
+    def count_output(cls, text, frames=1):
+        """
+        Add sent data to output metrics.
+
+        Args:
+            text: (string or list) sent messages.
+            frames: (number) number of sessions which the data is sent to.
+        """
+        texts = text if isinstance(text, list) else [text]
+
+        ServerSession.output_frames += frames
+        ServerSession.output_messages += len(texts) * frames
+        ServerSession.output_bytes += sum([len(t) for t in texts if isinstance(t, str)]) * frames
+
+    @classmethod
+    def output_stats(cls):
+        """
+        Get output metrics of all sessions.
+
+        Returns:
+            (dict) metrics:
+                messages: number of messages sent
+                frames: number of frames sent
+                bytes: length of messages sent
+        """
+        return {"messages": ServerSession.output_messages,
+                "frames": ServerSession.output_frames,
+                "bytes": ServerSession.output_bytes}
+
+    def encode_data_out(self, text=None, **kwargs):
+        """
+        Convert the output to JSON. Sessions of the same protocol get the same result, so
+        the result can be sent to many sessions.
+
+        Returns:
+            (dict) data to send.
+        """
+        options = kwargs.get("options", None)
         if options is None:
             options = {}
-            kwargs["options"] = {}
+        else:
+            options = dict(options)
+        kwargs["options"] = options
 
         raw = options.get("raw", False)
         context = kwargs.get("context", "")
@@ -64,6 +179,7 @@ class ServerSession(BaseServerSession):
                     logger.log_tracemsg("json.dumps failed: %s" % e)
 
             # set raw=True
-            kwargs["options"].update({"raw": True, "client_raw": True})
+            options.update({"raw": True, "client_raw": True})
 
-        return super(ServerSession, self).data_out(text=out_text, **kwargs)
+        kwargs["text"] = out_text
+        return kwargs
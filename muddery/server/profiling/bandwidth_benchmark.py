@@ -0,0 +1,132 @@
+"""
+Measures the bandwidth of a webclient session with and without permessage-deflate.
+
+A player character's session is recorded while it walks through rooms (see
+output_buffer_benchmark). The data sent to the portal is replayed through the
+webclient's encoder to get the websocket messages, which are compressed as
+autobahn does:
+
+    - raw: JSON messages without compression;
+    - deflate: permessage-deflate with context takeover, the sliding window is kept
+      across messages of the connection, as it is accepted by the webclient;
+    - deflate, no context: permessage-deflate without context takeover, every
+      message is compressed alone.
+
+The session is recorded with the output buffer on and off. Websocket frame
+headers are not counted. The character is moved back at the end.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import bandwidth_benchmark
+    bandwidth_benchmark.run()
+
+"""
+
+from django.conf import settings
+from autobahn.websocket.compress_deflate import PerMessageDeflate
+from evennia.objects.models import ObjectDB
+from evennia.server.portal import amp
+from evennia.server.portal.webclient import WebSocketClient
+from muddery.server.profiling.output_buffer_benchmark import step
+from muddery.server.profiling.utils import FakePortal, get_player_character
+
+
+def encode_messages(records):
+    """
+    Encode recorded data to websocket messages as the webclient does.
+
+    Args:
+        records: (list) pickled data sent to the portal.
+
+    Returns:
+        (list) messages in bytes.
+    """
+    client = WebSocketClient()
+    client.protocol_flags = {"ENCODING": "utf-8"}
+
+    messages = []
+    for packed_data in records:
+        sessid, kwargs = amp.loads(packed_data)
+        for line in client.encode_data_out(**kwargs):
+            messages.append(line.encode("utf-8"))
+    return messages
+
+
+def compressed_size(messages, no_context_takeover):
+    """
+    Compress messages as a websocket server with permessage-deflate.
+
+    Args:
+        messages: (list) messages in bytes.
+        no_context_takeover: (boolean) reset the compressor for every message.
+
+    Returns:
+        (int) compressed bytes.
+    """
+    deflate = PerMessageDeflate(True, no_context_takeover, no_context_takeover, 15, 15, 8)
+    size = 0
+    for message in messages:
+        deflate.start_compress_message()
+        size += len(deflate.compress_message_data(message))
+        size += len(deflate.end_compress_message())
+    return size
+
+
+def run(number=100, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) number of steps of the recorded session.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results.
+    """
+    if not character:
+        character = get_player_character()
+
+    rooms = [obj for obj in ObjectDB.objects.all()
+             if obj.is_typeclass(settings.BASE_ROOM_TYPECLASS, exact=False) and obj.get_data_key()]
+    quiet_rooms = [room for room in rooms if not room.event.events]
+    if len(quiet_rooms) < 2:
+        print("Less than two rooms have no events.")
+        return
+
+    location = character.location
+    output_buffer = settings.OUTPUT_BUFFER
+    records = {}
+    try:
+        with FakePortal([character], record=True) as portal:
+            for name, buffer in (("buffer off", False), ("buffer on", True)):
+                settings.OUTPUT_BUFFER = buffer
+                portal.reset()
+                for i in range(number):
+                    step(character, quiet_rooms[i % len(quiet_rooms)], portal)
+                records[name] = portal.protocol.records
+    finally:
+        settings.OUTPUT_BUFFER = output_buffer
+        character.move_to(location, quiet=True)
+
+    results = {}
+    for name, record in records.items():
+        messages = encode_messages(record)
+        results[name] = {
+            "messages": len(messages),
+            "raw": sum([len(message) for message in messages]),
+            "deflate": compressed_size(messages, False),
+            "deflate, no context": compressed_size(messages, True),
+        }
+
+    print("%d steps through %d rooms." % (number, len(quiet_rooms)))
+    for name, result in results.items():
+        print("%s, %d messages:" % (name, result["messages"]))
+        for method in ("raw", "deflate", "deflate, no context"):
+            print("    %-19s  %8d bytes  %6.0f bytes/step  %5.1f%%" %
+                  (method,
+                   result[method],
+                   result[method] / number,
+                   result[method] * 100 / result["raw"]))
+
+    return results
@@ -0,0 +1,90 @@
+"""
+Measures broadcasting messages to a room full of players.
+
+A temporary room is filled with player characters, each of them has a websocket
+session. Messages are broadcast to the room in two ways:
+
+    - multicast: the room's msg_contents(), which encodes a message once and sends
+      it to the portal in one AMP message;
+    - per recipient: call every object's msg() in the room, as msg_contents() did
+      before.
+
+Output buffering is turned off, so every message is sent at once. Messages are
+not sent to the portal, but they are pickled as they are before sending. The
+benchmark prints the time, AMP messages and bytes of a broadcast. The room and
+characters are deleted at the end.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import broadcast_benchmark
+    broadcast_benchmark.run()
+
+"""
+
+from django.conf import settings
+from evennia.utils import create
+from muddery.server.profiling.utils import Measure, FakePortal
+
+
+def broadcast_by_multicast(room, message):
+    room.msg_contents(message)
+
+
+def broadcast_per_recipient(room, message):
+    for obj in room.contents:
+        obj.msg(message)
+
+
+def run(number=100, players=200):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) number of broadcasts.
+        players: (int) number of players in the room.
+
+    Returns:
+        (dict) results.
+    """
+    message = {"msg": "A message to everyone in the room."}
+
+    room = create.create_object(settings.BASE_ROOM_TYPECLASS, "benchmark_room", nohome=True)
+    characters = []
+    output_buffer = settings.OUTPUT_BUFFER
+    results = {}
+    try:
+        for i in range(players):
+            characters.append(create.create_object(settings.BASE_PLAYER_CHARACTER_TYPECLASS,
+                                                   "benchmark_player_%d" % i,
+                                                   location=room,
+                                                   home=room))
+
+        settings.OUTPUT_BUFFER = False
+        with FakePortal(characters) as portal:
+            for name, broadcast in (("multicast", broadcast_by_multicast),
+                                    ("per recipient", broadcast_per_recipient)):
+                broadcast(room, message)
+                portal.reset()
+                with Measure() as measure:
+                    for i in range(number):
+                        broadcast(room, message)
+                results[name] = dict(time=measure.time,
+                                     queries=measure.queries,
+                                     messages=portal.protocol.messages,
+                                     bytes=portal.protocol.bytes)
+    finally:
+        settings.OUTPUT_BUFFER = output_buffer
+        for character in characters:
+            character.delete()
+        room.delete()
+
+    print("%d players, %d broadcasts." % (players, number))
+    for name, result in results.items():
+        print("%-13s  %.2fms/broadcast  %.1f AMP messages/broadcast  %.0f bytes/broadcast  %.1f queries/broadcast" %
+              (name,
+               result["time"] * 1000 / number,
+               result["messages"] / number,
+               result["bytes"] / number,
+               result["queries"] / number))
+
+    return results
@@ -0,0 +1,94 @@
+"""
+Measures loading objects' data at a cold start.
+
+Adds records of temporary common objects to the world data, then loads the data of
+every object in two ways:
+
+    - query: query every model of every object, as objects did before the data
+      snapshot was added;
+    - snapshot: reload OBJECT_DATA_HANDLER and read records from it.
+
+The records are deleted at the end. Creating game objects is not included.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import cold_start_benchmark
+    cold_start_benchmark.run(10000)
+
+"""
+
+from django.apps import apps
+from django.conf import settings
+from django.db import router, transaction
+from muddery.mappings.typeclass_set import TYPECLASS
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.server.profiling.utils import Measure
+
+
+KEY_PREFIX = "benchmark_object_"
+
+
+def load_by_query(keys, model_names):
+    """
+    Load every object's records with queries.
+    """
+    model_objs = [apps.get_model(settings.WORLD_DATA_APP, name) for name in model_names]
+    for key in keys:
+        for model_obj in model_objs:
+            data = model_obj.objects.get(key=key)
+            for field in data._meta.fields:
+                data.serializable_value(field.name)
+
+
+def load_by_snapshot(keys, model_names):
+    """
+    Load every object's records from the snapshot.
+    """
+    OBJECT_DATA_HANDLER.reload()
+    for key in keys:
+        for model_name in model_names:
+            data = OBJECT_DATA_HANDLER.get_record(model_name, key)
+            for field_name, value in zip(data._fields, data):
+                pass
+
+
+def run(number=10000):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) number of objects.
+
+    Returns:
+        (dict) results.
+    """
+    typeclass = TYPECLASS("COMMON_OBJECT")
+    model_names = typeclass.get_models()
+    model_objs = [apps.get_model(settings.WORLD_DATA_APP, name) for name in model_names]
+    object_model = apps.get_model(settings.WORLD_DATA_APP, TYPECLASS("OBJECT").model_name)
+
+    keys = [KEY_PREFIX + str(i) for i in range(number)]
+    results = {}
+    try:
+        with transaction.atomic(using=router.db_for_write(object_model)):
+            for model_obj in model_objs:
+                if model_obj is object_model:
+                    records = [model_obj(key=key, typeclass=typeclass.typeclass_key, name=key) for key in keys]
+                else:
+                    records = [model_obj(key=key) for key in keys]
+                model_obj.objects.bulk_create(records)
+
+        for name, load in (("query", load_by_query), ("snapshot", load_by_snapshot)):
+            with Measure() as measure:
+                load(keys, model_names)
+            results[name] = {"time": measure.time, "queries": measure.queries}
+    finally:
+        for model_obj in model_objs:
+            model_obj.objects.filter(key__startswith=KEY_PREFIX).delete()
+        OBJECT_DATA_HANDLER.reload()
+
+    print("%d objects of %d tables." % (number, len(model_names)))
+    for name, result in results.items():
+        print("%-8s  %.3fs  %d queries" % (name, result["time"], result["queries"]))
+
+    return results
@@ -0,0 +1,98 @@
+"""
+Measures the cache of const condition functions.
+
+Puts a player character in every room, shows the room to it and talks to every
+NPC in it. Prints the hits and misses of STATEMENT_HANDLER's const function
+cache, and the time with and without the cache. Cached condition results are
+cleared before every call, so that conditions are checked again.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import const_cache_benchmark
+    const_cache_benchmark.run()
+
+"""
+
+import contextlib
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from muddery.statements.statement_handler import STATEMENT_HANDLER
+from muddery.server.profiling.utils import Measure, get_player_character
+
+
+def show_rooms(character, rooms, number):
+    """
+    Show every room and talk to its NPCs.
+
+    Args:
+        character: (object) the player character.
+        rooms: (list) rooms.
+        number: (int) times of showing every room.
+    """
+    for room in rooms:
+        character.location = room
+        npcs = [obj for obj in room.contents
+                if obj.is_typeclass(settings.BASE_GENERAL_CHARACTER_TYPECLASS, exact=False) and
+                not obj.is_typeclass(settings.BASE_PLAYER_CHARACTER_TYPECLASS, exact=False)]
+
+        for i in range(number):
+            STATEMENT_HANDLER.condition_results.clear()
+            character.show_location(full=True)
+
+            for npc in npcs:
+                STATEMENT_HANDLER.condition_results.clear()
+                character.talk_to_npc(npc)
+
+
+def run(number=20, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) times of showing every room.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results with and without the cache.
+    """
+    if not character:
+        character = get_player_character()
+
+    rooms = [obj for obj in ObjectDB.objects.all()
+             if obj.is_typeclass(settings.BASE_ROOM_TYPECLASS, exact=False) and obj.get_data_key()]
+
+    location = character.location
+    memoize = STATEMENT_HANDLER.memoize
+    results = {}
+    try:
+        # warm up caches
+        show_rooms(character, rooms, 1)
+
+        STATEMENT_HANDLER.const_cache.reset_stats()
+        with Measure() as measure:
+            show_rooms(character, rooms, number)
+        results["cached"] = dict(STATEMENT_HANDLER.const_cache.stats(), time=measure.time, queries=measure.queries)
+
+        # without the cache
+        STATEMENT_HANDLER.memoize = contextlib.nullcontext
+        STATEMENT_HANDLER.const_cache.reset_stats()
+        with Measure() as measure:
+            show_rooms(character, rooms, number)
+        results["uncached"] = dict(STATEMENT_HANDLER.const_cache.stats(), time=measure.time, queries=measure.queries)
+    finally:
+        STATEMENT_HANDLER.memoize = memoize
+        character.location = location
+
+    calls = number * len(rooms)
+    for name, result in results.items():
+        total = result["hits"] + result["misses"]
+        print("%-8s  hits: %d  misses: %d  hit rate: %.1f%%  %.3fms/room  %.1f queries/room" %
+              (name,
+               result["hits"],
+               result["misses"],
+               result["hits"] * 100.0 / total if total else 0,
+               result["time"] * 1000 / calls,
+               result["queries"] / calls))
+
+    return results
@@ -0,0 +1,108 @@
+"""
+Micro-benchmark of statement function instances.
+
+Compares calling statement functions with instances from the per-thread pool and
+with a new instance on every call. It reports the time, the number of created
+instances and the memory traced by tracemalloc. It does not use the game's
+database.
+
+Usage, in the game's shell (muddery shell):
+
+    from muddery.server.profiling import function_pool_benchmark
+    function_pool_benchmark.run(100000)
+
+"""
+
+import time
+import tracemalloc
+from muddery.statements.statement_function import StatementFunction
+
+
+class PooledFunction(StatementFunction):
+    """
+    A function uses instances from the pool.
+    """
+    key = "pooled_function"
+    const = True
+
+    # number of created instances
+    created = 0
+
+    def __init__(self):
+        super(PooledFunction, self).__init__()
+        type(self).created += 1
+
+    def func(self):
+        return self.args[0]
+
+
+class NewFunction(PooledFunction):
+    """
+    A function creates a new instance on every call.
+    """
+    key = "new_function"
+    reusable = False
+
+
+def measure(func_cls, number):
+    """
+    Call the function for number times.
+
+    Args:
+        func_cls: (class) the function's class.
+        number: (int) times of calls.
+
+    Returns:
+        (dict) the time, created instances and traced memory.
+    """
+    call = func_cls.call
+    args = (1,)
+
+    # time without tracing memory
+    begin = time.perf_counter()
+    for i in range(number):
+        call(None, None, args)
+    cost = time.perf_counter() - begin
+
+    func_cls.created = 0
+    tracemalloc.start()
+    begin_memory, begin_peak = tracemalloc.get_traced_memory()
+
+    for i in range(number):
+        call(None, None, args)
+
+    end_memory, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "time": cost,
+        "created": func_cls.created,
+        "memory": end_memory - begin_memory,
+        "peak": peak - begin_memory,
+    }
+
+
+def run(number=100000):
+    """
+    Call functions in both ways and print the results.
+
+    Args:
+        number: (int) times of calls.
+
+    Returns:
+        (dict) results of the pooled and new instances.
+    """
+    results = {
+        "pooled": measure(PooledFunction, number),
+        "new": measure(NewFunction, number),
+    }
+
+    for name, result in results.items():
+        print("%-6s  %.3fus/call  created: %d  memory: %d bytes  peak: %d bytes" %
+              (name,
+               result["time"] * 1000000 / number,
+               result["created"],
+               result["memory"],
+               result["peak"]))
+
+    return results
@@ -0,0 +1,100 @@
+"""
+Measures spawning, fighting and despawning temporary mobs.
+
+Every round spawns a temporary mob, hurts it, rolls its loots for a player
+character, then despawns it. Mobs are spawned in two ways:
+
+    - pool: get mobs from MOB_POOL_HANDLER and put them back;
+    - build: build a new mob and delete it after the fight, as before the pool was
+      added.
+
+The combat handler is not used. Pooled mobs are deleted at the end.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import mob_pool_benchmark
+    mob_pool_benchmark.run()
+
+"""
+
+from django.apps import apps
+from django.conf import settings
+from muddery.utils import defines
+from muddery.utils.builder import build_object
+from muddery.utils.mob_pool_handler import MOB_POOL_HANDLER
+from muddery.server.profiling.utils import Measure, get_player_character
+
+
+def fight(mob, character):
+    """
+    Hurt the mob and roll its loots.
+    """
+    mob.is_temp = True
+    mob.set_target(character)
+    mob.change_properties({"hp": -1})
+    mob.loot_handler.get_obj_list(character)
+
+
+def spawn_by_pool(mob_key, level, character):
+    mob = MOB_POOL_HANDLER.acquire(mob_key, level)
+    fight(mob, character)
+    MOB_POOL_HANDLER.release(mob)
+
+
+def spawn_by_build(mob_key, level, character):
+    mob = build_object(mob_key, level, reset_location=False)
+    mob.tags.add(defines.TEMP_MOB_TAG, category=defines.TEMP_MOB_TAG_CATEGORY)
+    fight(mob, character)
+    mob.delete()
+
+
+def run(number=100, mob_key=None, level=1, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) rounds of fights.
+        mob_key: (string, optional) the mob's key, use the first world NPC if it is not
+                 given.
+        level: (int) the mob's level.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results.
+    """
+    if not character:
+        character = get_player_character()
+
+    if not mob_key:
+        record = apps.get_model(settings.WORLD_DATA_APP, "world_npcs").objects.first()
+        if not record:
+            print("No NPCs.")
+            return
+        mob_key = record.key
+
+    results = {}
+    try:
+        for name, spawn in (("pool", spawn_by_pool), ("build", spawn_by_build)):
+            spawn(mob_key, level, character)
+            MOB_POOL_HANDLER.reset_stats()
+            with Measure() as measure:
+                for i in range(number):
+                    spawn(mob_key, level, character)
+            results[name] = dict(time=measure.time, queries=measure.queries)
+            if name == "pool":
+                results[name].update(MOB_POOL_HANDLER.stats())
+    finally:
+        MOB_POOL_HANDLER.clear()
+
+    print("Mob %s, level %s, %d rounds." % (mob_key, level, number))
+    for name, result in results.items():
+        print("%-5s  %.2fms/round  %.1f queries/round  %.1f rounds/s" %
+              (name,
+               result["time"] * 1000 / number,
+               result["queries"] / number,
+               number / result["time"]))
+    print("pool stats: hits %(hits)d, misses %(misses)d, releases %(releases)d, discards %(discards)d"
+          % results["pool"])
+
+    return results
@@ -0,0 +1,79 @@
+"""
+Measures at_character_move_in() of rooms' event triggers.
+
+The character is puppeted by a temporary account without permissions, so events
+are not bypassed. The account is deleted at the end. It measures:
+
+    - at_character_move_in() of rooms without events,
+    - the bypass check with the result cached in the account, and without the cache.
+
+Events' actions may change the character, so rooms with events are not entered.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import move_in_benchmark
+    move_in_benchmark.run()
+
+"""
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from evennia.utils import create
+from muddery.events.event_trigger import EventTrigger
+from muddery.server.profiling.utils import Measure, get_player_character
+
+
+def run(number=10000, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) times of calls.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results.
+    """
+    if not character:
+        character = get_player_character()
+
+    rooms = [obj for obj in ObjectDB.objects.all()
+             if obj.is_typeclass(settings.BASE_ROOM_TYPECLASS, exact=False) and obj.get_data_key()]
+    quiet_rooms = [room for room in rooms if not room.event.events]
+    if not quiet_rooms:
+        print("All rooms have events.")
+        return
+
+    original_account = character.account
+    account = create.create_account("benchmark_account", None, "benchmark_password")
+    results = {}
+    try:
+        character.account = account
+        event = quiet_rooms[0].event
+
+        with Measure() as measure:
+            for i in range(number):
+                event.at_character_move_in(character)
+        results["move_in"] = {"time": measure.time, "queries": measure.queries}
+
+        event.can_bypass(character)
+        with Measure() as measure:
+            for i in range(number):
+                event.can_bypass(character)
+        results["bypass_cached"] = {"time": measure.time, "queries": measure.queries}
+
+        with Measure() as measure:
+            for i in range(number):
+                EventTrigger.check_bypass(account)
+        results["bypass_uncached"] = {"time": measure.time, "queries": measure.queries}
+    finally:
+        character.account = original_account
+        account.delete()
+
+    print("%d rooms, %d of them have no events." % (len(rooms), len(quiet_rooms)))
+    for name, result in results.items():
+        print("%-16s  %.2fus/call  %.3f queries/call" %
+              (name, result["time"] * 1000000 / number, result["queries"] / number))
+
+    return results
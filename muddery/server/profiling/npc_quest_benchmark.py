@@ -0,0 +1,94 @@
+"""
+Measures get_surroundings() in a room of NPCs.
+
+Builds copies of the world's NPCs in a room, then gets the room's surroundings
+for a player character. It prints the time and queries of get_surroundings(), and
+the time of checking NPCs' quests by have_quest() and by walking all their
+dialogues. Cached condition results are cleared before every call. The NPCs are
+deleted at the end.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import npc_quest_benchmark
+    npc_quest_benchmark.run(20)
+
+"""
+
+from django.apps import apps
+from django.conf import settings
+from muddery.utils.builder import build_object
+from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from muddery.statements.statement_handler import STATEMENT_HANDLER
+from muddery.server.profiling.utils import Measure, get_player_character
+
+
+def walk_dialogues(caller, npc):
+    """
+    Check an NPC's quests by walking all its dialogues.
+    """
+    visited = set()
+    for dlg_key in npc.dialogues:
+        DIALOGUE_HANDLER.dialogue_have_quest(caller, npc, dlg_key, visited=visited)
+
+
+def run(npc_number=20, number=100, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        npc_number: (int) number of NPCs in the room.
+        number: (int) times of getting surroundings.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results.
+    """
+    if not character:
+        character = get_player_character()
+
+    npc_keys = [record.key for record in apps.get_model(settings.WORLD_DATA_APP, "world_npcs").objects.all()]
+    if not npc_keys:
+        print("No NPCs.")
+        return
+
+    room = character.location
+    npcs = []
+    results = {}
+    visible = 0
+    try:
+        for i in range(npc_number):
+            npc = build_object(npc_keys[i % len(npc_keys)], reset_location=False)
+            npc.move_to(room, quiet=True, to_none=True, use_destination=False)
+            npcs.append(npc)
+
+        visible = len(room.get_surroundings(character)["npcs"])
+        with Measure() as measure:
+            for i in range(number):
+                STATEMENT_HANDLER.condition_results.clear()
+                room.get_surroundings(character)
+        results["get_surroundings"] = {"time": measure.time, "queries": measure.queries}
+
+        with Measure() as measure:
+            for i in range(number):
+                STATEMENT_HANDLER.condition_results.clear()
+                for npc in npcs:
+                    DIALOGUE_HANDLER.have_quest(character, npc)
+        results["have_quest"] = {"time": measure.time, "queries": measure.queries}
+
+        with Measure() as measure:
+            for i in range(number):
+                STATEMENT_HANDLER.condition_results.clear()
+                for npc in npcs:
+                    walk_dialogues(character, npc)
+        results["walk_dialogues"] = {"time": measure.time, "queries": measure.queries}
+    finally:
+        for npc in npcs:
+            npc.delete()
+
+    print("%d NPCs, %d are visible." % (npc_number, visible))
+    for name, result in results.items():
+        print("%-16s  %.3fms/room  %.1f queries/room" %
+              (name, result["time"] * 1000 / number, result["queries"] / number))
+
+    return results
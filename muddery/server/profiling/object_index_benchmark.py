@@ -0,0 +1,71 @@
+"""
+Measures searching unique objects by their data keys.
+
+Does what the goto command does to find exits in a direction: gets every room's
+exits, searches every exit by its key and gets its destination. Exits are searched
+in two ways:
+
+    - index: utils.search_obj_data_key(), which reads OBJECT_INDEX_HANDLER;
+    - query: the attribute query that was used before the index was added.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import object_index_benchmark
+    object_index_benchmark.run()
+
+"""
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from evennia.utils import search
+from muddery.utils.utils import search_obj_data_key
+from muddery.server.profiling.utils import Measure
+
+
+def search_by_query(key):
+    """
+    Search objects with the attribute query.
+    """
+    return search.search_object_attribute(key="key", strvalue=key, category=settings.DATA_KEY_CATEGORY)
+
+
+def find_exits(rooms, search_func):
+    """
+    Search every room's exits and get their destinations.
+    """
+    for room in rooms:
+        for exit_key in room.get_exits():
+            exit_obj = search_func(exit_key)
+            if exit_obj:
+                exit_obj[0].destination
+
+
+def run(number=100):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) times of searching all exits.
+
+    Returns:
+        (dict) results.
+    """
+    rooms = [obj for obj in ObjectDB.objects.all()
+             if obj.is_typeclass(settings.BASE_ROOM_TYPECLASS, exact=False) and obj.get_data_key()]
+    exits = sum(len(room.get_exits()) for room in rooms)
+
+    results = {}
+    for name, search_func in (("index", search_obj_data_key), ("query", search_by_query)):
+        find_exits(rooms, search_func)
+        with Measure() as measure:
+            for i in range(number):
+                find_exits(rooms, search_func)
+        results[name] = {"time": measure.time, "queries": measure.queries}
+
+    calls = number * len(rooms)
+    print("%d rooms, %d exits." % (len(rooms), exits))
+    for name, result in results.items():
+        print("%-5s  %.3fms/room  %.2f queries/room" %
+              (name, result["time"] * 1000 / calls, result["queries"] / calls))
+
+    return results
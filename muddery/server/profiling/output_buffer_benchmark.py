@@ -0,0 +1,88 @@
+"""
+Measures the frames and bytes sent to a player with the output buffer on and off.
+
+A player character with a websocket session walks through rooms. Every step is
+one reactor tick: it moves to a room, shows the room, then refreshes the
+character's status, inventory and skills, as after a goto command. Buffered
+messages are flushed at the end of the step. Messages are not sent to the portal,
+but they are pickled as they are before sending.
+
+The benchmark prints frames and bytes of a step, and frames/sec and bytes/sec at
+the speed the server can produce steps. The character is moved back at the end.
+Events' actions may change the character, so rooms with events are not entered.
+
+Usage, in the game's shell (muddery shell) of a test game:
+
+    from muddery.server.profiling import output_buffer_benchmark
+    output_buffer_benchmark.run()
+
+"""
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from muddery.server.profiling.utils import Measure, FakePortal, get_player_character
+
+
+def step(character, room, portal):
+    """
+    Move to a room and refresh the character's information in one tick.
+    """
+    character.move_to(room)
+    character.show_status()
+    character.show_inventory()
+    character.show_skills()
+    portal.flush()
+
+
+def run(number=100, character=None):
+    """
+    Run the benchmark.
+
+    Args:
+        number: (int) number of steps.
+        character: (object, optional) the player character, use the game's first player
+                   character if it is not given.
+
+    Returns:
+        (dict) results.
+    """
+    if not character:
+        character = get_player_character()
+
+    rooms = [obj for obj in ObjectDB.objects.all()
+             if obj.is_typeclass(settings.BASE_ROOM_TYPECLASS, exact=False) and obj.get_data_key()]
+    quiet_rooms = [room for room in rooms if not room.event.events]
+    if len(quiet_rooms) < 2:
+        print("Less than two rooms have no events.")
+        return
+
+    location = character.location
+    output_buffer = settings.OUTPUT_BUFFER
+    results = {}
+    try:
+        with FakePortal([character]) as portal:
+            for name, buffer in (("buffer off", False), ("buffer on", True)):
+                settings.OUTPUT_BUFFER = buffer
+                step(character, quiet_rooms[0], portal)
+                portal.reset()
+                with Measure() as measure:
+                    for i in range(number):
+                        step(character, quiet_rooms[(i + 1) % len(quiet_rooms)], portal)
+                results[name] = dict(time=measure.time,
+                                     frames=portal.protocol.messages,
+                                     bytes=portal.protocol.bytes)
+    finally:
+        settings.OUTPUT_BUFFER = output_buffer
+        character.move_to(location, quiet=True)
+
+    print("%d steps through %d rooms." % (number, len(quiet_rooms)))
+    for name, result in results.items():
+        print("%-10s  %.1f frames/step  %.0f bytes/step  %.0f frames/s  %.0f bytes/s  %.2fms/step" %
+              (name,
+               result["frames"] / number,
+               result["bytes"] / number,
+               result["frames"] / result["time"],
+               result["bytes"] / result["time"],
+               result["time"] * 1000 / number))
+
+    return results
@@ -0,0 +1,113 @@
+"""
+Micro-benchmark of conditions.
+
+Compares the old way of checking conditions, which replaces every function call
+by its result with a regular expression and evaluates the string, with compiled
+conditions. It does not use the game's database.
+
+Usage, in the game's shell (muddery shell):
+
+    from muddery.server.profiling import statement_benchmark
+    statement_benchmark.run(10000)
+
+"""
+
+import re
+import ast
+import timeit
+from muddery.statements.statement_compiler import compile_condition
+from muddery.statements.statement_func_set import BaseStatementFuncSet
+from muddery.statements.statement_function import StatementFunction
+
+
+CONDITIONS = [
+    'is_quest_finished("quest_1")',
+    'is_quest_finished("quest_1") and not has_object("key", 2)',
+    '(is_quest_finished("quest_1") or has_object("key", 2)) and not is_quest_finished("quest_2")',
+]
+
+
+class IsQuestFinished(StatementFunction):
+    key = "is_quest_finished"
+    const = True
+
+    def func(self):
+        return self.args[0] == "quest_1"
+
+
+class HasObject(StatementFunction):
+    key = "has_object"
+    const = True
+
+    def func(self):
+        return self.args[1] > 1
+
+
+class BenchmarkFuncSet(BaseStatementFuncSet):
+    def at_creation(self):
+        self.add(IsQuestFinished)
+        self.add(HasObject)
+
+
+# The old way of checking conditions.
+re_function = re.compile(r'[a-zA-Z_][a-zA-Z0-9_\.]*\(.*?\)')
+
+
+def regex_condition(func_set, condition, caller, obj):
+    """
+    Check a condition with regular expressions and eval.
+    """
+    def function(word):
+        func_word = word.group()
+        pos = func_word.index("(")
+        func_key = func_word[:pos]
+        func_args = ast.literal_eval(func_word[pos:])
+        if type(func_args) != tuple:
+            func_args = (func_args,)
+
+        func_obj = func_set.get_func_class(func_key)()
+        func_obj.set(caller, obj, func_args)
+        return "True" if func_obj.func() else "False"
+
+    return eval(re_function.sub(function, condition))
+
+
+def run(number=10000):
+    """
+    Check every condition for number times in both ways, and print the time.
+
+    Args:
+        number: (int) times of checks.
+
+    Returns:
+        (list) (condition, regex time, compiled time) of every condition.
+    """
+    func_set = BenchmarkFuncSet()
+
+    # compiled conditions are cached by STATEMENT_HANDLER
+    compiled = {}
+
+    def compiled_condition(condition, caller, obj):
+        try:
+            function = compiled[condition]
+        except KeyError:
+            function = compile_condition(func_set, condition)
+            compiled[condition] = function
+        return function(caller, obj, {})
+
+    results = []
+    for condition in CONDITIONS:
+        assert bool(regex_condition(func_set, condition, None, None)) == \
+               bool(compiled_condition(condition, None, None))
+
+        regex_time = timeit.timeit(lambda: regex_condition(func_set, condition, None, None), number=number)
+        compiled_time = timeit.timeit(lambda: compiled_condition(condition, None, None), number=number)
+        results.append((condition, regex_time, compiled_time))
+
+        print("%s\n    regex+eval: %.2fus  compiled: %.2fus  (x%.1f)" %
+              (condition,
+               regex_time * 1000000 / number,
+               compiled_time * 1000000 / number,
+               regex_time / compiled_time))
+
+    return results
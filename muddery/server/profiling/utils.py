@@ -0,0 +1,154 @@
+"""
+Helpers of benchmarks. Benchmarks run in the game's shell (muddery shell), on a
+test game. Some of them create and delete objects.
+"""
+
+import time
+import types
+from twisted.internet import defer
+from django.conf import settings
+from django.db import connections
+from evennia.objects.models import ObjectDB
+from evennia.server.amp_client import AMPServerClientProtocol
+from evennia.server.sessionhandler import SESSIONS
+from evennia.utils.utils import class_from_module
+
+
+class Measure(object):
+    """
+    Measures the time and database queries of a block:
+
+        with Measure() as measure:
+            ...
+        print(measure.time, measure.queries)
+    """
+    def __init__(self):
+        self.time = 0
+        self.queries = 0
+        self.contexts = []
+        self.begin = 0
+
+    def count_query(self, execute, sql, params, many, context):
+        """
+        Count a query on any database.
+        """
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self.queries = 0
+        self.contexts = [connections[alias].execute_wrapper(self.count_query) for alias in connections]
+        for context in self.contexts:
+            context.__enter__()
+
+        self.begin = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.time = time.perf_counter() - self.begin
+
+        for context in self.contexts:
+            context.__exit__(exc_type, exc_value, traceback)
+
+
+def get_player_character():
+    """
+    Get a player character of the game.
+
+    Returns:
+        (object) a player character, or None.
+    """
+    for obj in ObjectDB.objects.all():
+        if obj.is_typeclass(settings.BASE_PLAYER_CHARACTER_TYPECLASS, exact=False):
+            return obj
+
+
+class RecordingProtocol(AMPServerClientProtocol):
+    """
+    An AMP protocol which records the data the server sends to the portal. Data is
+    pickled as it is before sending across AMP, but it is not sent.
+    """
+    def __init__(self, record=False):
+        """
+        Args:
+            record: (boolean) keep the pickled data in self.records.
+        """
+        self.messages = 0
+        self.bytes = 0
+        self.records = [] if record else None
+
+    def callRemote(self, command, **kwargs):
+        """
+        Count a message instead of sending it.
+        """
+        packed_data = kwargs.get("packed_data", b"")
+        self.messages += 1
+        self.bytes += len(packed_data)
+        if self.records is not None:
+            self.records.append(packed_data)
+        return defer.succeed(None)
+
+
+class FakePortal(object):
+    """
+    Connects objects to sessions which send data to a RecordingProtocol, as
+    players connected through a portal:
+
+        with FakePortal(objects) as portal:
+            ...
+        print(portal.protocol.messages, portal.protocol.bytes)
+    """
+    def __init__(self, objects, protocol_key="websocket", record=False):
+        """
+        Args:
+            objects: (list) objects to connect.
+            protocol_key: (string) the sessions' protocol.
+            record: (boolean) keep the data sent to the portal.
+        """
+        self.objects = objects
+        self.protocol_key = protocol_key
+        self.protocol = RecordingProtocol(record)
+        self.sessions = []
+        self.server = None
+
+    def __enter__(self):
+        self.server = SESSIONS.server
+        SESSIONS.server = types.SimpleNamespace(amp_protocol=self.protocol)
+
+        session_class = class_from_module(settings.SERVER_SESSION_CLASS)
+        sessid = max(SESSIONS.keys() or [0]) + 1
+        for obj in self.objects:
+            session = session_class()
+            session.init_session(self.protocol_key, ("127.0.0.1", 0), SESSIONS)
+            session.sessid = sessid
+            session.logged_in = True
+            SESSIONS[sessid] = session
+            obj.sessions.add(session)
+            self.sessions.append(session)
+            sessid += 1
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for obj, session in zip(self.objects, self.sessions):
+            obj.sessions.remove(session)
+            SESSIONS.pop(session.sessid, None)
+        self.sessions = []
+        SESSIONS.server = self.server
+
+    def reset(self):
+        """
+        Reset the records.
+        """
+        self.protocol.messages = 0
+        self.protocol.bytes = 0
+        if self.protocol.records is not None:
+            self.protocol.records = []
+
+    def flush(self):
+        """
+        Send all sessions' buffered messages, as at the end of a reactor tick.
+        """
+        for session in self.sessions:
+            if hasattr(session, "flush_output"):
+                session.flush_output()
@@ -353,6 +353,9 @@ CONDITION_FUNC_SET = "muddery.statements.default_statement_func_set.ConditionFun
 # Skill functions set
 SKILL_FUNC_SET = "muddery.statements.default_statement_func_set.SkillFuncSet"
 
+# The max number of compiled statements kept in the statement handler's cache.
+STATEMENT_CACHE_SIZE = 4096
+
 
 ######################################################################
 # Default command sets
@@ -412,6 +415,21 @@ LOCALIZED_STRINGS_MODEL = "localized_strings"
 # World data API's url path.
 WORLD_DATA_API_PATH = "worlddata/editor/api"
 
+# Load all dialogues when the server starts. If it is False, a dialogue is
+# loaded when it is used at the first time.
+PRELOAD_DIALOGUES = True
+
+# Store players' stackable common objects as (key, level, number) entries in the
+# player character instead of objects. They become objects when they are used.
+COMPACT_INVENTORY = False
+
+# Max number of idle temporary mobs of the same key and level kept for later combats.
+# Set it to 0 to delete temporary mobs after combats.
+MOB_POOL_SIZE = 10
+
+# Merge messages sent to a session in one reactor tick and send them in one frame.
+OUTPUT_BUFFER = True
+
 
 ###################################
 # permissions
@@ -445,3 +463,7 @@ AUTO_COMBAT_TIMEOUT = 60
 ###################################
 AI_CHOOSE_SKILL = "muddery.ai.choose_skill.ChooseSkill"
 
+# Class of characters' skills. It keeps a character's state of a skill and casts
+# the skill.
+CHARACTER_SKILL = "muddery.utils.skill_handler.CharacterSkill"
+
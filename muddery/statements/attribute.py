@@ -4,6 +4,7 @@ Set or get caller's attrubutes.
 
 
 from muddery.statements.statement_function import StatementFunction
+from muddery.utils import defines
 
 
 class FuncSetAttr(StatementFunction):
@@ -51,6 +52,7 @@ class FuncGetAttr(StatementFunction):
 
     key = "get_attr"
     const = True
+    depends_on = defines.STATUS_ATTRIBUTE
 
     def func(self):
         """
@@ -105,6 +107,7 @@ class FuncHasAttr(StatementFunction):
 
     key = "has_attr"
     const = True
+    depends_on = defines.STATUS_ATTRIBUTE
 
     def func(self):
         """
@@ -133,6 +136,7 @@ class FuncCheckAttr(StatementFunction):
 
     key = "check_attr"
     const = True
+    depends_on = defines.STATUS_ATTRIBUTE
 
     def func(self):
         """
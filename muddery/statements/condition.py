@@ -4,6 +4,7 @@ Condition statements return a boolean value. They can be used in conditional sta
 
 
 from muddery.statements.statement_function import StatementFunction
+from muddery.utils import defines
 
 
 class FuncIsQuestInProgress(StatementFunction):
@@ -19,6 +20,7 @@ class FuncIsQuestInProgress(StatementFunction):
 
     key = "is_quest_in_progress"
     const = True
+    depends_on = defines.STATUS_QUEST
 
     def func(self):
         """
@@ -45,6 +47,9 @@ class FuncCanProvideQuest(StatementFunction):
     key = "can_provide_quest"
     const = True
 
+    # It depends on the quest's condition, so its dependencies are unknown.
+    depends_on = None
+
     def func(self):
         """
         Implement the function.
@@ -69,6 +74,7 @@ class FuncIsQuestFinished(StatementFunction):
 
     key = "is_quest_finished"
     const = True
+    depends_on = defines.STATUS_QUEST
 
     def func(self):
         """
@@ -94,6 +100,7 @@ class FuncHasObject(StatementFunction):
 
     key = "has_object"
     const = True
+    depends_on = defines.STATUS_OBJECT
 
     def func(self):
         """
@@ -103,8 +110,4 @@ class FuncHasObject(StatementFunction):
             return False
 
         obj_key = self.args[0]
-
-        for item in self.caller.contents:
-            if item.get_data_key() == obj_key:
-                return True
-        return False
+        return self.caller.has_object(obj_key)
@@ -0,0 +1,119 @@
+"""
+Caches results of conditions for every caller.
+
+A condition only reads some of the caller's status, such as quests, objects and
+statement attributes. Its result is cached until one of them changes. Callers must
+notify their status changes through STATEMENT_HANDLER.state_changed().
+"""
+
+
+class ConditionResultCache(object):
+    """
+    Caches conditions' results of every caller.
+    """
+    def __init__(self):
+        """
+        Initialize the cache.
+        """
+        # {caller's id: {(condition, target's id): result}}
+        self.results = {}
+
+        # conditions that depend on the status
+        # {caller's id: {(status, key): set((condition, target's id))}}
+        self.index = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, caller_id, condition_key):
+        """
+        Get a condition's result. Raise KeyError if it is not in the cache.
+
+        Args:
+            caller_id: (int) caller's id
+            condition_key: (tuple) the condition and the target's id
+
+        Returns:
+            the condition's result
+        """
+        try:
+            result = self.results[caller_id][condition_key]
+        except KeyError:
+            self.misses += 1
+            raise
+
+        self.hits += 1
+        return result
+
+    def set(self, caller_id, condition_key, result, dependencies):
+        """
+        Cache a condition's result.
+
+        Args:
+            caller_id: (int) caller's id
+            condition_key: (tuple) the condition and the target's id
+            result: the condition's result
+            dependencies: (set) a set of (status, key) the condition depends on
+        """
+        if caller_id not in self.results:
+            self.results[caller_id] = {}
+            self.index[caller_id] = {}
+
+        self.results[caller_id][condition_key] = result
+
+        index = self.index[caller_id]
+        for dependency in dependencies:
+            if dependency in index:
+                index[dependency].add(condition_key)
+            else:
+                index[dependency] = {condition_key}
+
+    def invalidate(self, caller_id, status=None, key=None):
+        """
+        Remove results depend on the status.
+
+        Args:
+            caller_id: (int) caller's id
+            status: (string) the status' type, remove all results if it is None
+            key: (string) the status' key, remove all results of the status if it is None
+        """
+        if caller_id not in self.results:
+            return
+
+        if status is None:
+            del self.results[caller_id]
+            del self.index[caller_id]
+            return
+
+        index = self.index[caller_id]
+        if key is None:
+            dependencies = [dep for dep in index if dep[0] == status]
+        else:
+            dependencies = [(status, key), (status, None)]
+
+        results = self.results[caller_id]
+        for dependency in dependencies:
+            for condition_key in index.pop(dependency, ()):
+                results.pop(condition_key, None)
+
+    def clear(self):
+        """
+        Clear all results.
+        """
+        self.results.clear()
+        self.index.clear()
+
+    def stats(self):
+        """
+        Get the cache's hit and miss counters.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "callers": len(self.results)}
+
+    def reset_stats(self):
+        """
+        Reset counters.
+        """
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,109 @@
+"""
+Memoizes results of const statement functions.
+
+Const functions do not change the caller's status, so while a room is rendered or
+a command is executed, they always return the same result with the same args. The
+cache only works in a "with" block:
+
+    with STATEMENT_HANDLER.memoize():
+        ...
+
+Results are cleared when the outermost block exits, or when the caller's status
+changes.
+"""
+
+
+class ConstFunctionCache(object):
+    """
+    Memoizes results of const statement functions while it is active.
+    """
+    def __init__(self):
+        """
+        Initialize the cache.
+        """
+        self.depth = 0
+
+        # results of every caller
+        # {id(caller): {(function's key, args, id(obj)): result}}
+        self.results = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self):
+        self.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.depth -= 1
+        if self.depth <= 0:
+            self.depth = 0
+            self.results.clear()
+
+    def is_active(self):
+        """
+        If the cache is working.
+        """
+        return self.depth > 0
+
+    def call(self, func, caller, obj, func_key, func_args, kwargs):
+        """
+        Call a const function, use the cached result if it has been called.
+
+        Args:
+            func: (function) statement function
+            caller: (object) statement's caller
+            obj: (object) caller's target
+            func_key: (string) function's key
+            func_args: (tuple) function's args
+            kwargs: (dict) function's kwargs
+
+        Returns:
+            function's result
+        """
+        if self.depth <= 0 or kwargs:
+            return func(caller, obj, func_args, **kwargs)
+
+        try:
+            caller_results = self.results[id(caller)]
+        except KeyError:
+            caller_results = self.results[id(caller)] = {}
+
+        key = (func_key, func_args, id(obj))
+        try:
+            result = caller_results[key]
+            self.hits += 1
+            return result
+        except KeyError:
+            pass
+        except TypeError:
+            # args can not be hashed
+            return func(caller, obj, func_args, **kwargs)
+
+        self.misses += 1
+        result = func(caller, obj, func_args, **kwargs)
+        caller_results[key] = result
+        return result
+
+    def invalidate(self, caller):
+        """
+        Remove the caller's results.
+
+        Args:
+            caller: (object) statement's caller
+        """
+        self.results.pop(id(caller), None)
+
+    def stats(self):
+        """
+        Get the cache's hit and miss counters.
+        """
+        return {"hits": self.hits,
+                "misses": self.misses}
+
+    def reset_stats(self):
+        """
+        Reset counters.
+        """
+        self.hits = 0
+        self.misses = 0
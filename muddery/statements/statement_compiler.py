@@ -0,0 +1,311 @@
+"""
+Compile statements into callable objects.
+
+A statement string is parsed only once. Conditions are compiled into a tree of
+closures which evaluates "and" and "or" with short-circuit, actions and skills are
+compiled into lists of function calls.
+
+Every compiled node is called as node(caller, obj, kwargs).
+"""
+
+import ast
+import operator
+import traceback
+from evennia.utils import logger
+from muddery.utils.exception import MudderyError
+
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+UNARY_OPERATORS = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+}
+
+COMPARE_OPERATORS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+def parse_function(func_word):
+    """
+    Separate a function's key and args.
+
+    Args:
+        func_word: (string) function string, such as: func("value")
+
+    Returns:
+        (tuple) function's key and a tuple of args.
+    """
+    func_word = func_word.strip()
+    try:
+        pos = func_word.index("(")
+        func_key = func_word[:pos].strip()
+        func_args = ast.literal_eval(func_word[pos:])
+        if type(func_args) != tuple:
+            func_args = (func_args,)
+    except ValueError:
+        func_key = func_word
+        func_args = ()
+
+    return func_key, func_args
+
+
+def compile_function(func_set, func_key, func_args):
+    """
+    Bind a function to its args.
+
+    Args:
+        func_set: (object) function set
+        func_key: (string) function's key
+        func_args: (tuple) function's args
+
+    Returns:
+        (function) a function returns the statement function's result.
+    """
+    func = func_set.get_func(func_key)
+    if not func:
+        logger.log_errmsg("Statement error: Can not find function: %s." % func_key)
+
+        def missing_function(caller, obj, kwargs):
+            return None
+        return missing_function
+
+    def function(caller, obj, kwargs):
+        return func(caller, obj, func_args, **kwargs)
+
+    return function
+
+
+def compile_actions(func_set, action):
+    """
+    Compile an action or a skill.
+
+    Args:
+        func_set: (object) function set
+        action: (string) statements separated by ";"
+
+    Returns:
+        (list) a list of (function string, compiled function).
+    """
+    functions = []
+    for func_word in action.split(";"):
+        if not func_word.strip():
+            continue
+
+        try:
+            func_key, func_args = parse_function(func_word)
+        except Exception as e:
+            logger.log_errmsg("Statement error: Can not parse function: %s %s" % (func_word, repr(e)))
+            continue
+
+        functions.append((func_word, compile_function(func_set, func_key, func_args)))
+
+    return functions
+
+
+def compile_condition(func_set, condition, const_cache=None):
+    """
+    Compile a condition.
+
+    Args:
+        func_set: (object) condition function set
+        condition: (string) a condition expression
+        const_cache: (ConstFunctionCache, optional) cache of const functions' results
+
+    Returns:
+        (function) the compiled condition.
+    """
+    tree = ast.parse(condition.strip(), mode="eval")
+    return compile_node(func_set, tree.body, const_cache)
+
+
+def compile_node(func_set, node, const_cache=None):
+    """
+    Compile a node of the condition's syntax tree.
+
+    Args:
+        func_set: (object) condition function set
+        node: (ast.AST) the syntax node
+        const_cache: (ConstFunctionCache, optional) cache of const functions' results
+
+    Returns:
+        (function) the compiled node.
+    """
+    if isinstance(node, ast.Call):
+        return compile_condition_function(func_set, node, const_cache)
+
+    if isinstance(node, ast.BoolOp):
+        values = [compile_node(func_set, value, const_cache) for value in node.values]
+
+        if isinstance(node.op, ast.And):
+            def and_node(caller, obj, kwargs):
+                result = True
+                for value in values:
+                    result = value(caller, obj, kwargs)
+                    if not result:
+                        return result
+                return result
+            return and_node
+        else:
+            def or_node(caller, obj, kwargs):
+                result = False
+                for value in values:
+                    result = value(caller, obj, kwargs)
+                    if result:
+                        return result
+                return result
+            return or_node
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = compile_node(func_set, node.operand, const_cache)
+
+        def unary_node(caller, obj, kwargs):
+            return op(operand(caller, obj, kwargs))
+        return unary_node
+
+    if isinstance(node, ast.BinOp) and type(node.op) in BINARY_OPERATORS:
+        op = BINARY_OPERATORS[type(node.op)]
+        left = compile_node(func_set, node.left, const_cache)
+        right = compile_node(func_set, node.right, const_cache)
+
+        def binary_node(caller, obj, kwargs):
+            return op(left(caller, obj, kwargs), right(caller, obj, kwargs))
+        return binary_node
+
+    if isinstance(node, ast.Compare):
+        left = compile_node(func_set, node.left, const_cache)
+        comparisons = []
+        for op, comparator in zip(node.ops, node.comparators):
+            if type(op) not in COMPARE_OPERATORS:
+                raise MudderyError("Unsupported operator: %s" % type(op).__name__)
+            comparisons.append((COMPARE_OPERATORS[type(op)], compile_node(func_set, comparator, const_cache)))
+
+        def compare_node(caller, obj, kwargs):
+            left_value = left(caller, obj, kwargs)
+            for op, right in comparisons:
+                right_value = right(caller, obj, kwargs)
+                if not op(left_value, right_value):
+                    return False
+                left_value = right_value
+            return True
+        return compare_node
+
+    if isinstance(node, ast.IfExp):
+        test = compile_node(func_set, node.test, const_cache)
+        body = compile_node(func_set, node.body, const_cache)
+        orelse = compile_node(func_set, node.orelse, const_cache)
+
+        def if_node(caller, obj, kwargs):
+            if test(caller, obj, kwargs):
+                return body(caller, obj, kwargs)
+            return orelse(caller, obj, kwargs)
+        return if_node
+
+    # Other nodes must be literals.
+    try:
+        value = ast.literal_eval(node)
+    except ValueError:
+        raise MudderyError("Unsupported expression: %s" % type(node).__name__)
+
+    def constant_node(caller, obj, kwargs):
+        return value
+    return constant_node
+
+
+def get_function_key(node):
+    """
+    Get the function's key from a call node, such as: func or module.func.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+    elif isinstance(node, ast.Attribute):
+        return get_function_key(node.value) + "." + node.attr
+
+    raise MudderyError("Unsupported function: %s" % type(node).__name__)
+
+
+def compile_condition_function(func_set, node, const_cache=None):
+    """
+    Compile a function call in conditions. Function's args must be literals.
+
+    The result of the function is converted to a boolean value, and None if an
+    error occurred, as conditions did before they are compiled.
+
+    Results of const and deterministic functions are cached by const_cache.
+    """
+    if node.keywords:
+        raise MudderyError("Statement functions do not accept keyword args.")
+
+    func_key = get_function_key(node.func)
+    func_args = tuple(ast.literal_eval(arg) for arg in node.args)
+
+    func_class = func_set.get_func_class(func_key)
+    if const_cache is not None and func_class and \
+            getattr(func_class, "const", False) and getattr(func_class, "deterministic", True):
+        func = func_set.get_func(func_key)
+
+        def function(caller, obj, kwargs):
+            return const_cache.call(func, caller, obj, func_key, func_args, kwargs)
+    else:
+        function = compile_function(func_set, func_key, func_args)
+
+    def function_node(caller, obj, kwargs):
+        try:
+            return bool(function(caller, obj, kwargs))
+        except Exception as e:
+            logger.log_errmsg("Exec function error: %s%s %s" % (func_key, func_args, repr(e)))
+            traceback.print_exc()
+            return None
+    return function_node
+
+
+def get_condition_dependencies(func_set, condition):
+    """
+    Get the caller's status which a condition reads.
+
+    Args:
+        func_set: (object) condition function set
+        condition: (string) a condition expression
+
+    Returns:
+        (set) a set of (status, key), or None if the dependencies are unknown.
+    """
+    tree = ast.parse(condition.strip(), mode="eval")
+
+    dependencies = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, ast.Call):
+            continue
+
+        func_class = func_set.get_func_class(get_function_key(node.func))
+        if not func_class or not hasattr(func_class, "get_dependencies"):
+            return None
+
+        func_args = tuple(ast.literal_eval(arg) for arg in node.args)
+        func_dependencies = func_class.get_dependencies(func_args)
+        if func_dependencies is None:
+            return None
+
+        dependencies.update(func_dependencies)
+
+    return dependencies
@@ -45,3 +45,27 @@ class BaseStatementFuncSet(object):
             return self.funcs[key]
         else:
             return None
+
+    def get_func(self, key):
+        """
+        Get a callable statement function. It is called as func(caller, obj, args, **kwargs).
+
+        Args:
+            key: statement function's key.
+
+        Returns:
+            function or None
+        """
+        func_cls = self.get_func_class(key)
+        if not func_cls:
+            return None
+
+        if hasattr(func_cls, "call"):
+            return func_cls.call
+
+        # Function classes which are not derived from StatementFunction.
+        def func(caller, obj, args, **kwargs):
+            func_obj = func_cls()
+            func_obj.set(caller, obj, args, **kwargs)
+            return func_obj.func()
+        return func
@@ -2,11 +2,22 @@
 Base statement function.
 """
 
+import threading
+
+
+# Free function instances of each thread.
+_local = threading.local()
+
 
 class StatementFunction(object):
     """
     This is the base statement function class.
 
+    Call a function by StatementFunction.call(caller, obj, args, **kwargs). Function
+    instances are reused, so a function should only keep its state in caller, obj,
+    args and kwargs. Set reusable to False if the function needs a new instance on
+    every call.
+
     Args:
         args[0]: statement function's args
 
@@ -21,6 +32,21 @@ class StatementFunction(object):
     # only const functions can be used in conditions.
     const = False
 
+    # If a const function always returns the same result with the same args
+    # when the caller's status does not change, its results can be cached.
+    deterministic = True
+
+    # The caller's status which a const function reads, it is defined in
+    # utils.defines, such as STATUS_QUEST. The function's first arg is the key of
+    # the status. None means the function's dependencies are unknown.
+    depends_on = None
+
+    # If the function instance can be reused.
+    reusable = True
+
+    # The max number of free instances kept for each thread.
+    pool_size = 8
+
     def __init__(self):
         """
         Init default attributes.
@@ -30,6 +56,68 @@ class StatementFunction(object):
         self.args = None
         self.kwargs = None
 
+    @classmethod
+    def get_dependencies(cls, args):
+        """
+        Get the caller's status this function reads.
+
+        Args:
+            args: (tuple) function's args
+
+        Returns:
+            (set) a set of (status, key). The key is None if the function reads all
+            keys of the status. Returns None if the dependencies are unknown.
+        """
+        if not cls.const or not cls.deterministic or not cls.depends_on:
+            return None
+
+        if not args:
+            # the key of the status is unknown
+            return None
+
+        try:
+            hash(args[0])
+            return {(cls.depends_on, args[0])}
+        except TypeError:
+            return {(cls.depends_on, None)}
+
+    @classmethod
+    def call(cls, caller, obj, args, **kwargs):
+        """
+        Call the function with an instance from the pool.
+
+        Args:
+            caller: (object) statement's caller
+            obj: (object) caller's target
+            args: (tuple) function's args
+
+        Returns:
+            function's result
+        """
+        if not cls.reusable:
+            func_obj = cls()
+            func_obj.set(caller, obj, args, **kwargs)
+            return func_obj.func()
+
+        try:
+            pools = _local.pools
+        except AttributeError:
+            pools = _local.pools = {}
+
+        pool = pools.get(cls)
+        if pool is None:
+            pool = pools[cls] = []
+
+        # Functions may be called recursively, so get a free instance.
+        func_obj = pool.pop() if pool else cls()
+        try:
+            func_obj.set(caller, obj, args, **kwargs)
+            return func_obj.func()
+        finally:
+            func_obj.release()
+            if len(pool) < cls.pool_size:
+                pool.append(func_obj)
+
     def set(self, caller, obj, args, **kwargs):
         """
         Set function args.
@@ -39,6 +127,16 @@ class StatementFunction(object):
         self.args = args
         self.kwargs = kwargs
 
+    def release(self):
+        """
+        Clear function args after the function is called, so that the instance
+        does not keep references to game objects.
+        """
+        self.caller = None
+        self.obj = None
+        self.args = None
+        self.kwargs = None
+
     def func(self):
         """
         Implement the function.
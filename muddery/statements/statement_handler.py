@@ -2,121 +2,139 @@
 This model handle statements.
 """
 
-import re, ast, traceback
+import traceback
+from collections import OrderedDict
 from evennia.utils import logger
 from evennia.utils.utils import class_from_module
 from django.conf import settings
+from muddery.statements.statement_compiler import compile_condition, compile_actions
+from muddery.statements.statement_compiler import get_condition_dependencies
+from muddery.statements.const_function_cache import ConstFunctionCache
+from muddery.statements.condition_result_cache import ConditionResultCache
 
 
-#re_words = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)|("(.*)")')
-re_function = re.compile(r'[a-zA-Z_][a-zA-Z0-9_\.]*\(.*?\)')
-def exec_condition(func_set, condition, caller, obj, **kwargs):
+class StatementHandler(object):
     """
-    Execute the statements.
-
-    Args:
-        func_set: (object) condition function set
-        condition: (string) condition statement
-        caller: (object) statement's caller
-        obj: (object) caller's target
+    Loads and handles condition statements and action statements.
 
-    Returns:
-        result
+    Statements are compiled once and kept in a bounded cache.
     """
-    func = get_condition_func(func_set, caller, obj, **kwargs)
-    return re_function.sub(func, condition)
+    def __init__(self):
+        """
+        Creates a statement handler instance. Loads statements.
+        """
+        self.cache_size = settings.STATEMENT_CACHE_SIZE
+        self.compiled = OrderedDict()
+        self.const_cache = ConstFunctionCache()
+        self.condition_results = ConditionResultCache()
+        self.reload()
+
+    def reload(self):
+        """
+        Load function sets and clear compiled statements.
+        """
+        # load function sets
+        action_func_set_class = class_from_module(settings.ACTION_FUNC_SET)
+        self.action_func_set = action_func_set_class()
 
+        condition_func_set_class = class_from_module(settings.CONDITION_FUNC_SET)
+        self.condition_func_set = condition_func_set_class()
 
-def get_condition_func(func_set, caller, obj, **kwargs):
-    """
-    Get a function used in re's sub.
+        skill_func_set_class = class_from_module(settings.SKILL_FUNC_SET)
+        self.skill_func_set = skill_func_set_class()
 
-    Args:
-        func_set: (object) condition function set
-        caller: (object) statement's caller
-        obj: (object) caller's target
+        self.clear_cache()
 
-    Returns:
-        function
-    """
-    def function(word):
+    def clear_cache(self):
+        """
+        Clear compiled statements and cached results.
         """
-        Do function.
+        self.compiled.clear()
+        self.condition_results.clear()
+
+    def get_compiled(self, statement_type, statement):
+        """
+        Get a compiled statement from the cache, compile it if it is not in the cache.
 
         Args:
-            word: (string) condition function
+            statement_type: (string) "action", "skill", "condition" or "dependencies"
+            statement: (string) the statement
 
         Returns:
-            (string) "True" or "False"
+            compiled statement
         """
-        func_word = word.group()
-
+        cache_key = (statement_type, statement)
         try:
-            result = exec_function(func_set, func_word, caller, obj, **kwargs)
-            if result:
-                return "True"
-            else:
-                return "False"
-        except Exception as e:
-            logger.log_errmsg("Exec function error: %s %s" % (function, repr(e)))
-            traceback.print_exc()
-            return "None"
-
-    return function
+            compiled = self.compiled[cache_key]
+            self.compiled.move_to_end(cache_key)
+            return compiled
+        except KeyError:
+            pass
 
+        if statement_type == "condition":
+            try:
+                compiled = compile_condition(self.condition_func_set, statement, self.const_cache)
+            except Exception as e:
+                logger.log_errmsg("Can not compile condition: %s %s" % (statement, repr(e)))
+                compiled = compile_condition(self.condition_func_set, "False")
+        elif statement_type == "dependencies":
+            try:
+                compiled = get_condition_dependencies(self.condition_func_set, statement)
+            except Exception as e:
+                logger.log_errmsg("Can not get condition's dependencies: %s %s" % (statement, repr(e)))
+                compiled = None
+        elif statement_type == "skill":
+            compiled = compile_actions(self.skill_func_set, statement)
+        else:
+            compiled = compile_actions(self.action_func_set, statement)
 
-def exec_function(func_set, func_word, caller, obj, **kwargs):
-    """
-    Do function.
+        self.compiled[cache_key] = compiled
+        if len(self.compiled) > self.cache_size:
+            self.compiled.popitem(last=False)
 
-    Args:
-        func_set: (object) function set
-        func_word: (string) function string, such as: func("value")
-        caller: (object) statement's caller
-        obj: (object) caller's target
+        return compiled
 
-    Returns:
-        function result
-    """
+    def get_dependencies(self, condition):
+        """
+        Get the caller's status which a condition depends on.
 
-    # separate function's key and args
-    try:
-        pos = func_word.index("(")
-        func_key = func_word[:pos]
-        func_args = ast.literal_eval(func_word[pos:])
-        if type(func_args) != tuple:
-            func_args = (func_args,)
-    except ValueError:
-        func_key = func_word
-        func_args = ()
-
-    func_class = func_set.get_func_class(func_key)
-    if not func_class:
-        logger.log_errmsg("Statement error: Can not find function: %s of %s." % (func_key, func_word))
-        return
+        Args:
+            condition: (string) a condition expression
 
-    func_obj = func_class()
-    func_obj.set(caller, obj, func_args, **kwargs)
-    return func_obj.func()
+        Returns:
+            (set) a set of (status, key), or None if the dependencies are unknown.
+        """
+        if not condition:
+            return set()
 
+        return self.get_compiled("dependencies", condition)
 
-class StatementHandler(object):
-    """
-    Loads and handles condition statements and action statements.
-    """
-    def __init__(self):
+    def memoize(self):
         """
-        Creates a statement handler instance. Loads statements.
+        Get a context in which results of const functions are cached, such as:
+
+            with STATEMENT_HANDLER.memoize():
+                ...
+
+        Returns:
+            (ConstFunctionCache) the context
         """
-        # load function sets
-        action_func_set_class = class_from_module(settings.ACTION_FUNC_SET)
-        self.action_func_set = action_func_set_class()
+        return self.const_cache
 
-        condition_func_set_class = class_from_module(settings.CONDITION_FUNC_SET)
-        self.condition_func_set = condition_func_set_class()
+    def state_changed(self, caller, status=None, key=None):
+        """
+        Called when the caller's status which conditions depend on has changed,
+        such as quests, objects and statement attributes.
 
-        skill_func_set_class = class_from_module(settings.SKILL_FUNC_SET)
-        self.skill_func_set = skill_func_set_class()
+        Args:
+            caller: (object) statement's caller
+            status: (string) the changed status, defined in utils.defines, such as
+                    STATUS_QUEST. All status are changed if it is None.
+            key: (string) the changed status' key, such as the quest's key. All keys
+                 of the status are changed if it is None.
+        """
+        self.const_cache.invalidate(caller)
+        self.condition_results.invalidate(caller.id, status, key)
 
     def do_action(self, action, caller, obj, **kwargs):
         """
@@ -134,10 +152,9 @@ class StatementHandler(object):
             return
 
         # execute the statement
-        functions = action.split(";")
-        for function in functions:
+        for function, compiled in self.get_compiled("action", action):
             try:
-                exec_function(self.action_func_set, function, caller, obj, **kwargs)
+                compiled(caller, obj, kwargs)
             except Exception as e:
                 logger.log_errmsg("Exec function error: %s %s" % (function, repr(e)))
                 traceback.print_exc()
@@ -160,11 +177,10 @@ class StatementHandler(object):
             return
 
         # execute the statement
-        functions = action.split(";")
         results = []
-        for function in functions:
+        for function, compiled in self.get_compiled("skill", action):
             try:
-                result = exec_function(self.skill_func_set, function, caller, obj, **kwargs)
+                result = compiled(caller, obj, kwargs)
                 if result:
                     results.append(result)
             except Exception as e:
@@ -188,18 +204,58 @@ class StatementHandler(object):
         if not condition:
             return True
 
-        # calculate functions first
-        exec_string = exec_condition(self.condition_func_set, condition, caller, obj, **kwargs)
+        compiled = self.get_compiled("condition", condition)
 
         try:
             # do condition
-            result = eval(exec_string)
+            result = compiled(caller, obj, kwargs)
         except Exception as e:
-            logger.log_errmsg("Exec function error: %s %s" % (function, repr(e)))
+            logger.log_errmsg("Exec condition error: %s %s" % (condition, repr(e)))
             traceback.print_exc()
             return False
 
         return result
 
+    def match_condition_cached(self, condition, caller, obj):
+        """
+        Check a condition, and cache its result for the caller and the target. The
+        result is recomputed after the status which the condition depends on has
+        changed. Conditions with unknown or empty dependencies are not cached.
+
+        The caller must notify its status changes by state_changed(), as player
+        characters do.
+
+        Args:
+            condition: (string) a condition expression
+            caller: (object) statement's caller
+            obj: (object) caller's current target
+
+        Returns:
+            (boolean) the result of the condition
+        """
+        if not condition:
+            return True
+
+        dependencies = self.get_dependencies(condition)
+        if not dependencies or not caller:
+            return self.match_condition(condition, caller, obj)
+
+        # Functions can read the target, so results are cached for each target.
+        obj_id = None
+        if obj is not None:
+            obj_id = getattr(obj, "id", None)
+            if obj_id is None:
+                return self.match_condition(condition, caller, obj)
+
+        condition_key = (condition, obj_id)
+        try:
+            return self.condition_results.get(caller.id, condition_key)
+        except KeyError:
+            pass
+
+        result = self.match_condition(condition, caller, obj)
+        self.condition_results.set(caller.id, condition_key, result, dependencies)
+        return result
+
 
 STATEMENT_HANDLER = StatementHandler()
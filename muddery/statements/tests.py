@@ -0,0 +1,188 @@
+"""
+Tests of the statement compiler.
+"""
+
+from unittest import TestCase
+from muddery.statements.statement_compiler import parse_function, compile_actions, compile_condition
+from muddery.statements.statement_handler import StatementHandler
+from muddery.statements.statement_function import StatementFunction
+
+
+class FuncSet(object):
+    """
+    A function set of test functions. Calls of functions are recorded.
+    """
+    def __init__(self):
+        self.calls = []
+        self.funcs = {
+            "value": self.value,
+            "echo": self.echo,
+            "target": self.target,
+        }
+
+    def value(self, caller, obj, args, **kwargs):
+        self.calls.append(("value", args))
+        return args[0]
+
+    def echo(self, caller, obj, args, **kwargs):
+        self.calls.append(("echo", args))
+        return args
+
+    def target(self, caller, obj, args, **kwargs):
+        self.calls.append(("target", args))
+        return obj.value
+
+    def get_func(self, key):
+        return self.funcs.get(key)
+
+    def get_func_class(self, key):
+        if key == "target":
+            return TargetFunction
+        return None
+
+
+class TargetFunction(StatementFunction):
+    """
+    A const function reads the target.
+    """
+    key = "target"
+    const = True
+    depends_on = "status"
+
+
+class Target(object):
+    """
+    A statement's caller or target.
+    """
+    def __init__(self, id, value=None):
+        self.id = id
+        self.value = value
+
+
+class TestStatementCompiler(TestCase):
+
+    def setUp(self):
+        self.func_set = FuncSet()
+
+    def match(self, condition):
+        return compile_condition(self.func_set, condition)(None, None, {})
+
+    def test_parse_function(self):
+        self.assertEqual(parse_function("func"), ("func", ()))
+        self.assertEqual(parse_function(" func(1) "), ("func", (1,)))
+        self.assertEqual(parse_function('func("a", 2)'), ("func", ("a", 2)))
+
+    def test_quoted_args(self):
+        compiled = compile_actions(self.func_set, 'echo("a, (b)", 1)')
+        self.assertEqual(len(compiled), 1)
+
+        function, action = compiled[0]
+        self.assertEqual(action(None, None, {}), ("a, (b)", 1))
+
+    def test_actions(self):
+        compiled = compile_actions(self.func_set, "value(1); ;value(2)")
+        self.assertEqual([action(None, None, {}) for function, action in compiled], [1, 2])
+
+    def test_boolean_operators(self):
+        self.assertTrue(self.match("value(1) and value(2)"))
+        self.assertFalse(self.match("value(1) and value(0)"))
+        self.assertTrue(self.match("value(0) or value(2)"))
+        self.assertFalse(self.match("value(0) or value(0)"))
+        self.assertTrue(self.match("not value(0)"))
+        self.assertFalse(self.match("not value(1)"))
+
+    def test_precedence(self):
+        # "and" binds tighter than "or"
+        self.assertTrue(self.match("value(1) or value(0) and value(0)"))
+        self.assertFalse(self.match("(value(1) or value(0)) and value(0)"))
+
+        # "not" binds tighter than "and"
+        self.assertTrue(self.match("not value(0) and value(1)"))
+        self.assertTrue(self.match("not (value(1) and value(0))"))
+
+    def test_short_circuit(self):
+        self.match("value(0) and value(1)")
+        self.assertEqual(self.func_set.calls, [("value", (0,))])
+
+        self.func_set.calls = []
+        self.match("value(1) or value(0)")
+        self.assertEqual(self.func_set.calls, [("value", (1,))])
+
+    def test_compare(self):
+        self.assertTrue(self.match("value(1) == True"))
+        self.assertTrue(self.match("False < value(1)"))
+        self.assertFalse(self.match("value(0) != False"))
+
+    def test_missing_function(self):
+        self.assertFalse(self.match("missing(1)"))
+        self.assertTrue(self.match("not missing(1)"))
+
+    def test_syntax_error(self):
+        with self.assertRaises(SyntaxError):
+            compile_condition(self.func_set, "value(1) and")
+
+
+class TestStatementCache(TestCase):
+
+    def setUp(self):
+        self.handler = StatementHandler()
+        self.handler.condition_func_set = FuncSet()
+        self.handler.cache_size = 2
+
+    def test_lru_eviction(self):
+        handler = self.handler
+
+        first = handler.get_compiled("condition", "value(1)")
+        handler.get_compiled("condition", "value(2)")
+
+        # use the first condition, then the second one becomes the oldest
+        self.assertIs(handler.get_compiled("condition", "value(1)"), first)
+        handler.get_compiled("condition", "value(3)")
+
+        self.assertEqual(len(handler.compiled), 2)
+        self.assertIn(("condition", "value(1)"), handler.compiled)
+        self.assertNotIn(("condition", "value(2)"), handler.compiled)
+
+    def test_clear_cache(self):
+        handler = self.handler
+
+        first = handler.get_compiled("condition", "value(1)")
+        handler.clear_cache()
+        self.assertIsNot(handler.get_compiled("condition", "value(1)"), first)
+
+
+class TestConditionResults(TestCase):
+
+    def setUp(self):
+        self.handler = StatementHandler()
+        self.handler.condition_func_set = FuncSet()
+        self.caller = Target(1)
+
+    def test_results_of_targets(self):
+        handler = self.handler
+        first = Target(2, True)
+        second = Target(3, False)
+
+        self.assertTrue(handler.match_condition_cached('target("a")', self.caller, first))
+        self.assertFalse(handler.match_condition_cached('target("a")', self.caller, second))
+
+        # cached results
+        handler.condition_func_set.calls = []
+        self.assertTrue(handler.match_condition_cached('target("a")', self.caller, first))
+        self.assertFalse(handler.match_condition_cached('target("a")', self.caller, second))
+        self.assertEqual(handler.condition_func_set.calls, [])
+
+        # the status has changed
+        first.value = False
+        handler.state_changed(self.caller, "status", "a")
+        self.assertFalse(handler.match_condition_cached('target("a")', self.caller, first))
+
+    def test_empty_dependencies(self):
+        handler = self.handler
+        target = Target(2, True)
+
+        self.assertIsNone(handler.get_dependencies("target()"))
+        self.assertTrue(handler.match_condition_cached("target()", self.caller, target))
+
+        target.value = False
+        self.assertFalse(handler.match_condition_cached("target()", self.caller, target))
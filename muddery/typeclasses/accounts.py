@@ -25,7 +25,30 @@ several more options for customizing the Guest account system.
 from django.conf import settings
 from evennia.utils import logger
 from evennia import DefaultAccount, DefaultGuest
-from evennia.utils.utils import make_iter
+from evennia.typeclasses.tags import PermissionHandler
+from evennia.utils.utils import make_iter, lazy_property
+
+
+class MudderyPermissionHandler(PermissionHandler):
+    """
+    Calls the account's at_permissions_changed() when its permissions change.
+    """
+    def _setcache(self, key, category, tag_obj):
+        super(MudderyPermissionHandler, self)._setcache(key, category, tag_obj)
+        self.obj.at_permissions_changed()
+
+    def _delcache(self, key, category):
+        super(MudderyPermissionHandler, self)._delcache(key, category)
+        self.obj.at_permissions_changed()
+
+    def reset_cache(self):
+        super(MudderyPermissionHandler, self).reset_cache()
+        self.obj.at_permissions_changed()
+
+    def clear(self, category=None):
+        # TagHandler.clear() resets the cache without calling _delcache().
+        super(MudderyPermissionHandler, self).clear(category)
+        self.obj.at_permissions_changed()
 
 
 class MudderyAccount(DefaultAccount):
@@ -95,6 +118,17 @@ class MudderyAccount(DefaultAccount):
      at_server_shutdown()
 
     """
+    @lazy_property
+    def permissions(self):
+        return MudderyPermissionHandler(self)
+
+    def at_permissions_changed(self):
+        """
+        Called when the account's permissions have changed.
+        """
+        # Check if the account can bypass events again.
+        self.ndb.bypass_events = None
+
     def at_post_login(self, session=None, **kwargs):
         """
         Called at the end of the login process, just before letting
@@ -6,6 +6,9 @@ MudderyObject is an object which can load it's data automatically.
 
 """
 
+import ast
+
+
 class BaseTypeclass(object):
     """
     This base typeclass.
@@ -52,9 +55,25 @@ class BaseTypeclass(object):
                 from muddery.worlddata.dao.properties_dict_mapper import PROPERTIES_DICT
                 records = PROPERTIES_DICT.get_properties(cls.typeclass_key)
                 for record in records:
+                    # parse the default value
+                    try:
+                        default_value = ast.literal_eval(record.default)
+                    except (SyntaxError, ValueError) as e:
+                        # treat as a raw string
+                        default_value = record.default
+
                     cls._all_properties_[record.property] = {"name": record.name,
                                                              "desc": record.desc,
                                                              "default": record.default,
+                                                             "default_value": default_value,
                                                              "mutable": record.mutable,}
 
         return cls._all_properties_
+
+    @classmethod
+    def clear_properties_info(cls):
+        """
+        Clear cached properties' information, it will be reloaded when it is used.
+        """
+        if "_all_properties_" in cls.__dict__:
+            del cls._all_properties_
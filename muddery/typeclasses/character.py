@@ -9,7 +9,7 @@ creation commands.
 """
 
 import time, ast, traceback
-from twisted.internet import reactor, task
+from twisted.internet import reactor
 from twisted.internet.task import deferLater
 from django.conf import settings
 from evennia.objects.objects import DefaultCharacter
@@ -20,16 +20,18 @@ from evennia.utils.utils import lazy_property, class_from_module
 from muddery.mappings.typeclass_set import TYPECLASS
 from muddery.worlddata.dao import common_mappers as CM
 from muddery.worlddata.dao.loot_list_mapper import CHARACTER_LOOT_LIST
-from muddery.worlddata.dao.object_properties_mapper import OBJECT_PROPERTIES
-from muddery.worlddata.dao.default_skills_mapper import DEFAULT_SKILLS
-from muddery.utils.builder import build_object
+from muddery.utils.object_properties_handler import OBJECT_PROPERTIES_HANDLER, copy_property_value
+from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
 from muddery.utils.loot_handler import LootHandler
 from muddery.utils import defines, utils
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.utils.utils import search_obj_data_key
 from muddery.utils.data_field_handler import DataFieldHandler
+from muddery.combat.combat_scheduler import COMBAT_SCHEDULER
+from muddery.utils.mob_pool_handler import MOB_POOL_HANDLER
+from muddery.utils.skill_handler import create_character_skill
 from muddery.utils.localized_strings_handler import _
-from muddery.utils.builder import delete_object
 
 
 class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
@@ -110,8 +112,11 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             self.db.position_names = {}
         self.reset_equip_positions()
 
+        # {skill's key: is default skill}
+        # Skills' cd finish times are saved in db.skill_cd when skills are cast.
         if not self.attributes.has("skills"):
             self.db.skills = {}
+        self.skills = {}
 
         # set quests
         if not self.attributes.has("finished_quests"):
@@ -128,9 +133,6 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         self.auto_cast_skill_cd = GAME_SETTINGS.get("auto_cast_skill_cd")
         self.gcd_finish_time = 0
         
-        # loop for auto cast skills
-        self.auto_cast_loop = None
-        
         self.target = None
         self.reborn_time = 0
         
@@ -156,10 +158,6 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         # stop auto casting
         self.stop_auto_combat_skill()
         
-        # delete all skills
-        for skill in self.db.skills.values():
-            skill.delete()
-
         # delete all contents
         for content in self.contents:
             content.delete()
@@ -180,34 +178,16 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         if clone:
             data_key = self.system.clone
 
-        values = {}
-        for record in OBJECT_PROPERTIES.get_properties(data_key, level):
-            key = record.property
-            serializable_value = record.value
-            if serializable_value == "":
-                value = None
-            else:
-                try:
-                    value = ast.literal_eval(serializable_value)
-                except (SyntaxError, ValueError) as e:
-                    # treat as a raw string
-                    value = serializable_value
-            values[key] = value
+        values = OBJECT_PROPERTIES_HANDLER.get_properties(data_key, level)
 
         # Set body values.
         for key, info in self.get_properties_info().items():
             if not info["mutable"]:
-                value = None
                 if key in values:
                     value = values[key]
                 else:
-                    # Get default value.
-                    default = info["default"]
-                    try:
-                        value = ast.literal_eval(default)
-                    except (SyntaxError, ValueError) as e:
-                        # treat as a raw string
-                        value = default
+                    # Get default value, mutable values are shared by all objects.
+                    value = copy_property_value(info["default_value"])
 
                 self.custom_properties_handler.add(key, value)
                 self.body_properties_handler.add(key, value)
@@ -236,9 +216,6 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         self.skill_gcd = GAME_SETTINGS.get("global_cd")
         self.auto_cast_skill_cd = GAME_SETTINGS.get("auto_cast_skill_cd")
         self.gcd_finish_time = 0
-        
-        # loop for auto cast skills
-        self.auto_cast_loop = None
 
         # clear target
         self.target = None
@@ -252,6 +229,9 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         # update equipment positions
         self.reset_equip_positions()
 
+        # load skills
+        self.load_skills()
+
         # load default skills
         self.load_default_skills()
 
@@ -280,12 +260,15 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             None
         """
         positions = []
-        self.db.position_names = {}
+        position_names = {}
 
         # reset equipment's position
-        for record in CM.EQUIPMENT_POSITIONS.all():
+        for record in EQUIP_TYPE_HANDLER.get_positions():
             positions.append(record.key)
-            self.db.position_names[record.key] = record.name
+            position_names[record.key] = record.name
+
+        # only saved when it changes
+        self.db.position_names = position_names
 
         for position in self.db.equipments:
             if position not in positions:
@@ -443,6 +426,42 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         result = [item for item in self.contents if item.get_data_key() == obj_key]
         return result
 
+    def has_object(self, obj_key):
+        """
+        If the character has the object in the inventory.
+        """
+        return len(self.search_inventory(obj_key)) > 0
+
+    def get_virtual_object_key(self, dbref):
+        """
+        Get the key of a virtual object in the compact inventory by its dbref. Only
+        player characters have the compact inventory.
+
+        Args:
+            dbref: (string) the virtual object's dbref.
+
+        Returns:
+            (string) the object's key, or None if it is not a virtual object.
+        """
+        return None
+
+    def search_dbref(self, dbref, location=None):
+        """
+        Search as an object by its dbref. The character's skills can be found by their ids.
+
+        Args:
+            dbref: (string)dbref.
+
+        Returns:
+            The object or None.
+        """
+        if isinstance(dbref, str) and dbref.startswith(defines.SKILL_PREFIX):
+            if location:
+                return None
+            return self.skills.get(dbref[len(defines.SKILL_PREFIX):])
+
+        return super(MudderyCharacter, self).search_dbref(dbref, location)
+
     def set_equips(self):
         """
         Load equipments data.
@@ -473,22 +492,48 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             if content.dbref in equipped:
                 content.equip_to(self)
 
+    def load_skills(self):
+        """
+        Load character's skills.
+        """
+        self.skills = {}
+
+        skills = self.db.skills
+        for key, is_default in list(skills.items()):
+            if not isinstance(is_default, bool):
+                # A skill object of old versions, only keep its default marker.
+                skill_obj = is_default
+                if not skill_obj:
+                    del skills[key]
+                    continue
+
+                is_default = bool(skill_obj.db.is_default)
+                skill_obj.delete()
+                skills[key] = is_default
+
+            skill = create_character_skill(key, self, is_default)
+            if skill:
+                self.skills[key] = skill
+
+        self.at_skills_changed()
+
     def load_default_skills(self):
         """
         Load character's default skills.
         """
         # default skills
-        skill_records = DEFAULT_SKILLS.filter(self.get_data_key())
+        skill_records = CHARACTER_DEFAULTS_HANDLER.get_default_skills(self.get_data_key())
         default_skill_ids = set([record.skill for record in skill_records])
 
         # remove old default skills
-        for key, skill in self.db.skills.items():
-            if not skill:
-                del self.db.skills[key]
-            elif skill.is_default() and key not in default_skill_ids:
+        for key, is_default in list(self.db.skills.items()):
+            if is_default and key not in default_skill_ids:
                 # remove this skill
-                skill.delete()
                 del self.db.skills[key]
+                skill = self.skills.pop(key, None)
+                if skill:
+                    skill.reset_cd()
+                self.at_skills_changed()
 
         # add new default skills
         for skill_record in skill_records:
@@ -535,32 +580,36 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             self.msg({"msg": _("You have already learned this skill.")})
             return False
 
-        # Create skill object.
-        skill_obj = build_object(skill_key)
-        if not skill_obj:
+        # Create the skill.
+        skill = create_character_skill(skill_key, self, is_default)
+        if not skill:
             self.msg({"msg": _("Can not learn this skill.")})
             return False
 
-        # set default
-        if is_default:
-            skill_obj.set_default(is_default)
-
         # Store new skill.
-        skill_obj.set_owner(self)
-        self.db.skills[skill_key] = skill_obj
+        skill.at_learned()
+        self.db.skills[skill_key] = bool(is_default)
+        self.skills[skill_key] = skill
+        self.at_skills_changed()
 
         # If it is a passive skill, player's status may change.
-        if skill_obj.passive:
+        if skill.passive:
             self.refresh_properties()
 
         # Notify the player
         if not silent and self.has_account:
             self.show_status()
             self.show_skills()
-            self.msg({"msg": _("You learned skill {C%s{n.") % skill_obj.get_name()})
+            self.msg({"msg": _("You learned skill {C%s{n.") % skill.get_name()})
 
         return True
 
+    def at_skills_changed(self):
+        """
+        Called when the character's skills have changed.
+        """
+        self.ndb.skills_version = (self.ndb.skills_version or 0) + 1
+
     def cast_skill(self, skill_key, target):
         """
         Cast a skill.
@@ -575,11 +624,11 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             self.msg({"skill_cast": {"cast": _("Global cooling down!")}})
             return
 
-        if skill_key not in self.db.skills:
+        if skill_key not in self.skills:
             self.msg({"skill_cast": {"cast": _("You do not have this skill.")}})
             return
 
-        skill = self.db.skills[skill_key]
+        skill = self.skills[skill_key]
         cast_result = skill.cast_skill(target)
         if not cast_result:
             return
@@ -636,7 +685,7 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         """
         Cast all passive skills.
         """
-        for skill in self.db.skills.values():
+        for skill in self.skills.values():
             if skill.passive:
                 skill.cast_skill(self)
                 
@@ -644,22 +693,14 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
         """
         Start auto cast skill.
         """
-        if self.auto_cast_loop and self.auto_cast_loop.running:
-            return
-
-        # Cast a skill immediately
-        # self.auto_cast_skill()
-
-        # Set timer of auto cast.
-        self.auto_cast_loop = task.LoopingCall(self.auto_cast_skill)
-        self.auto_cast_loop.start(self.auto_cast_skill_cd)
+        # The combat scheduler calls auto_cast_skill at intervals.
+        COMBAT_SCHEDULER.add(self, self.auto_cast_skill_cd)
 
     def stop_auto_combat_skill(self):
         """
         Stop auto cast skill.
         """
-        if hasattr(self, "auto_cast_loop") and self.auto_cast_loop and self.auto_cast_loop.running:
-            self.auto_cast_loop.stop()
+        COMBAT_SCHEDULER.remove(self)
 
 
     ########################################
@@ -764,8 +805,8 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
 
     def attack_temp_target(self, target_key, target_level=0, desc=""):
         """
-        Attack a temporary clone of a target. This creates a new character object for attack.
-        The origin target will not be affected.
+        Attack a temporary clone of a target. The clone is got from the pool of temporary
+        mobs. The origin target will not be affected.
 
         Args:
             target_key: (string) the info key of the target object.
@@ -782,8 +823,8 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
                 obj = obj[0]
                 target_level = obj.db.level
 
-        # Create a target.
-        target = build_object(target_key, target_level, reset_location=False)
+        # Get a target from the pool of temporary mobs.
+        target = MOB_POOL_HANDLER.acquire(target_key, target_level)
         if not target:
             logger.log_errmsg("Can not create the target %s." % target_key)
             return False
@@ -821,15 +862,47 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             del self.ndb.combat_handler
 
         if self.is_temp:
-            # delete template character and notify its location
+            # put the temporary character back to the pool and notify its location
             location = self.location
 
-            delete_object(self.dbref)
+            MOB_POOL_HANDLER.release(self)
             if location:
                 for content in location.contents:
                     if content.has_account:
                         content.show_location()
 
+    def reset_temp_state(self):
+        """
+        Reset a temporary character to its initial state after a combat, so it can be
+        used in another combat.
+        """
+        self.stop_auto_combat_skill()
+
+        # remove objects got in the combat and restore default objects
+        for obj in self.contents:
+            obj.delete()
+        self.load_default_objects()
+
+        # reload the loot list when it is used
+        self.__dict__.pop("loot_handler", None)
+
+        # reset properties, mutable properties are set to their default values
+        self.custom_properties_handler.clear()
+        self.load_custom_properties(self.db.level)
+        self.refresh_properties()
+        self.recover()
+
+        # reset skills' cd
+        for skill in self.skills.values():
+            skill.reset_cd()
+        self.at_skills_changed()
+
+        self.gcd_finish_time = 0
+        self.target = None
+
+        if self.db.closed_events:
+            self.db.closed_events = set()
+
     def set_team(self, team_id):
         """
         Set character's team id in combat.
@@ -912,14 +985,14 @@ class MudderyCharacter(TYPECLASS("OBJECT"), DefaultCharacter):
             (list) available commands for combat
         """
         commands = []
-        for key, skill in self.db.skills.items():
+        for key, skill in self.skills.items():
             if skill.passive:
                 # exclude passive skills
                 continue
 
             command = {"name": skill.get_name(),
                        "key": key,
-                       "icon": getattr(skill, "icon", None)}
+                       "icon": skill.icon}
 
             commands.append(command)
 
@@ -14,6 +14,8 @@ from evennia.objects.objects import DefaultObject
 from evennia.utils import logger
 from evennia.utils.utils import make_iter, is_iter, lazy_property
 from evennia.typeclasses.models import DbHolder
+from evennia.typeclasses.attributes import AttributeHandler
+from evennia.utils.dbserialize import to_pickle
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.events.event_trigger import EventTrigger
 from muddery.utils.data_field_handler import DataFieldHandler
@@ -24,9 +26,42 @@ from muddery.utils.exception import MudderyError
 from muddery.utils.localized_strings_handler import _
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.utils.desc_handler import DESC_HANDLER
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
 from muddery.typeclasses.base_typeclass import BaseTypeclass
 from muddery.mappings.typeclass_set import TYPECLASS
-from muddery.worlddata.dao.object_properties_mapper import OBJECT_PROPERTIES
+from muddery.utils.object_properties_handler import OBJECT_PROPERTIES_HANDLER, copy_property_value
+
+
+class MudderyAttributeHandler(AttributeHandler):
+    """
+    Only saves attributes whose values have changed, and counts the writes.
+    """
+    def __init__(self, obj):
+        super(MudderyAttributeHandler, self).__init__(obj)
+
+        # number of attributes written to db
+        self.writes = 0
+
+    def add(self, key, value, category=None, lockstring="", strattr=False, accessing_obj=None,
+            default_access=True):
+        if key and not accessing_obj:
+            attr_obj = self._getcache(key, category)
+            if attr_obj:
+                attr_obj = attr_obj[0]
+                if strattr:
+                    current, new_value = attr_obj.db_strvalue, value
+                else:
+                    current, new_value = attr_obj.db_value, to_pickle(value)
+
+                if type(current) is type(new_value) and current == new_value:
+                    # no change
+                    return
+
+        self.writes += 1
+        super(MudderyAttributeHandler, self).add(key, value, category=category, lockstring=lockstring,
+                                                 strattr=strattr, accessing_obj=accessing_obj,
+                                                 default_access=default_access)
 
 
 class MudderyBaseObject(BaseTypeclass, DefaultObject):
@@ -38,6 +73,10 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
     model_name = "objects"
 
     # initialize all handlers in a lazy fashion
+    @lazy_property
+    def attributes(self):
+        return MudderyAttributeHandler(self)
+
     @lazy_property
     def event(self):
         return EventTrigger(self)
@@ -119,6 +158,11 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
         self.condition = None
         self.icon = None
 
+        # Objects created in a location do not call the location's at_object_receive.
+        location = self.location
+        if location and hasattr(location, "add_surrounding"):
+            location.add_surrounding(self)
+
     def at_init(self):
         """
         Load world data.
@@ -128,17 +172,40 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
         self.condition = None
         self.action = None
         self.icon = None
-        
+
+        writes = self.attributes.writes
         try:
             # Load db data.
             self.load_data()
         except Exception as e:
             traceback.print_exc()
             logger.log_errmsg("%s(%s) can not load data:%s" % (self.get_data_key(), self.dbref, e))
-            
+
+        # number of attributes written to db while loading data
+        self.init_attribute_writes = self.attributes.writes - writes
+
         # This object's class may be changed after load_data(), so do not add
         # codes here. You can add codes in after_data_loaded() which is called
         # after load_data().
+
+    def delete(self):
+        """
+        Delete the object and remove it from the index of unique objects.
+
+        Returns:
+            (boolean) if the object has been deleted.
+        """
+        obj_id = self.id
+
+        # Deleting does not call the location's at_object_leave.
+        location = self.location
+        if location and hasattr(location, "remove_surrounding"):
+            location.remove_surrounding(self)
+
+        result = super(MudderyBaseObject, self).delete()
+        if result:
+            OBJECT_INDEX_HANDLER.remove_id(obj_id)
+        return result
     
     def at_post_unpuppet(self, player, session=None, **kwargs):
         """
@@ -161,6 +228,8 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
 
                 # Save last location.
                 self.db.prelogout_location = self.location
+                if hasattr(self.location, "remove_surrounding"):
+                    self.location.remove_surrounding(self)
                 self.location = None
 
     def at_object_receive(self, moved_obj, source_location, **kwargs):
@@ -208,6 +277,11 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
             traceback.print_exc()
             logger.log_errmsg("%s(%s) can not load data:%s" % (key, self.dbref, e))
 
+        # the key and the typeclass may have changed, update the location's surroundings
+        location = self.location
+        if location and hasattr(location, "update_surrounding"):
+            location.update_surrounding(self)
+
         # call data_key hook
         self.after_data_key_changed()
 
@@ -228,22 +302,15 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
                 raise MudderyError("No data key.")
 
         for data_model in self.get_models():
-            # Get db model
-            model_obj = apps.get_model(settings.WORLD_DATA_APP, data_model)
-            if not model_obj:
-                logger.log_errmsg("%s can not open model %s" % (key, data_model))
-                continue
-
             # Get data record.
-            try:
-                data = model_obj.objects.get(key=key)
-            except Exception as e:
+            data = OBJECT_DATA_HANDLER.get_record(data_model, key)
+            if not data:
                 logger.log_errmsg("%s can not find key %s in %s" % (key, key, data_model))
                 continue
 
             # Set data.
-            for field in data._meta.fields:
-                setattr(self.system, field.name, data.serializable_value(field.name))
+            for field_name, value in zip(data._fields, data):
+                setattr(self.system, field_name, value)
 
     def load_data(self, level=None, reset_location=True):
         """
@@ -269,6 +336,8 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
                     # Use default level.
                     level = getattr(self.system, "level", 0)
                     self.db.level = level
+            else:
+                self.db.level = level
 
             self.load_custom_properties(level)
 
@@ -289,36 +358,18 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
             level = self.db.level
 
         # Load values from db.
-        values = {}
-        for record in OBJECT_PROPERTIES.get_properties(self.get_data_key(), level):
-            key = record.property
-            serializable_value = record.value
-            if serializable_value == "":
-                value = None
-            else:
-                try:
-                    value = ast.literal_eval(serializable_value)
-                except (SyntaxError, ValueError) as e:
-                    # treat as a raw string
-                    value = serializable_value
-            values[key] = value
+        values = OBJECT_PROPERTIES_HANDLER.get_properties(self.get_data_key(), level)
 
         # Set values.
         for key, info in self.get_properties_info().items():
             if not info["mutable"]:
-                value = None
                 if key in values:
                     value = values[key]
                 else:
-                    # Get default value.
-                    default = info["default"]
-                    try:
-                        value = ast.literal_eval(default)
-                    except (SyntaxError, ValueError) as e:
-                        # treat as a raw string
-                        value = default
+                    # Get default value, mutable values are shared by all objects.
+                    value = copy_property_value(info["default_value"])
 
-                self.custom_properties_handler.add(key, values.get(key, value))
+                self.custom_properties_handler.add(key, value)
 
         # Set default mutable custom properties.
         self.set_mutable_custom_properties()
@@ -431,6 +482,11 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
     
         self.name = name
 
+        # update the location's surroundings
+        location = self.location
+        if location and hasattr(location, "update_surrounding"):
+            location.update_surrounding(self)
+
         # we need to trigger this here, since this will force
         # (default) Exits to rebuild their Exit commands with the new
         # aliases
@@ -554,7 +610,7 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
         if not self.condition:
             return True
 
-        return STATEMENT_HANDLER.match_condition(self.condition, caller, self)
+        return STATEMENT_HANDLER.match_condition_cached(self.condition, caller, self)
 
     def get_surroundings(self, caller):
         """
@@ -647,15 +703,66 @@ class MudderyBaseObject(BaseTypeclass, DefaultObject):
         """
         Emits a message to all objects inside this object.
 
-        Send text in JSON format.
+        Send text in JSON format. Only objects with sessions can receive the message. The
+        message is encoded once for sessions of the same protocol. It is added to every
+        session's output buffer if it can be buffered, otherwise it is sent to all these
+        sessions at once.
         """
         contents = self.contents
         if exclude:
             exclude = make_iter(exclude)
             contents = [obj for obj in contents if obj not in exclude]
 
+        sessions = []
         for obj in contents:
-            obj.msg(text=text, from_obj=from_obj, **kwargs)
+            obj_sessions = obj.sessions.all()
+            if not obj_sessions:
+                continue
+
+            # try send hooks
+            if from_obj:
+                try:
+                    from_obj.at_msg_send(text=text, to_obj=obj, **kwargs)
+                except Exception:
+                    logger.log_trace()
+            try:
+                if not obj.at_msg_receive(text=text, **kwargs):
+                    # if at_msg_receive returns false, we abort message to this object
+                    continue
+            except Exception:
+                logger.log_trace()
+
+            sessions.extend(obj_sessions)
+
+        if not sessions:
+            return
+
+        # group sessions by their protocols
+        protocols = {}
+        for session in sessions:
+            if session.protocol_key not in protocols:
+                protocols[session.protocol_key] = []
+            protocols[session.protocol_key].append(session)
+
+        for protocol_sessions in protocols.values():
+            session = protocol_sessions[0]
+            if len(protocol_sessions) == 1 or not hasattr(session, "encode_data_out"):
+                for session in protocol_sessions:
+                    session.msg(text=text, **kwargs)
+                continue
+
+            data = session.encode_data_out(text, **kwargs)
+            if session.can_buffer_output(**data):
+                # merge it with other messages of every session
+                for session in protocol_sessions:
+                    session.buffer_output(data["text"])
+            else:
+                # send buffered messages first to keep messages in order
+                for session in protocol_sessions:
+                    session.flush_output()
+
+                session.count_output(data.get("text", None), len(protocol_sessions))
+                session.sessionhandler.data_out_multicast(protocol_sessions, **data)
 
     def got_message(self, caller, message):
         """
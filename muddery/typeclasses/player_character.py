@@ -9,8 +9,10 @@ creation commands.
 """
 
 import random
+from contextlib import contextmanager
 from django.conf import settings
 from django.apps import apps
+from django.db import transaction, DatabaseError
 from muddery.utils import defines, utils
 from muddery.utils.builder import build_object, get_object_record
 from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
@@ -20,10 +22,13 @@ from muddery.utils.exception import MudderyError
 from muddery.utils.localized_strings_handler import _
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.utils.desc_handler import DESC_HANDLER
+from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.defines import ConversationType
-from muddery.worlddata.dao.default_objects_mapper import DEFAULT_OBJECTS
+from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
 from muddery.worlddata.dao.properties_dict_mapper import PROPERTIES_DICT
-from evennia.utils.utils import lazy_property
+from evennia.utils.utils import lazy_property, is_iter
 from evennia.utils import logger, search
 from evennia.comms.models import ChannelDB
 from evennia import create_script
@@ -54,6 +59,12 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
     typeclass_name = _("Player Character", "typeclasses")
     model_name = "player_characters"
 
+    # inventory objects grouped by their data keys, {data key: [object, ...]}
+    inventory_index = None
+
+    # inventory messages are not sent by hooks in inventory batches
+    inventory_batch_depth = 0
+
     # initialize all handlers in a lazy fashion
     @lazy_property
     def quest_handler(self):
@@ -79,6 +90,8 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
             self.db.unlocked_exits = set()
         if not self.attributes.has("revealed_map"):
             self.db.revealed_map = set()
+        if not self.attributes.has("virtual_objects"):
+            self.db.virtual_objects = {}
 
         # set custom attributes
         if not self.attributes.has("attributes"):
@@ -126,9 +139,17 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         
         """
         super(MudderyPlayerCharacter, self).at_object_receive(moved_obj, source_location)
+        key = moved_obj.get_data_key()
+        STATEMENT_HANDLER.state_changed(self, defines.STATUS_OBJECT, key)
+
+        if self.inventory_index is not None:
+            if key not in self.inventory_index:
+                self.inventory_index[key] = []
+            self.inventory_index[key].append(moved_obj)
 
         # send latest inventory data to player
-        self.msg({"inventory": self.return_inventory()})
+        if not self.inventory_batch_depth:
+            self.msg({"inventory": self.return_inventory()})
     
     def at_object_left(self, moved_obj, target_location):
         """
@@ -140,9 +161,15 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         
         """
         super(MudderyPlayerCharacter, self).at_object_left(moved_obj, target_location)
-        
+        key = moved_obj.get_data_key()
+        STATEMENT_HANDLER.state_changed(self, defines.STATUS_OBJECT, key)
+
+        if self.inventory_index is not None and key in self.inventory_index:
+            self.inventory_index[key] = [obj for obj in self.inventory_index[key] if obj != moved_obj]
+
         # send latest inventory data to player
-        self.msg({"inventory": self.return_inventory()})
+        if not self.inventory_batch_depth:
+            self.msg({"inventory": self.return_inventory()})
 
     def at_before_move(self, destination, **kwargs):
         """
@@ -175,6 +202,10 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         """
         self.available_channels = self.get_available_channels()
 
+        if self.account:
+            # Check if the account can bypass events again.
+            self.account.ndb.bypass_events = None
+
         allow_commands = False
         if self.account:
             if self.is_superuser:
@@ -211,7 +242,7 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
                    "channels": self.available_channels}
         self.msg(message)
 
-        self.show_location()
+        self.show_location(full=True)
 
         # notify its location
         if not self.solo_mode:
@@ -246,6 +277,9 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
                           "name": self.get_name()}
                 self.location.msg_contents({"player_offline":change}, exclude=self)
 
+        # Remove cached results of conditions.
+        STATEMENT_HANDLER.state_changed(self)
+
         #MATCH_QUEUE_HANDLER.remove(self)
 
     def get_data_key(self, default=""):
@@ -373,11 +407,19 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
                     
         return {"rooms": rooms, "exits": exits}
 
-    def show_location(self):
+    def show_location(self, full=False):
         """
         show character's location
+
+        Args:
+            full: (boolean) send the whole room to the client even if the client has it.
         """
-        if self.location:
+        if not self.location:
+            return
+
+        # Conditions of objects and dialogues in the location are checked many times,
+        # cache results of const functions.
+        with STATEMENT_HANDLER.memoize():
             location_key = self.location.get_data_key()
             area = self.location.location and self.location.location.get_appearance(self)
 
@@ -431,11 +473,56 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
 
             # get appearance
             appearance = self.location.get_appearance(self)
-            appearance.update(self.location.get_surroundings(self))
-            msg["look_around"] = appearance
+            surroundings = self.location.get_surroundings(self)
+            msg.update(self.get_look_around_message(appearance, surroundings, full))
 
             self.msg(msg)
 
+    def get_look_around_message(self, appearance, surroundings, full=False):
+        """
+        Get the message of the character's location. If the client already has the
+        location, only send changed objects' lists.
+
+        Args:
+            appearance: (dict) the location's appearance.
+            surroundings: (dict) objects in the location, {type: [object's appearance]}.
+            full: (boolean) send the whole room even if the client has it.
+
+        Returns:
+            (dict) a "look_around" message, a "look_around_delta" message or an empty dict.
+        """
+        location = self.location
+        last = self.ndb.look_around
+        version = last["version"] + 1 if last else 1
+
+        if full or not last or last["location"] != location.id or last["appearance"] != appearance:
+            look_around = dict(appearance)
+            look_around.update(surroundings)
+            look_around["version"] = version
+            msg = {"look_around": look_around}
+        else:
+            if last["room_version"] != location.surroundings_version:
+                # objects in the room has changed, send all lists
+                changes = surroundings
+            else:
+                # only conditions of objects may have changed
+                changes = {type: objects for type, objects in surroundings.items()
+                           if objects != last["surroundings"].get(type)}
+
+            if not changes:
+                return {}
+
+            msg = {"look_around_delta": {"base_version": last["version"],
+                                         "version": version,
+                                         "changes": changes}}
+
+        self.ndb.look_around = {"location": location.id,
+                                "room_version": location.surroundings_version,
+                                "appearance": appearance,
+                                "surroundings": surroundings,
+                                "version": version}
+        return msg
+
     def load_default_objects(self):
         """
         Load character's default objects.
@@ -446,12 +533,12 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
             model_name = self.get_data_key()
         
         # default objects
-        object_records = DEFAULT_OBJECTS.filter(model_name)
+        object_records = CHARACTER_DEFAULTS_HANDLER.get_default_objects(model_name)
 
         # add new default objects
         obj_list = []
         for object_record in object_records:
-            if not self.search_inventory(object_record.object):
+            if not self.has_object(object_record.object):
                 obj_list.append({
                     "object": object_record.object,
                     "level": object_record.level,
@@ -484,138 +571,352 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         """
         objects = []           # objects that have been accepted
 
-        # check what the character has now
-        inventory = {}
-        for item in self.contents:
-            key = item.get_data_key()
-            if key in inventory:
-                # if the character has more than one item of the same kind,
-                # get the smallest stack.
-                if inventory[key].db.number > item.db.number:
-                    inventory[key] = item
-            else:
-                inventory[key] = item
-
-        for obj in obj_list:
-            key = obj["object"]
-            level = obj.get("level")
-            available = obj["number"]
-            name = ""
-            icon = ""
-            number = available
-            accepted = 0
-            reject = False
-            unique = False
-
-            if number == 0:
-                # it is an empty object
-                if key in inventory:
-                    # already has this object
-                    continue
-
-                object_record = None
+        # Send the inventory and quests once after all objects have been received.
+        with self.inventory_batch(), transaction.atomic():
+            for obj in obj_list:
+                # Roll back only this object if it fails.
+                contents = self.contents
                 try:
-                    common_model_name = TYPECLASS("COMMON_OBJECT").model_name
-                    common_model_obj = apps.get_model(settings.WORLD_DATA_APP, common_model_name)
-                    object_record = common_model_obj.objects.get(key=key)
-                except Exception as e:
-                    pass
+                    with transaction.atomic():
+                        result = self.receive_object(obj["object"], obj["number"], obj.get("level"))
+                except DatabaseError as e:
+                    logger.log_errmsg("Can not receive object %s: %s" % (obj["object"], e))
+                    self.at_inventory_rolled_back(contents)
+
+                    object_record = get_object_record(obj["object"])
+                    name = object_record.name if object_record else obj["object"]
+                    result = {
+                        "key": obj["object"],
+                        "name": name,
+                        "icon": "",
+                        "number": 0,
+                        "reject": _("Can not get %s.") % name,
+                    }
+
+                if result:
+                    objects.append(result)
+
+        for item in objects:
+            STATEMENT_HANDLER.state_changed(self, defines.STATUS_OBJECT, item["key"])
+
+        if not mute:
+            # Send results to the player.
+            message = {"get_objects": objects}
+            self.msg(message)
 
-                if not object_record:
-                    # can not find object's data record
-                    continue
+        self.show_inventory()
 
-                if object_record.can_remove:
-                    # remove this empty object
-                    continue
+        # call quest handler
+        accepted = {}
+        for item in objects:
+            if not item["reject"]:
+                accepted[item["key"]] = accepted.get(item["key"], 0) + item["number"]
+        if accepted:
+            self.quest_handler.at_objectives(defines.OBJECTIVE_OBJECT, accepted)
+
+        return objects
+
+    def receive_object(self, key, number, level=None, compact=True):
+        """
+        Add an object to the inventory. Call it in an inventory batch.
+
+        Args:
+            key: (string) object's key
+            number: (number) object's number
+            level: (number) object's level
+            compact: (boolean) add it to the compact inventory if it can be a virtual object
+
+        Returns:
+            (dict) the result, or None if the object is skipped.
+            {
+                "key": key,
+                "name": name,
+                "number": number,
+                "icon": icon,
+                "reject": reason,
+            }
+        """
+        if compact and number > 0 and self.is_virtual_object(key):
+            return self.receive_virtual_object(key, number, level)
+
+        name = ""
+        icon = ""
+        accepted = 0
+        reject = False
+        unique = False
+
+        # if the character has more than one item of the same kind, get the smallest stack.
+        current = None
+        for item in self.search_inventory(key):
+            if not current or current.db.number > item.db.number:
+                current = item
+
+        if number == 0:
+            # it is an empty object
+            if current:
+                # already has this object
+                return None
+
+            common_model_name = TYPECLASS("COMMON_OBJECT").model_name
+            object_record = OBJECT_DATA_HANDLER.get_record(common_model_name, key)
+            if not object_record or object_record.can_remove:
+                # can not find object's data record or remove this empty object
+                return None
+
+            # create a new content
+            new_obj = build_object(key, level=level)
+            if not new_obj:
+                reject = _("Can not get %s.") % key
+            else:
+                name = new_obj.get_name()
+                icon = new_obj.icon
+
+                # move the new object to the character
+                if not new_obj.move_to(self, quiet=True, emit_to_obj=self):
+                    new_obj.delete()
+                    reject = _("Can not get %s.") % name
+        else:
+            # common number
+            # if already has this kind of object
+            if current:
+                # add to current object
+                name = current.name
+                icon = current.icon
+                unique = current.unique
+
+                add = number
+                if add > current.max_stack - current.db.number:
+                    add = current.max_stack - current.db.number
+
+                if add > 0:
+                    # increase stack number
+                    current.increase_num(add)
+                    number -= add
+                    accepted += add
+
+            # if does not have this kind of object, or stack is full
+            while number > 0:
+                if unique:
+                    # can not have more than one unique objects
+                    reject = _("Can not get more %s.") % name
+                    break
 
                 # create a new content
                 new_obj = build_object(key, level=level)
                 if not new_obj:
-                    reject = _("Can not get %s.") % key
-                else:
-                    name = new_obj.get_name()
-                    icon = new_obj.icon
+                    reject = _("Can not get %s.") % name
+                    break
+
+                name = new_obj.get_name()
+                icon = new_obj.icon
+                unique = new_obj.unique
 
                 # move the new object to the character
                 if not new_obj.move_to(self, quiet=True, emit_to_obj=self):
                     new_obj.delete()
                     reject = _("Can not get %s.") % name
-            else:
-                # common number
-                # if already has this kind of object
-                if key in inventory:
-                    # add to current object
-                    name = inventory[key].name
-                    icon = inventory[key].icon
-                    unique = inventory[key].unique
-
-                    add = number
-                    if add > inventory[key].max_stack - inventory[key].db.number:
-                        add = inventory[key].max_stack - inventory[key].db.number
-
-                    if add > 0:
-                        # increase stack number
-                        inventory[key].increase_num(add)
-                        number -= add
-                        accepted += add
-
-                # if does not have this kind of object, or stack is full
-                while number > 0:
-                    if unique:
-                        # can not have more than one unique objects
-                        reject = _("Can not get more %s.") % name
-                        break
+                    break
 
-                    # create a new content
-                    new_obj = build_object(key, level=level)
-                    if not new_obj:
-                        reject = _("Can not get %s.") % name
-                        break
+                # Get the number that actually added.
+                add = number
+                if add > new_obj.max_stack:
+                    add = new_obj.max_stack
 
-                    name = new_obj.get_name()
-                    icon = new_obj.icon
-                    unique = new_obj.unique
+                if add <= 0:
+                    break
 
-                    # move the new object to the character
-                    if not new_obj.move_to(self, quiet=True, emit_to_obj=self):
-                        new_obj.delete()
-                        reject = _("Can not get %s.") % name
-                        break
+                new_obj.increase_num(add)
+                number -= add
+                accepted += add
 
-                    # Get the number that actually added.
-                    add = number
-                    if add > new_obj.max_stack:
-                        add = new_obj.max_stack
+        return {
+            "key": key,
+            "name": name,
+            "icon": icon,
+            "number": accepted,
+            "reject": reject,
+        }
 
-                    if add <= 0:
-                        break
+    def get_virtual_objects(self):
+        """
+        Get virtual objects in the compact inventory.
 
-                    new_obj.increase_num(add)
-                    number -= add
-                    accepted += add
+        Returns:
+            (dict) {object's key: (level, number)}
+        """
+        virtual_objects = self.db.virtual_objects
+        if virtual_objects is None:
+            self.db.virtual_objects = {}
+            virtual_objects = self.db.virtual_objects
+        return virtual_objects
 
-            objects.append({
-                "key": key,
-                "name": name,
-                "icon": icon,
-                "number": accepted,
-                "reject": reject,
-            })
+    def is_virtual_object(self, obj_key):
+        """
+        If the object can be kept in the compact inventory. Only stackable common objects
+        which are not unique and can be removed can be virtual objects.
 
-        if not mute:
-            # Send results to the player.
-            message = {"get_objects": objects}
-            self.msg(message)
+        Args:
+            obj_key: (string) object's key
+        """
+        if not settings.COMPACT_INVENTORY:
+            return False
+
+        object_record = get_object_record(obj_key)
+        if not object_record or object_record.typeclass != "COMMON_OBJECT":
+            return False
+
+        common_record = OBJECT_DATA_HANDLER.get_record(TYPECLASS("COMMON_OBJECT").model_name, obj_key)
+        return bool(common_record) and not common_record.unique and common_record.max_stack > 1 and \
+            common_record.can_remove
+
+    def receive_virtual_object(self, key, number, level=None):
+        """
+        Add an object to the compact inventory.
+
+        Args:
+            key: (string) object's key
+            number: (number) object's number
+            level: (number) object's level
+
+        Returns:
+            (dict) the result, same as receive_object()
+        """
+        virtual_objects = self.get_virtual_objects()
+        current = 0
+        if key in virtual_objects:
+            level, current = virtual_objects[key]
+        virtual_objects[key] = (level, current + number)
+
+        object_record = get_object_record(key)
+        common_record = OBJECT_DATA_HANDLER.get_record(TYPECLASS("COMMON_OBJECT").model_name, key)
+        return {
+            "key": key,
+            "name": object_record.name,
+            "icon": common_record.icon,
+            "number": number,
+            "reject": False,
+        }
+
+    def materialize_object(self, obj_key):
+        """
+        Turn a virtual object into objects in the inventory.
+
+        Args:
+            obj_key: (string) object's key
+
+        Returns:
+            (object) the object, or None if it is not in the compact inventory.
+        """
+        virtual_objects = self.get_virtual_objects()
+        if obj_key not in virtual_objects:
+            return None
+
+        level, number = virtual_objects[obj_key]
+        contents = self.contents
+        try:
+            with self.inventory_batch(), transaction.atomic():
+                del virtual_objects[obj_key]
+                if number > 0:
+                    self.receive_object(obj_key, number, level, compact=False)
+        except DatabaseError as e:
+            logger.log_errmsg("Can not materialize object %s: %s" % (obj_key, e))
+            self.at_inventory_rolled_back(contents)
+            return None
 
         self.show_inventory()
 
-        # call quest handler
-        for item in objects:
-            if not item["reject"]:
-                self.quest_handler.at_objective(defines.OBJECTIVE_OBJECT, item["key"], item["number"])
+        objects = self.search_inventory(obj_key)
+        return objects[0] if objects else None
 
-        return objects
+    def get_virtual_object_key(self, dbref):
+        """
+        Get the key of a virtual object in the compact inventory by its dbref.
+
+        Args:
+            dbref: (string) the virtual object's dbref.
+
+        Returns:
+            (string) the object's key, or None if it is not a virtual object.
+        """
+        if isinstance(dbref, str) and dbref.startswith(defines.VIRTUAL_OBJECT_PREFIX):
+            obj_key = dbref[len(defines.VIRTUAL_OBJECT_PREFIX):]
+            if obj_key in self.get_virtual_objects():
+                return obj_key
+        return None
+
+    def get_virtual_object_appearance(self, obj_key):
+        """
+        Get the appearance of a virtual object in the compact inventory without
+        turning it into objects.
+
+        Args:
+            obj_key: (string) object's key
+
+        Returns:
+            (dict) the appearance, same as the object's get_appearance(), or None if
+                   the character does not have it.
+        """
+        virtual_objects = self.get_virtual_objects()
+        if obj_key not in virtual_objects:
+            return None
+
+        object_record = get_object_record(obj_key)
+        common_record = OBJECT_DATA_HANDLER.get_record(TYPECLASS("COMMON_OBJECT").model_name, obj_key)
+        if not object_record or not common_record:
+            return None
+
+        dbref = defines.VIRTUAL_OBJECT_PREFIX + obj_key
+        level, number = virtual_objects[obj_key]
+
+        desc = object_record.desc
+        desc_conditions = DESC_HANDLER.get(obj_key)
+        if desc_conditions:
+            for item in desc_conditions:
+                if STATEMENT_HANDLER.match_condition(item["condition"], self, None):
+                    desc = item["desc"]
+                    break
+
+        commands = []
+        if number > 0 and common_record.can_discard:
+            commands.append({
+                "name": _("Discard"),
+                "cmd": "discard",
+                "args": dbref,
+                "confirm": _("Discard this object?"),
+            })
+
+        return {"dbref": dbref,
+                "name": object_record.name,
+                "desc": desc,
+                "cmds": commands,
+                "icon": common_record.icon,
+                "number": number,
+                "can_remove": common_record.can_remove}
+
+    def search_dbref(self, dbref, location=None):
+        """
+        Search as an object by its dbref. Virtual objects in the compact inventory
+        become objects when they are searched, so only search them to use or equip
+        them. Looking at and discarding them do not need objects.
+
+        Args:
+            dbref: (string)dbref.
+
+        Returns:
+            The object or None.
+        """
+        if isinstance(dbref, str) and dbref.startswith(defines.VIRTUAL_OBJECT_PREFIX):
+            if location and location != self and not (is_iter(location) and self in location):
+                return None
+            return self.materialize_object(dbref[len(defines.VIRTUAL_OBJECT_PREFIX):])
+
+        return super(MudderyPlayerCharacter, self).search_dbref(dbref, location)
+
+    def has_object(self, obj_key):
+        """
+        If the character has the object in the inventory.
+        """
+        return obj_key in self.get_virtual_objects() or len(self.search_inventory(obj_key)) > 0
 
     def get_object_number(self, obj_key):
         """
@@ -630,6 +931,10 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
 
         # get total number
         sum = 0
+        virtual_objects = self.get_virtual_objects()
+        if obj_key in virtual_objects:
+            sum += virtual_objects[obj_key][1]
+
         for obj in objects:
             obj_num = obj.get_number()
             sum += obj_num
@@ -708,9 +1013,10 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
             boolean: success
         """
         success = True
-        for item in obj_list:
-            if not self.remove_object(item["object"], item["number"], True):
-                success = False
+        with self.inventory_batch():
+            for item in obj_list:
+                if not self.remove_object(item["object"], item["number"], True):
+                    success = False
 
         self.show_inventory()
         return success
@@ -728,28 +1034,44 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
             boolean: success
         """
         objects = self.search_inventory(obj_key)
+        virtual_objects = self.get_virtual_objects()
 
-        # get total number
-        sum = 0
+        # Count what to remove from each object before changing anything, so nothing is
+        # removed if there are not enough objects.
+        to_remove = number
+        virtual_removed = 0
+        if obj_key in virtual_objects:
+            # remove virtual objects first
+            virtual_removed = min(virtual_objects[obj_key][1], to_remove)
+            to_remove -= virtual_removed
+
+        removals = []
         for obj in objects:
+            if to_remove <= 0:
+                break
+
             obj_num = obj.get_number()
-            sum += obj_num
+            if obj_num > 0:
+                removed = min(obj_num, to_remove)
+                removals.append((obj, removed))
+                to_remove -= removed
 
-        if sum < number:
+        if to_remove > 0:
             return False
 
         # remove objects
-        to_remove = number
+        contents = self.contents
         try:
-            for obj in objects:
-                obj_num = obj.get_number()
-                if obj_num > 0:
-                    if obj_num >= to_remove:
-                        obj.decrease_num(to_remove)
-                        to_remove = 0
+            with transaction.atomic():
+                if virtual_removed > 0:
+                    level, obj_num = virtual_objects[obj_key]
+                    if obj_num > virtual_removed:
+                        virtual_objects[obj_key] = (level, obj_num - virtual_removed)
                     else:
-                        obj.decrease_num(obj_num)
-                        to_remove -= obj_num
+                        del virtual_objects[obj_key]
+
+                for obj, removed in removals:
+                    obj.decrease_num(removed)
 
                     if obj.get_number() <= 0:
                         # If this object can be removed from the inventor.
@@ -758,16 +1080,12 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
                             if getattr(obj, "equipped", False):
                                 self.take_off_equipment(obj)
                             obj.delete()
-
-                if to_remove <= 0:
-                    break
         except Exception as e:
             logger.log_tracemsg("Can not remove object %s: %s" % (obj_key, e))
+            self.at_inventory_rolled_back(contents)
             return False
 
-        if to_remove > 0:
-            logger.log_err("Remove object error: %s" % obj_key)
-            return False
+        STATEMENT_HANDLER.state_changed(self, defines.STATUS_OBJECT, obj_key)
 
         if not mute:
             self.show_inventory()
@@ -778,9 +1096,59 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         """
         Search specified object in the inventory.
         """
-        result = [item for item in self.contents if item.get_data_key() == obj_key]
+        if self.inventory_index is None:
+            # build the index
+            self.inventory_index = {}
+            for item in self.contents:
+                key = item.get_data_key()
+                if key not in self.inventory_index:
+                    self.inventory_index[key] = []
+                self.inventory_index[key].append(item)
+
+        items = self.inventory_index.get(obj_key)
+        if not items:
+            return []
+
+        # Deleted objects do not call at_object_left.
+        result = [item for item in items if item.location == self]
+        if len(result) < len(items):
+            self.inventory_index[obj_key] = result
         return result
 
+    def at_inventory_rolled_back(self, contents):
+        """
+        Called when changes of the inventory have been rolled back. Drop all cached
+        data of the inventory, they will be loaded from the database again.
+
+        Args:
+            contents: (list) objects in the inventory before the changes.
+        """
+        for obj in self.contents:
+            if obj not in contents:
+                # the object's creation has been rolled back
+                obj.flush_from_cache(force=True)
+
+        # Cached attributes keep their changed values, load them again.
+        for obj in contents + [self]:
+            for attr in obj.attributes.all():
+                attr.flush_from_cache(force=True)
+            obj.attributes.reset_cache()
+
+        self.contents_cache.clear()
+        self.inventory_index = None
+
+    @contextmanager
+    def inventory_batch(self):
+        """
+        Hooks do not send inventory messages in this context, the caller should send
+        the inventory after all changes.
+        """
+        self.inventory_batch_depth += 1
+        try:
+            yield
+        finally:
+            self.inventory_batch_depth -= 1
+
     def show_inventory(self):
         """
         Send inventory data to player.
@@ -805,6 +1173,21 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
                 info["equipped"] = item.equipped
             inv.append(info)
 
+        # virtual objects in the compact inventory
+        common_model_name = TYPECLASS("COMMON_OBJECT").model_name
+        for key, (level, number) in self.get_virtual_objects().items():
+            object_record = get_object_record(key)
+            common_record = OBJECT_DATA_HANDLER.get_record(common_model_name, key)
+            if not object_record or not common_record:
+                continue
+
+            inv.append({"dbref": defines.VIRTUAL_OBJECT_PREFIX + key,
+                        "name": object_record.name,
+                        "number": number,
+                        "desc": object_record.desc,
+                        "can_remove": common_record.can_remove,
+                        "icon": common_record.icon})
+
         # sort by created time
         inv.sort(key=lambda x:x["dbref"])
 
@@ -983,7 +1366,7 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         """
         skills = []
 
-        for key, skill in self.db.skills.items():
+        for skill in self.skills.values():
             skills.append(skill.get_appearance(self))
 
         return skills
@@ -1217,7 +1600,8 @@ class MudderyPlayerCharacter(TYPECLASS("CHARACTER")):
         self.set_target(npc)
 
         # Get NPC's sentences_list.
-        sentences = DIALOGUE_HANDLER.get_npc_sentences(self, npc)
+        with STATEMENT_HANDLER.memoize():
+            sentences = DIALOGUE_HANDLER.get_npc_sentences(self, npc)
         
         self.save_current_dialogue(sentences, npc)
         self.msg({"dialogue": sentences})
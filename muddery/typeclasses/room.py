@@ -6,19 +6,43 @@ Rooms are simple containers that has no location of their own.
 """
 
 import ast
+import time
+import itertools
 import traceback
+from collections import namedtuple
 from django.conf import settings
 from django.apps import apps
 from muddery.utils import defines
 from muddery.utils.game_settings import GAME_SETTINGS
 from muddery.worlddata.dao.image_resources_mapper import IMAGE_RESOURCES
-from muddery.mappings.typeclass_set import TYPECLASS
+from muddery.mappings.typeclass_set import TYPECLASS, TYPECLASS_SET
 from muddery.utils.defines import ConversationType
 from muddery.utils.localized_strings_handler import _
 from evennia.utils import logger
 from evennia.objects.objects import DefaultRoom
 
 
+# An object in the room. The type of a player character is "players" whether it is online
+# or not.
+SurroundingEntry = namedtuple("SurroundingEntry", ("obj", "type", "dbref", "name", "key"))
+
+# Surroundings' versions are (epoch, counter). The epoch is the server's boot time, so
+# versions of different boots never equal each other. The counter is shared by all rooms,
+# so a room gets a new version after its ndb is lost.
+SURROUNDINGS_EPOCH = int(time.time())
+_surroundings_counter = itertools.count(1)
+
+
+def new_surroundings_version():
+    """
+    Get a new version of surroundings.
+
+    Returns:
+        (tuple) (epoch, counter)
+    """
+    return SURROUNDINGS_EPOCH, next(_surroundings_counter)
+
+
 class MudderyRoom(TYPECLASS("OBJECT"), DefaultRoom):
     """
     Rooms are like any Object, except their location is None
@@ -84,6 +108,9 @@ class MudderyRoom(TYPECLASS("OBJECT"), DefaultRoom):
         """
         super(MudderyRoom, self).at_object_receive(moved_obj, source_location, **kwargs)
 
+        # update surroundings
+        self.add_surrounding(moved_obj)
+
         if not GAME_SETTINGS.get("solo_mode"):
             # send surrounding changes to player
             type = self.get_surrounding_type(moved_obj)
@@ -106,6 +133,9 @@ class MudderyRoom(TYPECLASS("OBJECT"), DefaultRoom):
         """
         super(MudderyRoom, self).at_object_leave(moved_obj, target_location)
 
+        # update surroundings
+        self.remove_surrounding(moved_obj)
+
         if not GAME_SETTINGS.get("solo_mode"):
             # send surrounding changes to player
             type = self.get_surrounding_type(moved_obj)
@@ -155,54 +185,139 @@ class MudderyRoom(TYPECLASS("OBJECT"), DefaultRoom):
                 "players": [],
                 "offlines": []}
 
-        visible = (cont for cont in self.contents if cont != caller and
-                   cont.access(caller, "view"))
+        solo_mode = GAME_SETTINGS.get("solo_mode")
 
-        if GAME_SETTINGS.get("solo_mode"):
-            visible = (cont for cont in visible if not cont.has_account)
+        for entry in self.get_surrounding_entries():
+            cont = entry.obj
+            if cont == caller:
+                continue
+
+            type = entry.type
+            if type == "players":
+                if not cont.has_account:
+                    # do not show offline players
+                    continue
+                elif solo_mode:
+                    continue
+
+            if not cont.access(caller, "view"):
+                continue
 
-        for cont in visible:
             # only show objects that match the condition
             if not cont.is_visible(caller):
                 continue
 
-            type = self.get_surrounding_type(cont)
-            if type:
-                appearance = {}
-
-                if type == "npcs":
-                    # add quest status
-                    if hasattr(cont, "have_quest"):
-                        provide_quest, complete_quest = cont.have_quest(caller)
-                        appearance["provide_quest"] = provide_quest
-                        appearance["complete_quest"] = complete_quest
-                elif type == "offlines":
-                    continue
+            appearance = {}
+
+            if type == "npcs":
+                # add quest status
+                if hasattr(cont, "have_quest"):
+                    provide_quest, complete_quest = cont.have_quest(caller)
+                    appearance["provide_quest"] = provide_quest
+                    appearance["complete_quest"] = complete_quest
+
+            appearance["dbref"] = entry.dbref
+            appearance["name"] = entry.name
+            appearance["key"] = entry.key
 
-                appearance["dbref"] = cont.dbref
-                appearance["name"] = cont.get_name()
-                appearance["key"] = cont.get_data_key()
-                
-                info[type].append(appearance)
+            info[type].append(appearance)
 
         return info
 
+    @property
+    def surroundings_version(self):
+        """
+        The version of the room's surroundings. It changes when objects move in or out.
+        """
+        version = self.ndb.surroundings_version
+        if version is None:
+            version = new_surroundings_version()
+            self.ndb.surroundings_version = version
+        return version
+
+    def surroundings_changed(self):
+        """
+        Called when the room's surroundings have changed.
+        """
+        self.ndb.surroundings_version = new_surroundings_version()
+
+    def get_surrounding_entries(self):
+        """
+        Get cached information of all objects in the room. The cache is built from the
+        room's contents when it is used at the first time, then it is updated when objects
+        move in or out.
+
+        Returns:
+            (list) a list of SurroundingEntry.
+        """
+        cache = self.ndb.surroundings
+        if cache is None:
+            cache = {obj.id: self.get_surrounding_entry(obj) for obj in self.contents}
+            self.ndb.surroundings = cache
+
+        return list(cache.values())
+
+    def get_surrounding_entry(self, obj):
+        """
+        Get an object's information shown in the room.
+
+        Args:
+            obj: (object) an object in the room.
+
+        Returns:
+            (SurroundingEntry) the object's information.
+        """
+        type = self.get_surrounding_type(obj)
+        if type == "offlines":
+            # check if the player is online when the room is looked at
+            type = "players"
+
+        return SurroundingEntry(obj, type, obj.dbref, obj.get_name(), obj.get_data_key())
+
+    def add_surrounding(self, obj):
+        """
+        Called when an object has been put into the room.
+
+        Args:
+            obj: (object) an object in the room.
+        """
+        cache = self.ndb.surroundings
+        if cache is not None:
+            cache[obj.id] = self.get_surrounding_entry(obj)
+        self.surroundings_changed()
+
+    def remove_surrounding(self, obj):
+        """
+        Called when an object is leaving the room.
+
+        Args:
+            obj: (object) an object in the room.
+        """
+        cache = self.ndb.surroundings
+        if cache is not None:
+            cache.pop(obj.id, None)
+        self.surroundings_changed()
+
+    def update_surrounding(self, obj):
+        """
+        Called when the information of an object in the room has changed.
+
+        Args:
+            obj: (object) an object in the room.
+        """
+        cache = self.ndb.surroundings
+        if cache is not None and obj.id in cache:
+            cache[obj.id] = self.get_surrounding_entry(obj)
+            self.surroundings_changed()
+
     def get_surrounding_type(self, obj):
         """
         Get surrounding's view type.
         """
-        if obj.destination:
-            return "exits"
-        elif obj.is_typeclass(settings.BASE_GENERAL_CHARACTER_TYPECLASS, exact=False):
-            if obj.is_typeclass(settings.BASE_PLAYER_CHARACTER_TYPECLASS, exact=False):
-                if obj.has_account:
-                    return "players"
-                else:
-                    return "offlines"
-            else:
-                return "npcs"
-        else:
-            return "things"
+        category = TYPECLASS_SET.get_category(obj.__class__)
+        if category == defines.TYPECLASS_CATEGORY_PLAYER and not obj.has_account:
+            return "offlines"
+        return category
 
     @classmethod
     def get_event_trigger_types(cls):
@@ -4,13 +4,17 @@ This module handles importing data from csv files and creating the whole game wo
 
 from muddery.utils import utils
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.exception import MudderyError
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.mappings.typeclass_set import TYPECLASS, TYPECLASS_SET
 from muddery.worlddata.dao import common_mappers as CM
 from django.conf import settings
 from django.apps import apps
+from django.db import transaction, DatabaseError
 from evennia.utils import create, search, logger
 from evennia.comms.models import ChannelDB
-import traceback
+import time, hashlib, traceback
 
 
 def get_object_record(obj_key):
@@ -23,21 +27,11 @@ def get_object_record(obj_key):
     Returns:
         The object's data record.
     """
-    record = None
     model_name = TYPECLASS("OBJECT").model_name
-    try:
-        # Get record.
-        model_obj = apps.get_model(settings.WORLD_DATA_APP, model_name)
-        record = model_obj.objects.get(key=obj_key)
-    except Exception as e:
-        ostring = "Can not get record %s in %s: %s." % (obj_key, model_name, e)
-        print(ostring)
-        print(traceback.print_exc())
-
+    record = OBJECT_DATA_HANDLER.get_record(model_name, obj_key)
     if not record:
         ostring = "Can not get record %s in %s." % (obj_key, model_name)
         print(ostring)
-        print(traceback.print_exc())
 
     return record
 
@@ -50,6 +44,8 @@ def build_object(obj_key, level=None, caller=None, reset_location=True):
         obj_key: (string) The key of the object.
         level: (number) The object's level.
         caller: (command caller) If provide, running messages will send to the caller.
+
+    Database errors are raised, so the caller's transaction can be rolled back.
     """
 
     # Get object's information
@@ -78,6 +74,8 @@ def build_object(obj_key, level=None, caller=None, reset_location=True):
     try:
         name = getattr(record, "name", "")
         obj = create.create_object(typeclass_path, name)
+    except DatabaseError:
+        raise
     except Exception as e:
         ostring = "Can not create obj %s: %s" % (obj_key, e)
         print(ostring)
@@ -89,6 +87,8 @@ def build_object(obj_key, level=None, caller=None, reset_location=True):
     try:
         # Set data info.
         obj.set_data_key(record.key, level, reset_location=reset_location)
+    except DatabaseError:
+        raise
     except Exception as e:
         ostring = "Can not set data info to obj %s: %s" % (obj_key, e)
         print(ostring)
@@ -100,55 +100,176 @@ def build_object(obj_key, level=None, caller=None, reset_location=True):
     return obj
 
 
-def build_unique_objects(objects_data, type_name, caller=None):
+# Tables of data which objects load besides their typeclasses' tables:
+# (table's name, field of the object's key)
+RELATED_TABLES = (
+    ("object_properties", "object"),
+    ("default_skills", "character"),
+    ("default_objects", "character"),
+    ("character_loot_list", "provider"),
+    ("creator_loot_list", "provider"),
+    ("npc_dialogues", "npc"),
+    ("npc_shops", "npc"),
+    ("shop_goods", "shop"),
+)
+
+
+class RelatedData(object):
+    """
+    Records of RELATED_TABLES grouped by objects' keys. The goods of an NPC's shops
+    belong to the NPC too.
+    """
+    def __init__(self, obj_key=None):
+        """
+        Load records.
+
+        Args:
+            obj_key: (string) only load records of this object, load all records if it
+                     is None.
+        """
+        # {object's key: [(table's name, record's values), ...]}
+        self.records = {}
+
+        for model_name, field in RELATED_TABLES:
+            model = apps.get_model(settings.WORLD_DATA_APP, model_name)
+            if obj_key is None:
+                query = model.objects.all()
+            elif model_name == "shop_goods":
+                shops = apps.get_model(settings.WORLD_DATA_APP, "npc_shops").objects.filter(npc=obj_key)
+                query = model.objects.filter(shop__in=[record.shop for record in shops])
+            else:
+                query = model.objects.filter(**{field: obj_key})
+
+            for values in query.order_by("id").values():
+                key = values.pop(field)
+                values.pop("id", None)
+                if key not in self.records:
+                    self.records[key] = []
+                self.records[key].append((model_name, sorted(values.items())))
+
+    def get(self, obj_key):
+        """
+        Get an object's records.
+
+        Args:
+            obj_key: (string) the object's key.
+
+        Returns:
+            (list) records.
+        """
+        records = list(self.records.get(obj_key, []))
+        for model_name, values in self.records.get(obj_key, []):
+            if model_name == "npc_shops":
+                records.extend(self.records.get(dict(values)["shop"], []))
+        return records
+
+
+def get_object_data_hash(obj_key, related_data=None):
+    """
+    Get the hash of an object's data. It covers the object's records in all its
+    typeclass's tables and in RELATED_TABLES: custom properties, default skills and
+    objects, loot lists, dialogues, shops and their goods. Other data, such as events,
+    dialogues' content and quests, is loaded when it is used and is not covered.
+
+    Args:
+        obj_key: (string) The key of the object.
+        related_data: (RelatedData, optional) records of all objects, query the
+                      object's records if it is not given.
+
+    Returns:
+        (string) the hash, or an empty string if the object does not have data.
+    """
+    record = get_object_record(obj_key)
+    if not record:
+        return ""
+
+    typeclass = TYPECLASS(record.typeclass)
+    if not typeclass:
+        return ""
+
+    if related_data is None:
+        related_data = RelatedData(obj_key)
+
+    data = [OBJECT_DATA_HANDLER.get_record(model_name, obj_key) for model_name in typeclass.get_models()]
+    data.append(related_data.get(obj_key))
+    return hashlib.md5(repr(data).encode("utf-8")).hexdigest()
+
+
+def is_location_changed(obj, location_key):
+    """
+    If the object is not in its default location.
+
+    Args:
+        obj: (object) the object.
+        location_key: (string) the key of the object's default location.
+    """
+    current_key = ""
+    if obj.location and hasattr(obj.location, "get_data_key"):
+        current_key = obj.location.get_data_key()
+    return current_key != (location_key or "")
+
+
+def build_unique_objects(objects_data, type_name, caller=None, dry_run=False, batch_size=100, related_data=None):
     """
-    Build all objects in a model.
+    Build all objects in a model. Only objects whose data or location have changed are updated.
 
     Args:
-        model_name: (string) The name of the data model.
+        objects_data: (list) records of objects.
+        type_name: (string) the type of unique objects.
         caller: (command caller) If provide, running messages will send to the caller.
+        dry_run: (boolean) only list changes, do not change objects.
+        batch_size: (number) the number of objects created in a transaction.
+        related_data: (RelatedData, optional) records of RELATED_TABLES of all objects.
+
+    Returns:
+        (dict) the report of changes.
     """
+    begin = time.time()
+    if related_data is None:
+        related_data = RelatedData()
+
+    report = {
+        "type": type_name,
+        "created": [],
+        "updated": [],
+        "removed": [],
+        "unchanged": 0,
+    }
+
     # new objects
-    new_obj_keys = set(record.key for record in objects_data)
+    new_records = {record.key: record for record in objects_data}
 
     # current objects
     current_objs = utils.search_obj_unique_type(type_name)
 
     # remove objects
-    count_remove = 0
-    count_update = 0
-    count_create = 0
     current_obj_keys = set()
-
     for obj in current_objs:
         obj_key = obj.get_data_key()
 
-        if obj_key in current_obj_keys:
-            # This object is duplcated.
-            ostring = "Deleting %s" % obj_key
-            print(ostring)
-            if caller:
-                caller.msg(ostring)
+        if obj_key in current_obj_keys or obj_key not in new_records:
+            # This object is duplicated or should be removed.
+            report["removed"].append(obj_key)
+            if dry_run:
+                continue
 
             # If default home will be removed, set default home to the Limbo.
             if obj.dbref == settings.DEFAULT_HOME:
                 settings.DEFAULT_HOME = "#2"
             obj.delete()
-            count_remove += 1
             continue
 
-        if not obj_key in new_obj_keys:
-            # This object should be removed
-            ostring = "Deleting %s" % obj_key
-            print(ostring)
-            if caller:
-                caller.msg(ostring)
+        current_obj_keys.add(obj_key)
 
-            # If default home will be removed, set default home to the Limbo.
-            if obj.dbref == settings.DEFAULT_HOME:
-                settings.DEFAULT_HOME = "#2"
-            obj.delete()
-            count_remove += 1
+        data_hash = get_object_data_hash(obj_key, related_data)
+        location_key = getattr(new_records[obj_key], "location", "")
+        if data_hash == utils.get_obj_data_hash(obj) and not is_location_changed(obj, location_key):
+            # Nothing changed.
+            report["unchanged"] += 1
+            continue
+
+        report["updated"].append(obj_key)
+        if dry_run:
             continue
 
         try:
@@ -156,6 +277,7 @@ def build_unique_objects(objects_data, type_name, caller=None):
             obj.load_data()
             # put obj to its default location
             obj.reset_location()
+            utils.set_obj_data_hash(obj, data_hash)
         except Exception as e:
             ostring = "%s can not load data:%s" % (obj.dbref, e)
             print(ostring)
@@ -163,72 +285,111 @@ def build_unique_objects(objects_data, type_name, caller=None):
             if caller:
                 caller.msg(ostring)
 
-        current_obj_keys.add(obj_key)
-
     # Create new objects.
-    object_model_name = TYPECLASS("OBJECT").model_name
-    object_model = apps.get_model(settings.WORLD_DATA_APP, object_model_name)
-    for record in objects_data:
-        if not record.key in current_obj_keys:
-            # Create new objects.
-            ostring = "Creating %s." % record.key
-            print(ostring)
-            if caller:
-                caller.msg(ostring)
-
-            try:
-                object_record = object_model.objects.get(key=record.key)
-                typeclass_path = TYPECLASS_SET.get_module(object_record.typeclass)
-                obj = create.create_object(typeclass_path, object_record.name)
-                count_create += 1
-            except Exception as e:
-                ostring = "Can not create obj %s: %s" % (record.key, e)
-                print(ostring)
-                print(traceback.print_exc())
-                if caller:
-                    caller.msg(ostring)
-                continue
-
-            try:
-                obj.set_data_key(record.key)
-                utils.set_obj_unique_type(obj, type_name)
-            except Exception as e:
-                ostring = "Can not set data info to obj %s: %s" % (record.key, e)
-                print(ostring)
-                print(traceback.print_exc())
-                if caller:
-                    caller.msg(ostring)
-                continue
-
-    ostring = "Removed %d object(s). Created %d object(s). Updated %d object(s). Total %d objects.\n"\
-              % (count_remove, count_create, count_update, len(objects_data))
+    new_keys = [key for key in new_records if key not in current_obj_keys]
+    report["created"] = new_keys
+    if not dry_run:
+        for i in range(0, len(new_keys), batch_size):
+            with transaction.atomic():
+                for obj_key in new_keys[i:i + batch_size]:
+                    try:
+                        with transaction.atomic():
+                            obj = build_unique_object(obj_key, type_name, related_data)
+                    except Exception as e:
+                        ostring = "Can not create obj %s: %s" % (obj_key, e)
+                        print(ostring)
+                        print(traceback.print_exc())
+                        if caller:
+                            caller.msg(ostring)
+
+    report["total"] = len(new_records)
+    report["time"] = time.time() - begin
+
+    ostring = "%s: removed %d object(s). Created %d object(s). Updated %d object(s). Total %d objects. (%.3fs)"\
+              % (type_name, len(report["removed"]), len(report["created"]), len(report["updated"]),
+                 report["total"], report["time"])
     print(ostring)
     if caller:
         caller.msg(ostring)
 
+    return report
+
+
+def build_unique_object(obj_key, type_name, related_data=None):
+    """
+    Create a unique object.
+
+    Args:
+        obj_key: (string) The key of the object.
+        type_name: (string) the type of unique objects.
+        related_data: (RelatedData, optional) records of RELATED_TABLES of all objects.
 
-def build_all(caller=None):
+    Returns:
+        (object) the new object.
+    """
+    object_record = get_object_record(obj_key)
+    if not object_record:
+        raise MudderyError("Can not find the object's record.")
+
+    typeclass_path = TYPECLASS_SET.get_module(object_record.typeclass)
+    obj = create.create_object(typeclass_path, object_record.name)
+
+    obj.set_data_key(obj_key)
+    utils.set_obj_unique_type(obj, type_name)
+    utils.set_obj_data_hash(obj, get_object_data_hash(obj_key, related_data))
+    return obj
+
+
+def build_all(caller=None, dry_run=False):
     """
     Build all objects in the world.
 
     Args:
         caller: (command caller) If provide, running messages will send to the caller.
+        dry_run: (boolean) only list changes, do not change objects.
+
+    Returns:
+        (list) reports of every type of objects.
     """
+    begin = time.time()
+
+    # Use the latest data.
+    OBJECT_DATA_HANDLER.reload()
+    STATEMENT_HANDLER.clear_cache()
+
+    # Records of related tables are queried once for all objects.
+    related_data = RelatedData()
+
+    reports = []
+
     # Build areas.
-    build_unique_objects(CM.WORLD_AREAS.all(), "world_areas", caller)
+    reports.append(build_unique_objects(CM.WORLD_AREAS.all(), "world_areas", caller, dry_run,
+                                        related_data=related_data))
     
     # Build rooms.
-    build_unique_objects(CM.WORLD_ROOMS.all(), "world_rooms", caller)
-    reset_default_locations()
+    reports.append(build_unique_objects(CM.WORLD_ROOMS.all(), "world_rooms", caller, dry_run,
+                                        related_data=related_data))
+    if not dry_run:
+        reset_default_locations()
 
     # Build exits.
-    build_unique_objects(CM.WORLD_EXITS.all(), "world_exits", caller)
+    reports.append(build_unique_objects(CM.WORLD_EXITS.all(), "world_exits", caller, dry_run,
+                                        related_data=related_data))
 
     # Build objects.
-    build_unique_objects(CM.WORLD_OBJECTS.all(), "world_objects", caller)
+    reports.append(build_unique_objects(CM.WORLD_OBJECTS.all(), "world_objects", caller, dry_run,
+                                        related_data=related_data))
 
     # Build NPCs.
-    build_unique_objects(CM.WORLD_NPCS.all(), "world_npcs", caller)
+    reports.append(build_unique_objects(CM.WORLD_NPCS.all(), "world_npcs", caller, dry_run,
+                                        related_data=related_data))
+
+    ostring = "Built the world in %.3f seconds." % (time.time() - begin)
+    print(ostring)
+    if caller:
+        caller.msg(ostring)
+
+    return reports
 
 
 def reset_default_locations():
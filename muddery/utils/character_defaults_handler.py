@@ -0,0 +1,97 @@
+"""
+This model keeps characters' default skills and default objects.
+"""
+
+from collections import namedtuple
+from evennia.utils import logger
+from muddery.worlddata.dao.default_skills_mapper import DEFAULT_SKILLS
+from muddery.worlddata.dao.default_objects_mapper import DEFAULT_OBJECTS
+
+
+DefaultSkill = namedtuple("DefaultSkill", ("skill",))
+DefaultObject = namedtuple("DefaultObject", ("object", "level", "number"))
+
+
+class CharacterDefaultsHandler(object):
+    """
+    Characters' default skills and objects. The data is shared by all characters, it
+    must not be modified.
+    """
+    model_names = (DEFAULT_SKILLS.model_name, DEFAULT_OBJECTS.model_name)
+
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # {character's key: (DefaultSkill, DefaultSkill, ...)}
+        self.skills = {}
+
+        # {character's key: (DefaultObject, DefaultObject, ...)}
+        self.objects = {}
+
+        self.loaded = False
+
+    def reload(self):
+        """
+        Reload data.
+        """
+        self.clear()
+
+        skills = {}
+        objects = {}
+        try:
+            for record in DEFAULT_SKILLS.all():
+                if record.character not in skills:
+                    skills[record.character] = []
+                skills[record.character].append(DefaultSkill(record.skill))
+
+            for record in DEFAULT_OBJECTS.all():
+                if record.character not in objects:
+                    objects[record.character] = []
+                objects[record.character].append(DefaultObject(record.object, record.level, record.number))
+        except Exception as e:
+            logger.log_errmsg("Can not load characters' default skills and objects: %s" % e)
+
+        self.skills = {key: tuple(value) for key, value in skills.items()}
+        self.objects = {key: tuple(value) for key, value in objects.items()}
+        self.loaded = True
+
+    def get_default_skills(self, character):
+        """
+        Get a character's default skills.
+
+        Args:
+            character: (string) character's key.
+
+        Returns:
+            (tuple) default skills
+        """
+        if not self.loaded:
+            self.reload()
+
+        return self.skills.get(character, ())
+
+    def get_default_objects(self, character):
+        """
+        Get a character's default objects.
+
+        Args:
+            character: (string) character's key.
+
+        Returns:
+            (tuple) default objects
+        """
+        if not self.loaded:
+            self.reload()
+
+        return self.objects.get(character, ())
+
+
+# main character defaults handler
+CHARACTER_DEFAULTS_HANDLER = CharacterDefaultsHandler()
@@ -32,6 +32,11 @@ EVENT_TRIGGER_DIE = "EVENT_TRIGGER_DIE"             # caller die. object: killer
 EVENT_TRIGGER_TRAVERSE = "EVENT_TRIGGER_TRAVERSE"   # before traverse an exit. object: exit_id
 EVENT_TRIGGER_SENTENCE = "EVENT_TRIGGER_SENTENCE"   # called when a character finishes a dialogue sentence.
 
+# caller's status used in conditions
+STATUS_QUEST = "STATUS_QUEST"               # quest's status. object: quest_id
+STATUS_OBJECT = "STATUS_OBJECT"             # objects in the inventory. object: object_id
+STATUS_ATTRIBUTE = "STATUS_ATTRIBUTE"       # statement attributes. object: attribute's key
+
 # event types
 EVENT_NONE = ""
 EVENT_ATTACK = "EVENT_ATTACK"               # event to begin a combat
@@ -43,6 +48,22 @@ COMBAT_LOSE = "COMBAT_LOSE"                 # lose the combat
 COMBAT_DRAW = "COMBAT_DRAW"                 # no one wins the combat
 COMBAT_ESCAPED = "COMBAT_ESCAPED"             # escaped from the combat
 
+# the prefix of virtual objects' ids in the compact inventory
+VIRTUAL_OBJECT_PREFIX = "virtual:"
+
+# the prefix of skills' ids
+SKILL_PREFIX = "skill:"
+
+# the tag of temporary mobs
+TEMP_MOB_TAG = "temp_mob"
+TEMP_MOB_TAG_CATEGORY = "mob_pool"
+
+# categories of objects' typeclasses, they are also the types of objects in rooms
+TYPECLASS_CATEGORY_EXIT = "exits"
+TYPECLASS_CATEGORY_NPC = "npcs"
+TYPECLASS_CATEGORY_PLAYER = "players"
+TYPECLASS_CATEGORY_THING = "things"
+
 
 class ConversationType(Enum):
     PRIVATE = "PRIVATE"
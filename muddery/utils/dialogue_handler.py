@@ -5,7 +5,8 @@ The DialogueHandler maintains a pool of dialogues.
 
 """
 
-import re
+import re, time
+from django.conf import settings
 from muddery.utils import defines
 from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.game_settings import GAME_SETTINGS
@@ -26,6 +27,12 @@ class DialogueHandler(object):
     """
     speaker_escape = re.compile(r'%[%|p|n]')
 
+    # tables of dialogues' data
+    model_names = (DIALOGUES.model_name,
+                   DIALOGUE_SENTENCES.model_name,
+                   DIALOGUE_RELATIONS.model_name,
+                   DIALOGUE_QUESTION.model_name)
+
     @staticmethod
     def escape_fun(word):
         """
@@ -44,6 +51,13 @@ class DialogueHandler(object):
         """
         self.can_close_dialogue = GAME_SETTINGS.get("can_close_dialogue")
         self.dialogue_storage = {}
+
+        # quests can be provided or finished after dialogues
+        # {dialogue's key: (quests to provide, quests to finish)}
+        self.reachable_quests = {}
+
+        # dialogues' data has been changed, reload the cache when it is used
+        self.dirty = False
     
     def load_cache(self, dialogue):
         """
@@ -56,9 +70,10 @@ class DialogueHandler(object):
             # already cached
             return
 
-        # Add cache of the whole dialogue.
+        # Add cache of the whole dialogue. Dialogues which are not preloaded, such as
+        # dialogues added after the preload, are queried here.
         self.dialogue_storage[dialogue] = {}
-        
+
         # Get db model
         try:
             dialogue_record = DIALOGUES.get(dialogue)
@@ -73,6 +88,64 @@ class DialogueHandler(object):
 
         dependencies = DIALOGUE_QUESTION.filter(dialogue)
 
+        # Add to cache.
+        self.dialogue_storage[dialogue] = self.create_dialogue(dialogue_record, sentences, nexts, dependencies)
+
+    def load_all(self):
+        """
+        Load all dialogues to the cache. Every table is queried only once.
+        """
+        begin = time.time()
+        self.clear()
+
+        # Group records by dialogues.
+        all_sentences = {}
+        for record in DIALOGUE_SENTENCES.all():
+            if record.dialogue not in all_sentences:
+                all_sentences[record.dialogue] = []
+            all_sentences[record.dialogue].append(record)
+
+        all_nexts = {}
+        for record in DIALOGUE_RELATIONS.all():
+            if record.dialogue not in all_nexts:
+                all_nexts[record.dialogue] = []
+            all_nexts[record.dialogue].append(record)
+
+        all_dependencies = {}
+        for record in DIALOGUE_QUESTION.all():
+            if record.dialogue not in all_dependencies:
+                all_dependencies[record.dialogue] = []
+            all_dependencies[record.dialogue].append(record)
+
+        for dialogue_record in DIALOGUES.all():
+            dialogue = dialogue_record.key
+            sentences = all_sentences.get(dialogue)
+            if not sentences:
+                self.dialogue_storage[dialogue] = {}
+                continue
+
+            self.dialogue_storage[dialogue] = self.create_dialogue(dialogue_record,
+                                                                   sentences,
+                                                                   all_nexts.get(dialogue, []),
+                                                                   all_dependencies.get(dialogue, []))
+
+        logger.log_infomsg("Loaded %d dialogues in %.3f seconds." % (len(self.dialogue_storage), time.time() - begin))
+
+    def create_dialogue(self, dialogue_record, sentences, nexts, dependencies):
+        """
+        Create a dialogue's data from its records.
+
+        Args:
+            dialogue_record: (object) dialogue's record
+            sentences: (list) sentences' records
+            nexts: (list) records of the dialogue's relations
+            dependencies: (list) records of the dialogue's quest dependencies
+
+        Returns:
+            (dict) dialogue's data
+        """
+        dialogue = dialogue_record.key
+
         # Add db fields to data object.
         data = {}
 
@@ -124,8 +197,7 @@ class DialogueHandler(object):
 
         data["nexts"] = [next_one.next_dlg for next_one in nexts]
 
-        # Add to cache.
-        self.dialogue_storage[dialogue] = data
+        return data
 
     def get_dialogue(self, dialogue):
         """
@@ -134,6 +206,9 @@ class DialogueHandler(object):
         if not dialogue:
             return
 
+        if self.dirty:
+            self.reload()
+
         # Load cache.
         self.load_cache(dialogue)
 
@@ -398,11 +473,72 @@ class DialogueHandler(object):
 
         caller.quest_handler.at_objective(defines.OBJECTIVE_TALK, dialogue)
 
+    def reload(self):
+        """
+        Clear the cache, and load all dialogues if PRELOAD_DIALOGUES is True.
+        """
+        if settings.PRELOAD_DIALOGUES:
+            self.load_all()
+        else:
+            self.clear()
+
     def clear(self):
         """
         clear cache
         """
         self.dialogue_storage = {}
+        self.reachable_quests = {}
+        self.dirty = False
+
+    def mark_dirty(self):
+        """
+        Dialogues' data has been changed. The cache will be reloaded when dialogues
+        are used next time, so many changes only cause one reload.
+        """
+        self.dirty = True
+
+    def get_reachable_quests(self, dialogue):
+        """
+        Get quests that can be provided or finished in the dialogue and all
+        dialogues after it. Dialogues may refer to each other, each dialogue is
+        only visited once.
+
+        Args:
+            dialogue: (string) dialogue's key
+
+        Returns:
+            (tuple) a set of quests to provide and a set of quests to finish.
+        """
+        if self.dirty:
+            self.reload()
+
+        if dialogue in self.reachable_quests:
+            return self.reachable_quests[dialogue]
+
+        provide_quests = set()
+        finish_quests = set()
+
+        visited = set()
+        stack = [dialogue]
+        while stack:
+            dlg_key = stack.pop()
+            if dlg_key in visited:
+                continue
+            visited.add(dlg_key)
+
+            npc_dlg = self.get_dialogue(dlg_key)
+            if not npc_dlg:
+                continue
+
+            for sen in npc_dlg["sentences"]:
+                provide_quests.update(sen["provide_quest"])
+                finish_quests.update(sen["finish_quest"])
+
+            stack.extend(npc_dlg["nexts"])
+
+        result = (frozenset(provide_quests), frozenset(finish_quests))
+        self.reachable_quests[dialogue] = result
+        return result
 
     def have_quest(self, caller, npc):
         """
@@ -418,10 +554,27 @@ class DialogueHandler(object):
         if not npc:
             return (provide_quest, finish_quest)
 
+        # Quests in npc's dialogues.
+        provide_quests = set()
+        finish_quests = set()
+        for dlg_key in npc.dialogues:
+            provide, finish = self.get_reachable_quests(dlg_key)
+            provide_quests.update(provide)
+            finish_quests.update(finish)
+
+        # Quests that the caller may get or turn in.
+        quest_handler = caller.quest_handler
+        accomplished_quests = quest_handler.get_accomplished_quests()
+        can_finish = finish_quests.intersection(accomplished_quests)
+        can_provide = provide_quests.difference(quest_handler.finished_quests, quest_handler.current_quests)
+        if not can_finish and not can_provide:
+            return (provide_quest, finish_quest)
+
         # get npc's default dialogues
+        visited = set()
         for dlg_key in npc.dialogues:
             # find quests by recursion
-            provide, finish = self.dialogue_have_quest(caller, npc, dlg_key)
+            provide, finish = self.dialogue_have_quest(caller, npc, dlg_key, can_provide, can_finish, visited)
                 
             provide_quest = (provide_quest or provide)
             finish_quest = (finish_quest or finish)
@@ -429,25 +582,46 @@ class DialogueHandler(object):
             if finish_quest:
                 break
 
-            if not caller.quest_handler.get_accomplished_quests():
+            if not accomplished_quests:
                 if provide_quest:
                     break
 
         return (provide_quest, finish_quest)
 
-    def dialogue_have_quest(self, caller, npc, dialogue):
+    def dialogue_have_quest(self, caller, npc, dialogue, can_provide=None, can_finish=None, visited=None):
         """
         Find quests by recursion.
+
+        Args:
+            caller: (object) the character
+            npc: (object) the NPC
+            dialogue: (string) dialogue's key
+            can_provide: (set) quests that may be provided to the caller, None means all quests.
+            can_finish: (set) quests that the caller has accomplished, None means all quests.
+            visited: (set) dialogues that have been checked.
         """
         provide_quest = False
         finish_quest = False
 
+        if visited is None:
+            visited = set()
+
+        if dialogue in visited:
+            return (provide_quest, finish_quest)
+        visited.add(dialogue)
+
+        # skip dialogues without available quests
+        if can_provide is not None and can_finish is not None:
+            provide, finish = self.get_reachable_quests(dialogue)
+            if can_provide.isdisjoint(provide) and can_finish.isdisjoint(finish):
+                return (provide_quest, finish_quest)
+
         # check if the dialogue is available
         npc_dlg = self.get_dialogue(dialogue)
         if not npc_dlg:
             return (provide_quest, finish_quest)
 
-        if not STATEMENT_HANDLER.match_condition(npc_dlg["condition"], caller, npc):
+        if not STATEMENT_HANDLER.match_condition_cached(npc_dlg["condition"], caller, npc):
             return (provide_quest, finish_quest)
 
         match = True
@@ -462,19 +636,25 @@ class DialogueHandler(object):
         # find quests in its sentences
         for sen in npc_dlg["sentences"]:
             for quest_key in sen["finish_quest"]:
+                if can_finish is not None and quest_key not in can_finish:
+                    continue
+
                 if caller.quest_handler.is_accomplished(quest_key):
                     finish_quest = True
                     return (provide_quest, finish_quest)
 
             if not provide_quest and sen["provide_quest"]:
                 for quest_key in sen["provide_quest"]:
+                    if can_provide is not None and quest_key not in can_provide:
+                        continue
+
                     if caller.quest_handler.can_provide(quest_key):
                         provide_quest = True
                         return (provide_quest, finish_quest)
 
         for dlg_key in npc_dlg["nexts"]:
             # get next dialogue
-            provide, finish = self.dialogue_have_quest(caller, npc, dlg_key)
+            provide, finish = self.dialogue_have_quest(caller, npc, dlg_key, can_provide, can_finish, visited)
                 
             provide_quest = (provide_quest or provide)
             finish_quest = (finish_quest or finish)
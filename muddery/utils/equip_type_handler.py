@@ -2,10 +2,14 @@
 This handles the relations of equipment types and character careers.
 """
 
+from collections import namedtuple
 from evennia.utils import logger
 from muddery.worlddata.dao import common_mappers as CM
 
 
+EquipmentPosition = namedtuple("EquipmentPosition", ("key", "name", "desc"))
+
+
 class EquipTypeHandler(object):
     """
     The model maintains a dict of equip_type to careers.
@@ -23,6 +27,10 @@ class EquipTypeHandler(object):
         """
         self.career_equip = {}
 
+        # (EquipmentPosition, EquipmentPosition, ...)
+        self.positions = ()
+        self.loaded = False
+
     
     def reload(self):
         """
@@ -30,6 +38,14 @@ class EquipTypeHandler(object):
         """
         self.clear()
 
+        try:
+            self.positions = tuple(EquipmentPosition(record.key, record.name, record.desc)
+                                   for record in CM.EQUIPMENT_POSITIONS.all())
+        except Exception as e:
+            logger.log_errmsg("Can not load equipment positions: %s" % e)
+
+        self.loaded = True
+
         """
         try:
             for record in CM.CAREER_EQUIPMENTS.all():
@@ -43,7 +59,19 @@ class EquipTypeHandler(object):
             pass
         """
 
-    
+
+    def get_positions(self):
+        """
+        Get all equipment positions.
+
+        Returns:
+            (tuple) equipment positions
+        """
+        if not self.loaded:
+            self.reload()
+
+        return self.positions
+
     def can_equip(self, career, equip):
         """
         Check if the equipment's type matchs career.
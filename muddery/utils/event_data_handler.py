@@ -0,0 +1,90 @@
+"""
+This model keeps all events' data, grouped by their trigger objects and trigger types.
+"""
+
+from evennia.utils import logger
+from muddery.worlddata.dao import event_mapper
+
+
+class EventDataHandler(object):
+    """
+    All events' data. The data is shared by all event triggers, it must not be modified.
+    """
+    model_name = "event_data"
+
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # {trigger object's key: {trigger type: (event, event, ...)}}
+        self.events = {}
+        self.loaded = False
+
+    def reload(self):
+        """
+        Reload events' data.
+        """
+        self.clear()
+
+        events = {}
+        try:
+            for record in event_mapper.get_all_events():
+                # Add db fields to dict.
+                event = {}
+                for field in record._meta.fields:
+                    event[field.name] = record.serializable_value(field.name)
+
+                if record.trigger_obj not in events:
+                    events[record.trigger_obj] = {}
+                object_events = events[record.trigger_obj]
+
+                if record.trigger_type not in object_events:
+                    object_events[record.trigger_type] = []
+                object_events[record.trigger_type].append(event)
+        except Exception as e:
+            logger.log_errmsg("Can not load events: %s" % e)
+
+        for object_events in events.values():
+            for trigger_type in object_events:
+                object_events[trigger_type] = tuple(object_events[trigger_type])
+
+        self.events = events
+        self.loaded = True
+
+    def get_events(self, trigger_obj):
+        """
+        Get an object's events.
+
+        Args:
+            trigger_obj: (string) the trigger object's key.
+
+        Returns:
+            (dict) events of every trigger type: {trigger type: (event, event, ...)}
+        """
+        if not self.loaded:
+            self.reload()
+
+        return self.events.get(trigger_obj, {})
+
+    def get_trigger_events(self, trigger_obj, trigger_type):
+        """
+        Get an object's events of the trigger type.
+
+        Args:
+            trigger_obj: (string) the trigger object's key.
+            trigger_type: (string) the trigger's type.
+
+        Returns:
+            (tuple) events
+        """
+        return self.get_events(trigger_obj).get(trigger_type, ())
+
+
+# main event data handler
+EVENT_DATA_HANDLER = EventDataHandler()
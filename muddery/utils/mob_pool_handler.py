@@ -0,0 +1,201 @@
+"""
+This model keeps pools of temporary mobs.
+
+A temporary mob is created when a character attacks a clone of a target. When the
+combat finishes, the mob is reset and put back into the pool of its key and level
+instead of being deleted, so the next temporary combat with the same target does not
+need to create the object, swap its typeclass and load its data, skills and objects
+again.
+"""
+
+import time
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from evennia.utils import logger
+from muddery.utils import defines
+from muddery.utils.builder import build_object
+from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+from muddery.utils.skill_handler import SKILL_DATA_HANDLER
+from muddery.mappings.typeclass_set import TYPECLASS_SET
+from muddery.worlddata.dao.common_mappers import EQUIPMENT_POSITIONS
+from muddery.worlddata.dao.loot_list_mapper import CHARACTER_LOOT_LIST
+
+
+class MobPoolHandler(object):
+    """
+    Pools of temporary mobs, grouped by mobs' keys and levels.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        # {(mob's key, level): [idle mob, ...]}
+        self.pools = {}
+
+        # Mobs created before the last clear() will not be put back to pools.
+        self.version = 0
+
+        self.reset_stats()
+
+    def clear(self):
+        """
+        Delete all idle mobs. Mobs in combats will be deleted when they are released.
+        Called when the world's data has changed.
+        """
+        pools = self.pools
+        self.pools = {}
+        self.version += 1
+
+        for mobs in pools.values():
+            for mob in mobs:
+                self.delete_mob(mob)
+
+    def get_model_names(self):
+        """
+        Get the tables of mobs' data, including their skills, objects and loots.
+
+        Returns:
+            (set) tables' names.
+        """
+        model_names = set(CHARACTER_DEFAULTS_HANDLER.model_names)
+        model_names.update((CHARACTER_LOOT_LIST.model_name, EQUIPMENT_POSITIONS.model_name))
+        model_names.update(SKILL_DATA_HANDLER.get_model_names())
+        for group in ("CHARACTER", "COMMON_OBJECT"):
+            for typeclass in TYPECLASS_SET.get_group(group).values():
+                model_names.update(typeclass.get_models())
+        return model_names
+
+    def reload(self):
+        """
+        Delete temporary mobs left by the last run of the server.
+        """
+        self.clear()
+
+        try:
+            mobs = ObjectDB.objects.get_by_tag(key=defines.TEMP_MOB_TAG,
+                                               category=defines.TEMP_MOB_TAG_CATEGORY)
+            for mob in mobs:
+                self.delete_mob(mob)
+        except Exception as e:
+            logger.log_errmsg("Can not delete temporary mobs: %s" % e)
+
+    def delete_mob(self, mob):
+        """
+        Delete a mob.
+        """
+        try:
+            mob.delete()
+        except Exception as e:
+            logger.log_errmsg("Can not delete temporary mob %s: %s" % (mob, e))
+
+    def acquire(self, mob_key, level):
+        """
+        Get a temporary mob from the pool, or create a new one if the pool is empty.
+
+        Args:
+            mob_key: (string) the mob's key.
+            level: (number) the mob's level.
+
+        Returns:
+            (object) the mob, or None if it can not be created.
+        """
+        pool = self.pools.get((mob_key, level))
+        while pool:
+            mob = pool.pop()
+            if not mob.pk:
+                # the mob has been deleted
+                continue
+
+            self.hits += 1
+            mob.ndb.mob_pool_version = self.version
+            mob.ndb.mob_pool_key = (mob_key, level)
+            return mob
+
+        self.misses += 1
+        mob = build_object(mob_key, level, reset_location=False)
+        if not mob:
+            return
+
+        mob.tags.add(defines.TEMP_MOB_TAG, category=defines.TEMP_MOB_TAG_CATEGORY)
+        mob.ndb.mob_pool_version = self.version
+        mob.ndb.mob_pool_key = (mob_key, level)
+        return mob
+
+    def release(self, mob):
+        """
+        Put a temporary mob back to its pool after the combat. It will be deleted if
+        the pool is full or the world's data has changed.
+
+        Args:
+            mob: (object) the mob.
+        """
+        if not mob.pk:
+            return
+
+        # put the mob back to the pool it is got from
+        key = mob.ndb.mob_pool_key
+        if key is None:
+            key = (mob.get_data_key(), mob.db.level)
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = []
+
+        if mob.ndb.mob_pool_version != self.version or len(pool) >= settings.MOB_POOL_SIZE:
+            self.discards += 1
+            self.delete_mob(mob)
+            return
+
+        try:
+            mob.reset_temp_state()
+        except Exception as e:
+            logger.log_errmsg("Can not reset temporary mob %s: %s" % (mob, e))
+            self.discards += 1
+            self.delete_mob(mob)
+            return
+
+        if mob.location:
+            if hasattr(mob.location, "remove_surrounding"):
+                mob.location.remove_surrounding(mob)
+            mob.location = None
+
+        pool.append(mob)
+        self.pools[key] = pool
+        self.releases += 1
+
+    def stats(self):
+        """
+        Get the pool's metrics.
+
+        Returns:
+            (dict) metrics:
+                idle: number of idle mobs in pools
+                hits: number of mobs got from pools since the last reset
+                misses: number of mobs created since the last reset
+                hit_rate: hits / (hits + misses)
+                releases: number of mobs put back to pools
+                discards: number of mobs deleted after combats
+        """
+        requests = self.hits + self.misses
+        elapsed = time.time() - self.stats_begin
+        return {"pools": len(self.pools),
+                "idle": sum([len(mobs) for mobs in self.pools.values()]),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": float(self.hits) / requests if requests else 0,
+                "releases": self.releases,
+                "discards": self.discards,
+                "spawns_per_second": requests / elapsed if elapsed > 0 else 0}
+
+    def reset_stats(self):
+        """
+        Reset metrics.
+        """
+        self.stats_begin = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+        self.discards = 0
+
+
+# main mob pool handler
+MOB_POOL_HANDLER = MobPoolHandler()
@@ -0,0 +1,123 @@
+"""
+This model keeps a read-only snapshot of all objects' data tables.
+
+All tables of objects (models inherit from BaseObjects) are loaded at once, every
+record is kept in a compact named tuple and indexed by its key, so objects do not
+need to query the database when they load their data.
+"""
+
+import time
+from collections import namedtuple
+from django.apps import apps
+from django.conf import settings
+from evennia.utils import logger
+from muddery.worlddata.db.models import BaseObjects
+
+
+class ObjectDataHandler(object):
+    """
+    Objects' data of all object tables. The data is shared by all objects, it must not
+    be modified.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Clear data.
+        """
+        # {table's name: {object's key: record}}
+        self.tables = {}
+        self.loaded = False
+
+    def reload(self):
+        """
+        Reload all object tables.
+        """
+        self.clear()
+
+        begin = time.time()
+        count = 0
+        try:
+            for model_obj in apps.get_app_config(settings.WORLD_DATA_APP).get_models():
+                if issubclass(model_obj, BaseObjects):
+                    count += self.load_table(model_obj)
+        except Exception as e:
+            logger.log_errmsg("Can not load objects' data: %s" % e)
+
+        self.loaded = True
+        logger.log_infomsg("Loaded %d records of %d object tables in %.3f seconds." %
+                           (count, len(self.tables), time.time() - begin))
+
+    def load_table(self, model_obj):
+        """
+        Load all records of a table.
+
+        Args:
+            model_obj: (model) the table's model.
+
+        Returns:
+            (int) number of records.
+        """
+        table_name = model_obj.__name__
+        field_names = [field.name for field in model_obj._meta.fields]
+        record_class = namedtuple(table_name, field_names)
+
+        records = {}
+        for data in model_obj.objects.all():
+            records[data.key] = record_class._make(data.serializable_value(name) for name in field_names)
+
+        self.tables[table_name] = records
+        return len(records)
+
+    def reload_table(self, table_name):
+        """
+        Reload a table if it has been loaded. Called when the table's data has changed.
+
+        Args:
+            table_name: (string) the table's name.
+        """
+        if not self.loaded or table_name not in self.tables:
+            return
+
+        try:
+            self.load_table(apps.get_model(settings.WORLD_DATA_APP, table_name))
+        except Exception as e:
+            logger.log_errmsg("Can not load table %s: %s" % (table_name, e))
+            # load all tables when they are used
+            self.clear()
+
+    def has_table(self, table_name):
+        """
+        If the table is an object table.
+        """
+        if not self.loaded:
+            self.reload()
+
+        return table_name in self.tables
+
+    def get_record(self, table_name, key):
+        """
+        Get an object's record of a table.
+
+        Args:
+            table_name: (string) the table's name.
+            key: (string) the object's key.
+
+        Returns:
+            (namedtuple) the record, or None if it does not exist.
+        """
+        if not self.loaded:
+            self.reload()
+
+        records = self.tables.get(table_name)
+        if records is None:
+            return None
+        return records.get(key)
+
+
+# main object data handler
+OBJECT_DATA_HANDLER = ObjectDataHandler()
@@ -0,0 +1,150 @@
+"""
+This model indexes unique world objects (areas, rooms, exits, world objects and world
+NPCs) by their data keys, so they can be found without querying the database.
+"""
+
+from django.conf import settings
+from evennia.objects.models import ObjectDB
+from evennia.utils import logger
+
+
+class ObjectIndexHandler(object):
+    """
+    The index of unique objects' data keys.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        self.clear()
+
+    def clear(self):
+        """
+        Clear the index.
+        """
+        # {data key: set(object's id)}
+        self.keys = {}
+
+        # {object's id: data key}
+        self.objects = {}
+
+        self.loaded = False
+
+    def reload(self):
+        """
+        Rebuild the index from the database.
+        """
+        self.clear()
+
+        category = settings.DATA_KEY_CATEGORY
+        try:
+            unique_ids = set(ObjectDB.objects.filter(db_attributes__db_key="type",
+                                                     db_attributes__db_category=category)
+                                             .values_list("id", flat=True))
+
+            records = ObjectDB.objects.filter(db_attributes__db_key="key",
+                                              db_attributes__db_category=category)\
+                                      .values_list("id", "db_attributes__db_strvalue")
+            for obj_id, key in records:
+                if obj_id in unique_ids:
+                    self.add_id(obj_id, key)
+        except Exception as e:
+            logger.log_errmsg("Can not load the index of objects: %s" % e)
+
+        self.loaded = True
+
+    def add_id(self, obj_id, key):
+        """
+        Add an object's id to the index.
+        """
+        self.remove_id(obj_id)
+        if not key:
+            return
+
+        if key not in self.keys:
+            self.keys[key] = set()
+        self.keys[key].add(obj_id)
+        self.objects[obj_id] = key
+
+    def remove_id(self, obj_id):
+        """
+        Remove an object's id from the index.
+        """
+        key = self.objects.pop(obj_id, None)
+        if key is None:
+            return
+
+        ids = self.keys.get(key)
+        if ids:
+            ids.discard(obj_id)
+            if not ids:
+                del self.keys[key]
+
+    def add(self, obj):
+        """
+        Add a unique object to the index.
+
+        Args:
+            obj: (object) the object.
+        """
+        if not self.loaded:
+            self.reload()
+
+        self.add_id(obj.id, obj.get_data_key())
+
+    def remove(self, obj):
+        """
+        Remove an object from the index.
+
+        Args:
+            obj: (object) the object.
+        """
+        self.remove_id(obj.id)
+
+    def update(self, obj, key):
+        """
+        Update an object's data key if the object is in the index.
+
+        Args:
+            obj: (object) the object.
+            key: (string) the object's new data key.
+        """
+        if obj.id in self.objects:
+            self.add_id(obj.id, key)
+
+    def get(self, key):
+        """
+        Get unique objects by the data key.
+
+        Args:
+            key: (string) data key.
+
+        Returns:
+            (list) objects, or None if the key is not in the index.
+        """
+        if not self.loaded:
+            self.reload()
+
+        ids = self.keys.get(key)
+        if not ids:
+            return None
+
+        objects = []
+        for obj_id in sorted(ids):
+            obj = ObjectDB.get_cached_instance(obj_id)
+            if not obj:
+                try:
+                    obj = ObjectDB.objects.get(id=obj_id)
+                except ObjectDB.DoesNotExist:
+                    # the object has been deleted
+                    self.remove_id(obj_id)
+                    continue
+            objects.append(obj)
+
+        if not objects:
+            return None
+        return objects
+
+
+# main object index handler
+OBJECT_INDEX_HANDLER = ObjectIndexHandler()
@@ -0,0 +1,114 @@
+"""
+This model keeps objects' custom properties of every level with parsed values.
+
+Properties of an object are loaded when they are used for the first time, so objects
+with the same key (such as mobs) only query and parse their properties once.
+"""
+
+import ast
+import copy
+from muddery.worlddata.dao.object_properties_mapper import OBJECT_PROPERTIES
+
+
+def parse_property_value(serializable_value):
+    """
+    Parse a property's value from its string.
+
+    Args:
+        serializable_value: (string) value's string.
+
+    Returns:
+        the value
+    """
+    if serializable_value == "":
+        return None
+
+    try:
+        return ast.literal_eval(serializable_value)
+    except (SyntaxError, ValueError) as e:
+        # treat as a raw string
+        return serializable_value
+
+
+def copy_property_value(value):
+    """
+    Copy a property's value if it is mutable, so changing an object's value does not
+    change the cached value shared by other objects.
+
+    Args:
+        value: the value
+
+    Returns:
+        the value, or a copy of it if it is mutable.
+    """
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
+
+
+class ObjectPropertiesHandler(object):
+    """
+    Objects' custom properties. Parsed values are cached and shared by all objects,
+    get_properties() returns copies of mutable values.
+    """
+    model_name = OBJECT_PROPERTIES.model_name
+
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        # {object's key: {level: {property's key: value}}}
+        self.properties = {}
+
+    def clear(self, object_key=None):
+        """
+        Clear cached properties.
+
+        Args:
+            object_key: (string) object's key, clear all objects' properties if it is None.
+        """
+        if object_key is None:
+            self.properties = {}
+        else:
+            self.properties.pop(object_key, None)
+
+    def load_properties(self, object_key):
+        """
+        Load properties of all levels of the object.
+
+        Args:
+            object_key: (string) object's key.
+        """
+        levels = {}
+        for record in OBJECT_PROPERTIES.get_properties_all_levels(object_key):
+            if record.level not in levels:
+                levels[record.level] = {}
+            levels[record.level][record.property] = parse_property_value(record.value)
+
+        self.properties[object_key] = levels
+        return levels
+
+    def get_properties(self, object_key, level):
+        """
+        Get the object's properties of the level.
+
+        Args:
+            object_key: (string) object's key.
+            level: (number) object's level.
+
+        Returns:
+            (dict) {property's key: value}
+        """
+        levels = self.properties.get(object_key)
+        if levels is None:
+            levels = self.load_properties(object_key)
+
+        values = levels.get(level)
+        if not values:
+            return {}
+
+        return {key: copy_property_value(value) for key, value in values.items()}
+
+
+# main object properties handler
+OBJECT_PROPERTIES_HANDLER = ObjectPropertiesHandler()
@@ -11,7 +11,9 @@ from muddery.statements.statement_handler import STATEMENT_HANDLER
 from muddery.utils.localized_strings_handler import _
 from muddery.utils.exception import MudderyError
 from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils import defines
 from muddery.worlddata.dao.quest_dependencies_mapper import QUEST_DEPENDENCIES
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
 from muddery.mappings.quest_status_set import QUEST_STATUS_SET
 from muddery.mappings.typeclass_set import TYPECLASS
 
@@ -49,6 +51,7 @@ class QuestHandler(object):
 
         new_quest.set_owner(self.owner)
         self.current_quests[quest_key] = new_quest
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_QUEST, quest_key)
 
         self.owner.msg({"msg": _("Accepted quest {C%s{n.") % new_quest.get_name()})
         self.show_quests()
@@ -63,6 +66,7 @@ class QuestHandler(object):
         for quest_key in self.current_quests:
             self.current_quests[quest_key].delete()
         self.current_quests = []
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_QUEST)
 
     def give_up(self, quest_key):
         """
@@ -87,6 +91,7 @@ class QuestHandler(object):
         if quest_key in self.finished_quests:
             self.finished_quests.remove(quest_key)
 
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_QUEST, quest_key)
         self.show_quests()
 
     def turn_in(self, quest_key):
@@ -116,6 +121,7 @@ class QuestHandler(object):
         del (self.current_quests[quest_key])
 
         self.finished_quests.add(quest_key)
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_QUEST, quest_key)
 
         self.owner.msg({"msg": _("Turned in quest {C%s{n.") % name})
         self.show_quests()
@@ -239,14 +245,12 @@ class QuestHandler(object):
         if not model_name:
             return False
 
-        model_quest = apps.get_model(settings.WORLD_DATA_APP, model_name)
+        record = OBJECT_DATA_HANDLER.get_record(model_name, quest_key)
+        if not record:
+            logger.log_errmsg("Can't get quest %s's condition." % quest_key)
+            return False
 
-        try:
-            record = model_quest.objects.get(key=quest_key)
-            return STATEMENT_HANDLER.match_condition(record.condition, self.owner, None)
-        except Exception as e:
-            logger.log_errmsg("Can't get quest %s's condition: %s" % (quest_key, e))
-        return False
+        return STATEMENT_HANDLER.match_condition(record.condition, self.owner, None)
 
     def show_quests(self):
         """
@@ -283,13 +287,35 @@ class QuestHandler(object):
         Returns:
             None
         """
-        status_changed = False
-        for quest in self.current_quests.values():
-            if quest.at_objective(object_type, object_key, number):
-                status_changed = True
-                if quest.is_accomplished():
-                    self.owner.msg({"msg":
-                        _("Quest {C%s{n's goals are accomplished.") % quest.name})
+        self.at_objectives(object_type, {object_key: number})
+
+    def at_objectives(self, object_type, objects):
+        """
+        Called when the owner may complete objectives of some objects. Quests are sent
+        to the owner once.
+
+        Args:
+            object_type: (type) objective's type
+            objects: (dict) objects' keys and numbers, {object's key: number}
+
+        Returns:
+            None
+        """
+        changed_quests = []
+        for quest_key, quest in self.current_quests.items():
+            changed = False
+            for object_key, number in objects.items():
+                if quest.at_objective(object_type, object_key, number):
+                    changed = True
+
+            if changed:
+                changed_quests.append(quest)
+                STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_QUEST, quest_key)
+
+        for quest in changed_quests:
+            if quest.is_accomplished():
+                self.owner.msg({"msg":
+                    _("Quest {C%s{n's goals are accomplished.") % quest.name})
 
-        if status_changed:
+        if changed_quests:
             self.show_quests()
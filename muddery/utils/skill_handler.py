@@ -0,0 +1,453 @@
+"""
+Skills are split into shared skill data and characters' skill states.
+
+A skill's data (name, function, cd, messages and properties) is loaded once from the
+skill tables and shared by all characters. A character only keeps a small state of
+every skill it has learned: the skill's cd finish time and if it is a default skill.
+The cd finish times are saved in the character's db.skill_cd, so they last after the
+character is reloaded.
+"""
+
+import re, time
+from collections import namedtuple
+from django.conf import settings
+from evennia.utils import logger
+from evennia.utils.utils import class_from_module
+from muddery.mappings.typeclass_set import TYPECLASS, TYPECLASS_SET
+from muddery.statements.statement_handler import STATEMENT_HANDLER
+from muddery.utils import defines
+from muddery.utils.game_settings import GAME_SETTINGS
+from muddery.utils.localized_strings_handler import _
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.utils.object_properties_handler import OBJECT_PROPERTIES_HANDLER, copy_property_value
+from muddery.worlddata.dao.properties_dict_mapper import PROPERTIES_DICT
+
+
+class SkillData(object):
+    """
+    A skill's data. It is shared by all characters, it must not be modified.
+    """
+    msg_escape = re.compile(r'%[%|n|c|t]')
+
+    @staticmethod
+    def escape_fun(word):
+        """
+        Change escapes to target words.
+        """
+        escape_word = word.group()
+        char = escape_word[1]
+        if char == "%":
+            return char
+        else:
+            return "%(" + char + ")s"
+
+    def __init__(self, key, system, properties):
+        """
+        Args:
+            key: (string) skill's key.
+            system: (dict) skill's data of all its tables.
+            properties: (namedtuple) skill's custom properties.
+        """
+        self.key = key
+        self.name = system.get("name", "")
+        self.desc = system.get("desc", "")
+        self.icon = system.get("icon", None)
+        self.function = system.get("function", "")
+        self.cd = system.get("cd", 0)
+        self.passive = system.get("passive", False)
+        self.main_type = system.get("main_type", "")
+        self.sub_type = system.get("sub_type", "")
+        self.message_model = self.msg_escape.sub(self.escape_fun, system.get("message", ""))
+        self.prop = properties
+
+
+class SkillDataHandler(object):
+    """
+    All skills' data. Skills are loaded when they are used for the first time.
+    """
+    def __init__(self):
+        """
+        Initialize handler
+        """
+        # {skill's key: SkillData}
+        self.skills = {}
+
+    def clear(self):
+        """
+        Clear skills' data. Called when the world's data has changed.
+        """
+        self.skills = {}
+
+    def get_model_names(self):
+        """
+        Get the tables of skills' data.
+
+        Returns:
+            (set) tables' names.
+        """
+        model_names = {OBJECT_PROPERTIES_HANDLER.model_name, PROPERTIES_DICT.model_name}
+        for typeclass in TYPECLASS_SET.get_group("SKILL").values():
+            model_names.update(typeclass.get_models())
+        return model_names
+
+    def load_skill(self, skill_key):
+        """
+        Load a skill's data.
+
+        Args:
+            skill_key: (string) skill's key.
+
+        Returns:
+            (SkillData) skill's data, or None if the skill does not exist.
+        """
+        typeclass = TYPECLASS("SKILL")
+
+        system = {}
+        for model_name in typeclass.get_models():
+            record = OBJECT_DATA_HANDLER.get_record(model_name, skill_key)
+            if not record:
+                logger.log_errmsg("Can not find skill %s in %s" % (skill_key, model_name))
+                return None
+            system.update(zip(record._fields, record))
+
+        # skill's custom properties
+        values = OBJECT_PROPERTIES_HANDLER.get_properties(skill_key, system.get("level", 0))
+        info = typeclass.get_properties_info()
+        property_class = namedtuple("SkillProperties", info.keys())
+        properties = property_class._make(values[key] if key in values else
+                                          copy_property_value(info[key]["default_value"])
+                                          for key in info)
+
+        skill = SkillData(skill_key, system, properties)
+        self.skills[skill_key] = skill
+        return skill
+
+    def get(self, skill_key):
+        """
+        Get a skill's data.
+
+        Args:
+            skill_key: (string) skill's key.
+
+        Returns:
+            (SkillData) skill's data, or None if the skill does not exist.
+        """
+        skill = self.skills.get(skill_key)
+        if skill is None:
+            skill = self.load_skill(skill_key)
+        return skill
+
+
+class CharacterSkill(object):
+    """
+    A skill learned by a character. It keeps the character's state of the skill, all
+    other data is got from the skill's shared data.
+    """
+    def __init__(self, data, owner, is_default=False):
+        """
+        Args:
+            data: (SkillData) skill's data.
+            owner: (object) skill's owner.
+            is_default: (boolean) if it is a default skill.
+        """
+        self.data = data
+        self.owner = owner
+        self.default = is_default
+
+        skill_cd = owner.attributes.get("skill_cd") if owner else None
+        self.cd_finish_time = skill_cd.get(data.key, 0) if skill_cd else 0
+
+    @property
+    def dbref(self):
+        """
+        The skill's id used by clients.
+        """
+        return defines.SKILL_PREFIX + self.data.key
+
+    @property
+    def name(self):
+        return self.data.name
+
+    @property
+    def icon(self):
+        return self.data.icon
+
+    @property
+    def cd(self):
+        return self.data.cd
+
+    @property
+    def passive(self):
+        return self.data.passive
+
+    @property
+    def main_type(self):
+        return self.data.main_type
+
+    @property
+    def sub_type(self):
+        return self.data.sub_type
+
+    @property
+    def prop(self):
+        return self.data.prop
+
+    def get_data_key(self):
+        """
+        Get the skill's key.
+        """
+        return self.data.key
+
+    def get_name(self):
+        """
+        Get the skill's name.
+        """
+        return self.data.name
+
+    def set_default(self, is_default):
+        """
+        Set this skill as the character's default skill.
+
+        Args:
+            is_default: (boolean) if the is default or not.
+        """
+        self.default = is_default
+
+    def is_default(self):
+        """
+        Check if this skill is the character's default skill.
+
+        Returns:
+            (boolean) is default or not
+        """
+        return self.default
+
+    def at_learned(self):
+        """
+        Called when the skill is learned. Add gcd to the new skill.
+        """
+        if not self.passive:
+            gcd = GAME_SETTINGS.get("global_cd")
+            if gcd > 0:
+                self.set_cd_finish_time(time.time() + gcd)
+
+    def get_available_commands(self, caller):
+        """
+        This returns a list of available commands.
+
+        Args:
+            caller: (object) command's caller
+
+        Returns:
+            commands: (list) a list of available commands
+        """
+        if self.passive:
+            return []
+
+        commands = [{"name": _("Cast"), "cmd": "castskill", "args": self.get_data_key()}]
+        return commands
+
+    def cast_skill(self, target):
+        """
+        Cast this skill.
+
+        Args:
+            target: (object) skill's target.
+
+        Returns:
+            skill_cast: (dict) skill's result
+        """
+        skill_cast = {}
+        not_available = self.check_available()
+        if not_available:
+            skill_cast = {"cast": not_available}
+        else:
+            results = self.do_skill(target)
+
+            # set message
+            skill_cast = {
+                "caller": self.owner.dbref,
+                "skill": self.get_data_key(),
+                "main_type": self.main_type,
+                "sub_type": self.sub_type,
+                "cast": self.cast_message(target),
+                "status": {
+                    self.owner.dbref: self.owner.get_combat_status(),
+                }
+            }
+
+            if target:
+                skill_cast["target"] = target.dbref
+                skill_cast["status"][target.dbref] = target.get_combat_status()
+
+            if results:
+                skill_cast["result"] = " ".join(results)
+
+        return skill_cast
+
+    def do_skill(self, target):
+        """
+        Do this skill.
+        """
+        if not self.passive:
+            # set cd
+            if self.cd > 0:
+                self.set_cd_finish_time(time.time() + self.cd)
+
+        # call skill function
+        return STATEMENT_HANDLER.do_skill(self.data.function, self.owner, target)
+
+    def check_available(self):
+        """
+        Check this skill.
+
+        Returns:
+            message: (string) If the skill is not available, returns a string of reason.
+                     If the skill is available, return "".
+        """
+        if self.is_cooling_down():
+            return _("{C%s{n is not ready yet!") % self.get_name()
+
+        return ""
+
+    def is_available(self, passive):
+        """
+        If this skill is available.
+
+        Args:
+            passive: (boolean) cast a passive skill.
+
+        Returns:
+            (boolean) available or not.
+        """
+        if not passive and self.passive:
+            return False
+
+        if self.is_cooling_down():
+            return False
+
+        return True
+
+    def is_cooling_down(self):
+        """
+        If this skill is cooling down.
+        """
+        return self.cd > 0 and time.time() < self.cd_finish_time
+
+    def get_remain_cd(self):
+        """
+        Get skill's CD.
+
+        Returns:
+            (float) Remain CD in seconds.
+        """
+        remain_cd = self.cd_finish_time - time.time()
+        if remain_cd < 0:
+            remain_cd = 0
+        return remain_cd
+
+    def reset_cd(self):
+        """
+        Finish the skill's cd.
+        """
+        self.set_cd_finish_time(0)
+
+    def set_cd_finish_time(self, finish_time):
+        """
+        Set the time when the skill's cd finishes and save it in the owner's
+        db.skill_cd.
+
+        Args:
+            finish_time: (float) the finish time, 0 means no cd.
+        """
+        self.cd_finish_time = finish_time
+        if not self.owner:
+            return
+
+        skill_cd = self.owner.attributes.get("skill_cd")
+        key = self.data.key
+        if finish_time > 0:
+            if skill_cd is None:
+                self.owner.db.skill_cd = {key: finish_time}
+            else:
+                skill_cd[key] = finish_time
+        elif skill_cd and key in skill_cd:
+            del skill_cd[key]
+
+    def cast_message(self, target):
+        """
+        Create skill's result message.
+        """
+        caller_name = ""
+        target_name = ""
+        message = ""
+
+        if self.owner:
+            caller_name = self.owner.get_name()
+
+        if target:
+            target_name = target.get_name()
+
+        if self.data.message_model:
+            values = {"n": self.get_name(),
+                      "c": caller_name,
+                      "t": target_name}
+            message = self.data.message_model % values
+
+        return message
+
+    def get_appearance(self, caller):
+        """
+        This is a convenient hook for a 'look'
+        command to call.
+        """
+        info = {"dbref": self.dbref,
+                "name": self.get_name(),
+                "desc": self.data.desc,
+                "cmds": self.get_available_commands(caller),
+                "icon": self.icon,
+                "passive": self.passive,
+                "cd_remain": self.get_remain_cd()}
+        return info
+
+    def return_appearance(self, looker, **kwargs):
+        """
+        Called by the look command.
+        """
+        return self.get_appearance(looker)
+
+    def access(self, accessing_obj, access_type="read", default=False, **kwargs):
+        """
+        Only the owner can look at the skill.
+        """
+        return accessing_obj == self.owner
+
+    def at_desc(self, looker=None, **kwargs):
+        """
+        Called after the skill has been looked at.
+        """
+        pass
+
+
+def create_character_skill(skill_key, owner, is_default=False):
+    """
+    Create a character's skill.
+
+    Args:
+        skill_key: (string) skill's key.
+        owner: (object) skill's owner.
+        is_default: (boolean) if it is a default skill.
+
+    Returns:
+        (CharacterSkill) the skill, or None if the skill does not exist.
+    """
+    data = SKILL_DATA_HANDLER.get(skill_key)
+    if not data:
+        return None
+
+    skill_class = class_from_module(settings.CHARACTER_SKILL)
+    return skill_class(data, owner, is_default)
+
+
+# main skill data handler
+SKILL_DATA_HANDLER = SkillDataHandler()
@@ -5,6 +5,8 @@ Handles a character's attributes used in statements.
 from muddery.utils.localized_strings_handler import _
 from django.conf import settings
 from evennia.utils import logger
+from muddery.statements.statement_handler import STATEMENT_HANDLER
+from muddery.utils import defines
 
 
 class StatementAttributeHandler(object):
@@ -23,6 +25,7 @@ class StatementAttributeHandler(object):
         Set an attribute.
         """
         self.attributes[key] = value
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_ATTRIBUTE, key)
 
     def get(self, key, default=None):
         """
@@ -44,6 +47,7 @@ class StatementAttributeHandler(object):
             return False
 
         del self.attributes[key]
+        STATEMENT_HANDLER.state_changed(self.owner, defines.STATUS_ATTRIBUTE, key)
         return True
 
     def has(self, key):
@@ -12,6 +12,7 @@ from evennia.utils import search, logger
 from evennia.utils.utils import class_from_module
 from muddery.server.launcher import configs
 from muddery.worlddata.dao.localized_strings_mapper import LOCALIZED_STRINGS
+from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
 from importlib import import_module
 from pkgutil import iter_modules
 
@@ -33,6 +34,7 @@ def set_obj_data_key(obj, key):
         key: (string) key of the data.
     """
     obj.attributes.add("key", key, category=settings.DATA_KEY_CATEGORY, strattr=True)
+    OBJECT_INDEX_HANDLER.update(obj, key)
 
 
 def search_obj_data_key(key):
@@ -45,6 +47,11 @@ def search_obj_data_key(key):
     if not key:
         return None
 
+    # Unique objects are in the index.
+    objects = OBJECT_INDEX_HANDLER.get(key)
+    if objects is not None:
+        return objects
+
     return search.search_object_attribute(key="key", strvalue=key, category=settings.DATA_KEY_CATEGORY)
     
     
@@ -65,6 +72,28 @@ def set_obj_unique_type(obj, type):
         type: (string) unique object's type.
     """
     obj.attributes.add("type", type, category=settings.DATA_KEY_CATEGORY, strattr=True)
+    OBJECT_INDEX_HANDLER.add(obj)
+
+
+def set_obj_data_hash(obj, data_hash):
+    """
+    Set the hash of the object's data.
+
+    Args:
+        obj: (object) object to be set
+        data_hash: (string) hash of the object's data.
+    """
+    obj.attributes.add("data_hash", data_hash, category=settings.DATA_KEY_CATEGORY, strattr=True)
+
+
+def get_obj_data_hash(obj):
+    """
+    Get the hash of the object's data.
+
+    Args:
+        obj: (object) the object
+    """
+    return obj.attributes.get(key="data_hash", category=settings.DATA_KEY_CATEGORY, strattr=True)
 
 
 def search_obj_unique_type(type):
@@ -152,6 +152,9 @@ MudderyClient.prototype = {
                 else if (key == "look_around") {
                     mud.scene_window.setScene(data[key]);
                 }
+                else if (key == "look_around_delta") {
+                    mud.scene_window.updateScene(data[key]);
+                }
                 else if (key == "obj_moved_in") {
                     mud.main_frame.objMovedIn(data[key]);
                 }
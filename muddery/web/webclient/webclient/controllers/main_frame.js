@@ -1727,6 +1727,25 @@ MudderyScene.prototype.setStatus = function(status) {
     this.title_bar.setStatus(status);
 }
 
+/*
+ * Update the scene with changed lists of objects.
+ */
+MudderyScene.prototype.updateScene = function(delta) {
+    if (!this.scene || this.scene["version"] != delta["base_version"]) {
+        // The scene is out of date, get the whole scene again.
+        core.service.look("");
+        return;
+    }
+
+    var scene = $.extend({}, this.scene);
+    for (var type in delta["changes"]) {
+        scene[type] = delta["changes"][type];
+    }
+    scene["version"] = delta["version"];
+
+    this.setScene(scene);
+}
+
 /*
  * Set the scene's data.
  */
@@ -848,6 +848,27 @@ class QueryTables(BaseRequestProcesser):
         return success_response(data)
 
 
+class QueryWorldChanges(BaseRequestProcesser):
+    """
+    Query changes of the world which will be made when applying changes.
+
+    Args:
+        None.
+    """
+    path = "query_world_changes"
+    name = ""
+
+    def func(self, args, request):
+        try:
+            data = build_all(dry_run=True)
+        except Exception as e:
+            message = "Can not query changes of the world: %s" % e
+            logger.log_tracemsg(message)
+            raise MudderyError(ERR.build_world_error, message)
+
+        return success_response(data)
+
+
 class ApplyChanges(BaseRequestProcesser):
     """
     Query all tables' names.
@@ -16,6 +16,12 @@ class DefaultObjectsMapper(object):
         self.model = apps.get_model(settings.WORLD_DATA_APP, self.model_name)
         self.objects = self.model.objects
 
+    def all(self):
+        """
+        Get all characters' default objects.
+        """
+        return self.objects.all()
+
     def filter(self, character):
         """
         Get character's default objects.
@@ -16,6 +16,12 @@ class DefaultSkillsMapper(object):
         self.model = apps.get_model(settings.WORLD_DATA_APP, self.model_name)
         self.objects = self.model.objects
 
+    def all(self):
+        """
+        Get all characters' default skills.
+        """
+        return self.objects.all()
+
     def filter(self, character):
         """
         Get character's default skills.
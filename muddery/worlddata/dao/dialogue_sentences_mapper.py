@@ -16,6 +16,12 @@ class DialogueSentencesMapper(object):
         self.model = apps.get_model(settings.WORLD_DATA_APP, self.model_name)
         self.objects = self.model.objects
 
+    def all(self):
+        """
+        Get all dialogue sentences.
+        """
+        return self.objects.all()
+
     def filter(self, key):
         """
         Get dialogue sentences.
@@ -16,6 +16,12 @@ class DialoguesMapper(object):
         self.model = apps.get_model(settings.WORLD_DATA_APP, self.model_name)
         self.objects = self.model.objects
 
+    def all(self):
+        """
+        Get all dialogues.
+        """
+        return self.objects.all()
+
     def get(self, key):
         """
         Get dialogues.
@@ -15,3 +15,11 @@ def get_object_event(object_key):
     """
     model = apps.get_model(settings.WORLD_DATA_APP, "event_data")
     return model.objects.filter(trigger_obj=object_key)
+
+
+def get_all_events():
+    """
+    Get all events.
+    """
+    model = apps.get_model(settings.WORLD_DATA_APP, "event_data")
+    return model.objects.all()
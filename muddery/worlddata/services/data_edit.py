@@ -7,7 +7,7 @@ from django.db import transaction
 from django.core.exceptions import ObjectDoesNotExist
 from muddery.utils.exception import MudderyError, ERR
 from muddery.worlddata.dao import general_query_mapper
-from muddery.worlddata.dao.common_mappers import WORLD_AREAS, WORLD_ROOMS, WORLD_EXITS
+from muddery.worlddata.dao.common_mappers import WORLD_AREAS, WORLD_ROOMS, WORLD_EXITS, EQUIPMENT_POSITIONS
 from muddery.worlddata.dao.system_data_mapper import SYSTEM_DATA
 from muddery.worlddata.dao.object_properties_mapper import OBJECT_PROPERTIES
 from muddery.mappings.form_set import FORM_SET
@@ -17,6 +17,16 @@ from muddery.worlddata.forms.location_field import LocationField
 from muddery.worlddata.forms.image_field import ImageField
 from muddery.worlddata.services.general_query import query_fields
 from muddery.mappings.event_action_set import EVENT_ACTION_SET
+from muddery.utils.event_data_handler import EVENT_DATA_HANDLER
+from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+from muddery.utils.object_properties_handler import OBJECT_PROPERTIES_HANDLER
+from muddery.utils.equip_type_handler import EQUIP_TYPE_HANDLER
+from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+from muddery.utils.dialogue_handler import DIALOGUE_HANDLER
+from muddery.utils.mob_pool_handler import MOB_POOL_HANDLER
+from muddery.utils.skill_handler import SKILL_DATA_HANDLER
+from muddery.statements.statement_handler import STATEMENT_HANDLER
+from muddery.worlddata.dao.properties_dict_mapper import PROPERTIES_DICT
 
 
 def query_form(table_name, **kwargs):
@@ -110,6 +120,7 @@ def save_form(values, table_name, record_id=None):
     # Save data
     if form.is_valid():
         instance = form.save()
+        at_table_changed(table_name)
         return instance.pk
     else:
         raise MudderyError(ERR.invalid_form, "Invalid form.", data=form.errors)
@@ -120,6 +131,7 @@ def delete_record(table_name, record_id):
     Delete a record of a table.
     """
     general_query_mapper.delete_record_by_id(table_name, record_id)
+    at_table_changed(table_name)
 
 
 def delete_records(table_name, **kwargs):
@@ -127,6 +139,45 @@ def delete_records(table_name, **kwargs):
     Delete records by conditions.
     """
     general_query_mapper.delete_records(table_name, **kwargs)
+    at_table_changed(table_name)
+
+
+def at_table_changed(table_name):
+    """
+    Called when a table's data has been changed. Clear the game's cache of the table.
+    """
+    if table_name == EVENT_DATA_HANDLER.model_name:
+        # events will be reloaded when they are used
+        EVENT_DATA_HANDLER.clear()
+    elif table_name == OBJECT_PROPERTIES_HANDLER.model_name:
+        # properties will be reloaded when they are used
+        OBJECT_PROPERTIES_HANDLER.clear()
+    elif table_name == PROPERTIES_DICT.model_name:
+        # properties' information will be reloaded when it is used
+        TYPECLASS_SET.load_classes()
+        for cls in TYPECLASS_SET.class_dict.values():
+            cls.clear_properties_info()
+    elif table_name == EQUIPMENT_POSITIONS.model_name:
+        # equipment positions will be reloaded when they are used
+        EQUIP_TYPE_HANDLER.clear()
+    elif table_name in CHARACTER_DEFAULTS_HANDLER.model_names:
+        # default skills and objects will be reloaded when they are used
+        CHARACTER_DEFAULTS_HANDLER.clear()
+    elif table_name in DIALOGUE_HANDLER.model_names:
+        # dialogues will be reloaded when they are used
+        DIALOGUE_HANDLER.mark_dirty()
+
+    # reload objects' data
+    OBJECT_DATA_HANDLER.reload_table(table_name)
+
+    # statements and conditions' results may use old data
+    STATEMENT_HANDLER.clear_cache()
+
+    # skills and pooled temporary mobs may use old data
+    if table_name in SKILL_DATA_HANDLER.get_model_names():
+        SKILL_DATA_HANDLER.clear()
+    if table_name in MOB_POOL_HANDLER.get_model_names():
+        MOB_POOL_HANDLER.clear()
 
 
 def query_object_form(base_typeclass, obj_typeclass, obj_key):
@@ -191,6 +242,9 @@ def save_object_level_properties(object_key, level, values):
         values: (dict) values to save.
     """
     OBJECT_PROPERTIES.add_properties(object_key, level, values)
+    OBJECT_PROPERTIES_HANDLER.clear(object_key)
+    SKILL_DATA_HANDLER.clear()
+    MOB_POOL_HANDLER.clear()
 
 
 def delete_object_level_properties(object_key, level):
@@ -202,6 +256,9 @@ def delete_object_level_properties(object_key, level):
         level: (number) object's level.
     """
     OBJECT_PROPERTIES.delete_properties(object_key, level)
+    OBJECT_PROPERTIES_HANDLER.clear(object_key)
+    SKILL_DATA_HANDLER.clear()
+    MOB_POOL_HANDLER.clear()
 
 
 def save_object_form(tables, obj_typeclass, obj_key):
@@ -264,6 +321,9 @@ def save_object_form(tables, obj_typeclass, obj_key):
         for form in forms:
             form.save()
 
+    for table in tables:
+        at_table_changed(table["table"])
+
     return new_key
 
 
@@ -296,6 +356,9 @@ def save_map_positions(area, rooms):
             record.full_clean()
             record.save()
 
+    at_table_changed(WORLD_AREAS.model_name)
+    at_table_changed(WORLD_ROOMS.model_name)
+
 
 def delete_object(obj_key, base_typeclass=None):
     """
@@ -318,6 +381,9 @@ def delete_object(obj_key, base_typeclass=None):
             except ObjectDoesNotExist:
                 pass
 
+    for table in tables:
+        at_table_changed(table)
+
 
 def query_event_action_forms(action_type, event_key):
     """
@@ -364,19 +430,23 @@ def update_object_key(typeclass_key, old_key, new_key):
         model_name = TYPECLASS("ROOM").model_name
         if model_name:
             general_query_mapper.filter_records(model_name, location=old_key).update(location=new_key)
+            at_table_changed(model_name)
     elif issubclass(typeclass, TYPECLASS("ROOM")):
         # Update relative exit's location.
         model_name = TYPECLASS("EXIT").model_name
         if model_name:
             general_query_mapper.filter_records(model_name, location=old_key).update(location=new_key)
             general_query_mapper.filter_records(model_name, destination=old_key).update(destination=new_key)
+            at_table_changed(model_name)
 
         # Update relative world object's location.
         model_name = TYPECLASS("WORLD_OBJECT").model_name
         if model_name:
             general_query_mapper.filter_records(model_name, location=old_key).update(location=new_key)
+            at_table_changed(model_name)
 
         # Update relative world NPC's location.
         model_name = TYPECLASS("WORLD_NPC").model_name
         if model_name:
             general_query_mapper.filter_records(model_name, location=old_key).update(location=new_key)
+            at_table_changed(model_name)
@@ -209,9 +209,6 @@ def import_file(fullname, file_type=None, table_name=None, clear=True, **kwargs)
     # get model
     model_obj = apps.get_model(settings.WORLD_DATA_APP, table_name)
 
-    if clear:
-        clear_model_data(model_obj, **kwargs)
-
     reader_class = readers.get_reader(file_type)
     if not reader_class:
         # Does support this file type.
@@ -222,6 +219,16 @@ def import_file(fullname, file_type=None, table_name=None, clear=True, **kwargs)
         # Does support this file type.
         raise(MudderyError(ERR.import_data_error, "Does not support this file type."))
 
-    logger.log_infomsg("Importing %s" % table_name)
-    import_data(model_obj, reader)
+    try:
+        if clear:
+            clear_model_data(model_obj, **kwargs)
+
+        logger.log_infomsg("Importing %s" % table_name)
+        import_data(model_obj, reader)
+    finally:
+        # Clear the game's cache of the table, even if the import failed after the
+        # table had been changed. Import it here, data_edit imports game handlers
+        # which are not needed by other functions of this module.
+        from muddery.worlddata.services import data_edit
+        data_edit.at_table_changed(table_name)
 
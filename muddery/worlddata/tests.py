@@ -1,4 +1,4 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.test.client import Client
 from django.conf import settings
 from django.contrib import auth
@@ -207,3 +207,187 @@ class TestEditor(TestCase):
         
         response = self.client.get('/worlddata/editor/localization/localized_strings/form.html')
         self.failUnlessEqual(response.status_code, 200)
+
+
+def create_home():
+    """
+    Create a room as the default home of new objects.
+
+    Returns:
+        settings: (override_settings) the enabled settings override, disable it after the test.
+    """
+    from evennia.objects.objects import DefaultRoom
+    from evennia.utils import create
+
+    home = create.create_object(DefaultRoom, key="home", nohome=True)
+    home_settings = override_settings(DEFAULT_HOME=home.dbref)
+    home_settings.enable()
+    return home_settings
+
+
+class TestObjectIndex(TestCase):
+    """
+    The index of unique objects must match the objects in the database.
+    """
+    multi_db = True
+
+    def setUp(self):
+        from django.apps import apps
+        from muddery.utils.object_index_handler import OBJECT_INDEX_HANDLER
+
+        self.home_settings = create_home()
+        self.index = OBJECT_INDEX_HANDLER
+        self.index.clear()
+
+        objects = apps.get_model(settings.WORLD_DATA_APP, "objects")
+        world_areas = apps.get_model(settings.WORLD_DATA_APP, "world_areas")
+        world_rooms = apps.get_model(settings.WORLD_DATA_APP, "world_rooms")
+
+        objects.objects.create(key="test_area", typeclass="AREA", name="Area")
+        world_areas.objects.create(key="test_area")
+
+        self.room_keys = ["test_room_1", "test_room_2"]
+        for key in self.room_keys:
+            objects.objects.create(key=key, typeclass="ROOM", name=key)
+            world_rooms.objects.create(key=key, location="test_area")
+
+        self.world_rooms = world_rooms
+
+    def tearDown(self):
+        self.index.clear()
+        self.home_settings.disable()
+
+    def assertIndexConsistent(self):
+        """
+        The index kept up to date equals the index rebuilt from the database.
+        """
+        keys = {key: set(ids) for key, ids in self.index.keys.items()}
+        objects = dict(self.index.objects)
+
+        self.index.reload()
+        self.assertEqual(keys, self.index.keys)
+        self.assertEqual(objects, self.index.objects)
+
+    def test_build_all(self):
+        from muddery.utils.builder import build_all
+
+        build_all()
+
+        areas = self.index.get("test_area")
+        self.assertEqual(len(areas), 1)
+
+        for key in self.room_keys:
+            rooms = self.index.get(key)
+            self.assertEqual(len(rooms), 1)
+            self.assertEqual(rooms[0].get_data_key(), key)
+            self.assertEqual(rooms[0].location, areas[0])
+        self.assertIndexConsistent()
+
+        # remove a room from the world
+        self.world_rooms.objects.filter(key="test_room_2").delete()
+        build_all()
+
+        self.assertIsNone(self.index.get("test_room_2"))
+        self.assertEqual(len(self.index.get("test_room_1")), 1)
+        self.assertIndexConsistent()
+
+
+class TestAttributeWrites(TestCase):
+    """
+    Loading unchanged data must not write attributes.
+    """
+    multi_db = True
+
+    def setUp(self):
+        from django.apps import apps
+        from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+
+        objects = apps.get_model(settings.WORLD_DATA_APP, "objects")
+        characters = apps.get_model(settings.WORLD_DATA_APP, "characters")
+
+        objects.objects.create(key="test_character", typeclass="CHARACTER", name="Character")
+        characters.objects.create(key="test_character", level=2)
+
+        OBJECT_DATA_HANDLER.reload()
+        self.home_settings = create_home()
+
+    def tearDown(self):
+        self.home_settings.disable()
+
+    def test_reinit_character(self):
+        from muddery.utils.builder import build_object
+
+        character = build_object("test_character", reset_location=False)
+        self.assertIsNotNone(character)
+        self.assertEqual(character.db.level, 2)
+
+        # re-initialize the unchanged character
+        character.at_init()
+        self.assertEqual(character.init_attribute_writes, 0)
+        self.assertEqual(character.db.level, 2)
+
+        character.delete()
+
+
+class TestCharacterDefaults(TestCase):
+    """
+    Characters' default skills and objects are queried once, not once per character.
+    """
+    multi_db = True
+
+    def setUp(self):
+        from django.apps import apps
+        from django.db import router
+        from muddery.utils.object_data_handler import OBJECT_DATA_HANDLER
+        from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+
+        objects = apps.get_model(settings.WORLD_DATA_APP, "objects")
+        characters = apps.get_model(settings.WORLD_DATA_APP, "characters")
+        skills = apps.get_model(settings.WORLD_DATA_APP, "skills")
+        default_skills = apps.get_model(settings.WORLD_DATA_APP, "default_skills")
+        default_objects = apps.get_model(settings.WORLD_DATA_APP, "default_objects")
+
+        objects.objects.create(key="test_skill", typeclass="SKILL", name="Skill")
+        skills.objects.create(key="test_skill")
+
+        self.character_keys = ["test_character_%d" % i for i in range(3)]
+        for key in self.character_keys:
+            objects.objects.create(key=key, typeclass="CHARACTER", name=key)
+            characters.objects.create(key=key)
+            default_skills.objects.create(character=key, skill="test_skill")
+
+        self.default_tables = [default_skills._meta.db_table, default_objects._meta.db_table]
+        self.database = router.db_for_read(default_skills)
+
+        OBJECT_DATA_HANDLER.reload()
+        CHARACTER_DEFAULTS_HANDLER.clear()
+        self.home_settings = create_home()
+
+    def tearDown(self):
+        from muddery.utils.character_defaults_handler import CHARACTER_DEFAULTS_HANDLER
+
+        CHARACTER_DEFAULTS_HANDLER.clear()
+        self.home_settings.disable()
+
+    def test_load_characters(self):
+        from django.db import connections
+        from django.test.utils import CaptureQueriesContext
+        from muddery.utils.builder import build_object
+
+        with CaptureQueriesContext(connections[self.database]) as context:
+            characters = [build_object(key, reset_location=False) for key in self.character_keys]
+
+        default_queries = [query for query in context.captured_queries
+                           if any(table in query["sql"] for table in self.default_tables)]
+        self.assertLessEqual(len(default_queries), len(self.default_tables))
+
+        for character in characters:
+            self.assertIn("test_skill", character.db.skills)
+
+        # reload default skills of all characters without queries
+        with self.assertNumQueries(0, using=self.database):
+            for character in characters:
+                character.load_default_skills()
+
+        for character in characters:
+            character.delete()
@@ -2,6 +2,42 @@
 controller = {
     init: function() {
         this.bindEvents();
+        this.queryChanges();
+        window.parent.controller.setFrameSize();
+    },
+
+    queryChanges: function() {
+        $("#world-changes").text("Querying changes of the world...");
+        service.queryWorldChanges(this.queryChangesSuccess, this.queryChangesFailed);
+    },
+
+    queryChangesSuccess: function(data) {
+        var container = $("#world-changes").empty();
+
+        for (var i = 0; i < data.length; i++) {
+            var report = data[i];
+            $("<div>")
+                .text(report.type + ": created " + report.created.length +
+                      ", updated " + report.updated.length +
+                      ", removed " + report.removed.length +
+                      ", unchanged " + report.unchanged + ".")
+                .appendTo(container);
+
+            var changes = [["Created", report.created], ["Updated", report.updated], ["Removed", report.removed]];
+            for (var j = 0; j < changes.length; j++) {
+                if (changes[j][1].length > 0) {
+                    $("<div>")
+                        .text(changes[j][0] + ": " + changes[j][1].join(", "))
+                        .appendTo(container);
+                }
+            }
+        }
+
+        window.parent.controller.setFrameSize();
+    },
+
+    queryChangesFailed: function(code, message, data) {
+        $("#world-changes").text("Can not query changes: " + code + ": " + message);
         window.parent.controller.setFrameSize();
     },
 
@@ -39,6 +75,7 @@ controller = {
 
         window.parent.controller.hideWaiting();
         window.parent.controller.notify("", "The server restarted.");
+        controller.queryChanges();
     },
 }
 
@@ -431,6 +431,10 @@ service = {
         this.downloadFile("download_single_data", "", args);
     },
 
+    queryWorldChanges: function(callback_success, callback_failed, context) {
+        this.sendRequest("query_world_changes", "", {}, callback_success, callback_failed, context);
+    },
+
     applyChanges: function(callback_success, callback_failed, context) {
         this.sendRequest("apply_changes", "", {}, callback_success, callback_failed, context);
     },
@@ -89,3 +89,6 @@ SKILL_FUNC_SET = "statements.statement_func_set.SkillFuncSet"
 # AI modules
 ###################################
 AI_CHOOSE_SKILL = "ai.choose_skill.ChooseSkill"
+
+# Class of characters' skills.
+CHARACTER_SKILL = "typeclasses.skill.CharacterSkill"
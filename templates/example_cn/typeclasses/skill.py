@@ -1,12 +1,13 @@
 """
 Skills
 
-Each skill is a skill object stored in the character. The skill object stores all data and
-actions of a skill.
+The skill typeclass defines skills' data. Characters' skills are CharacterSkill objects,
+they keep characters' states of skills and cast skills.
 
 """
 
 from muddery.typeclasses.skill import MudderySkill
+from muddery.utils.skill_handler import CharacterSkill as MudderyCharacterSkill
 from muddery.utils.localized_strings_handler import _
 
 
@@ -16,6 +17,11 @@ class Skill(MudderySkill):
     """
     typeclass_key = "SKILL"
 
+
+class CharacterSkill(MudderyCharacterSkill):
+    """
+    A skill learned by a character.
+    """
     def do_skill(self, target):
         """
         Do this skill.
@@ -24,7 +30,7 @@ class Skill(MudderySkill):
             # set mp
             self.owner.prop.mp -= self.prop.mp
 
-        return super(Skill, self).do_skill(target)
+        return super(CharacterSkill, self).do_skill(target)
 
     def check_available(self):
         """
@@ -37,7 +43,7 @@ class Skill(MudderySkill):
             message: (string) If the skill is not available, returns a string of reason.
                      If the skill is available, return "".
         """
-        message = super(Skill, self).check_available()
+        message = super(CharacterSkill, self).check_available()
         if message:
             return message
             
@@ -56,7 +62,7 @@ class Skill(MudderySkill):
         Returns:
             (boolean) available or not.
         """
-        result = super(Skill, self).is_available(passive)
+        result = super(CharacterSkill, self).is_available(passive)
         if not result:
             return result
             
@@ -70,7 +76,7 @@ class Skill(MudderySkill):
         This is a convenient hook for a 'look'
         command to call.
         """
-        info = super(Skill, self).get_appearance(caller)
+        info = super(CharacterSkill, self).get_appearance(caller)
         
         info["mp"] = self.prop.mp
 